@@ -0,0 +1,30 @@
+"""add interview duration and (user_id, interview_time) index
+
+Revision ID: 5d2b8c1e7f3a
+Revises: 9e1f3a7b2d4c
+Create Date: 2026-10-19 14:21:37.902114
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5d2b8c1e7f3a'
+down_revision: Union[str, Sequence[str], None] = '9e1f3a7b2d4c'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('interviews', sa.Column('duration_minutes', sa.Integer(), server_default='60', nullable=False))
+    op.create_index('ix_interviews_user_id_interview_time', 'interviews', ['user_id', 'interview_time'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_interviews_user_id_interview_time', table_name='interviews')
+    op.drop_column('interviews', 'duration_minutes')
@@ -0,0 +1,48 @@
+"""create resume_documents table
+
+Revision ID: 6be5fd5e0b52
+Revises: cd2169376437
+Create Date: 2026-10-19 09:12:41.503221
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6be5fd5e0b52'
+down_revision: Union[str, Sequence[str], None] = 'cd2169376437'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'resume_documents',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('candidate_id', sa.Integer(), nullable=False),
+        sa.Column('sha256', sa.String(length=64), nullable=False),
+        sa.Column('filename', sa.String(), nullable=False),
+        sa.Column('content_type', sa.String(), nullable=True),
+        sa.Column('size_bytes', sa.Integer(), nullable=False),
+        sa.Column('raw_text', sa.Text(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.ForeignKeyConstraint(['candidate_id'], ['candidates.id'], ),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_resume_documents_id'), 'resume_documents', ['id'], unique=False)
+    op.create_index(op.f('ix_resume_documents_candidate_id'), 'resume_documents', ['candidate_id'], unique=False)
+    op.create_index(op.f('ix_resume_documents_sha256'), 'resume_documents', ['sha256'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_resume_documents_sha256'), table_name='resume_documents')
+    op.drop_index(op.f('ix_resume_documents_candidate_id'), table_name='resume_documents')
+    op.drop_index(op.f('ix_resume_documents_id'), table_name='resume_documents')
+    op.drop_table('resume_documents')
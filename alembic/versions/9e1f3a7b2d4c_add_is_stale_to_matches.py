@@ -0,0 +1,28 @@
+"""add is_stale to matches
+
+Revision ID: 9e1f3a7b2d4c
+Revises: c84c6803e4c9
+Create Date: 2026-10-19 13:40:12.514203
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9e1f3a7b2d4c'
+down_revision: Union[str, Sequence[str], None] = 'c84c6803e4c9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('matches', sa.Column('is_stale', sa.Boolean(), server_default=sa.false(), nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('matches', 'is_stale')
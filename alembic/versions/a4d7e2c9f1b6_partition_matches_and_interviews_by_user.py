@@ -0,0 +1,91 @@
+"""partition matches and interviews by user_id
+
+On Postgres (11+), rebuilds both tables as hash-partitioned by user_id, with a
+(id, user_id) primary key and per-tenant indexes. Existing rows are copied into the new
+table, which holds a lock on the table for the duration of the copy: run it in a
+maintenance window on large databases. On SQLite only the new indexes are added.
+
+Revision ID: a4d7e2c9f1b6
+Revises: b3f8d1a6c2e9
+Create Date: 2026-10-19 18:02:44.127305
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a4d7e2c9f1b6'
+down_revision: Union[str, Sequence[str], None] = 'b3f8d1a6c2e9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+PARTITIONS = 16
+
+# indexes other than ix_<table>_id, before and after this revision
+OLD_INDEXES = {
+    'matches': {},
+    'interviews': {'ix_interviews_user_id_interview_time': ['user_id', 'interview_time']},
+}
+NEW_INDEXES = {
+    'matches': {
+        'ix_matches_user_id_job_id_candidate_id': ['user_id', 'job_id', 'candidate_id'],
+        'ix_matches_user_id_candidate_id': ['user_id', 'candidate_id'],
+    },
+    'interviews': {
+        'ix_interviews_user_id_job_id_candidate_id': ['user_id', 'job_id', 'candidate_id'],
+    },
+}
+
+
+def _rebuild(table: str, partitioned: bool, old_indexes: dict, new_indexes: dict) -> None:
+    """Replaces ``table`` with a copy of itself, partitioned or not, keeping its id sequence."""
+    old = f'{table}_old'
+    op.rename_table(table, old)
+    op.execute(f'ALTER TABLE {old} RENAME CONSTRAINT {table}_pkey TO {old}_pkey')
+    for name in ['ix_%s_id' % table, *old_indexes]:
+        op.execute(f'ALTER INDEX {name} RENAME TO {name}_old')
+
+    # LIKE copies the columns, NOT NULLs and defaults, including nextval('<table>_id_seq')
+    op.execute(f'CREATE TABLE {table} (LIKE {old} INCLUDING DEFAULTS)'
+               + (' PARTITION BY HASH (user_id)' if partitioned else ''))
+    op.create_primary_key(f'{table}_pkey', table, ['id', 'user_id'] if partitioned else ['id'])
+    op.create_foreign_key(f'{table}_user_id_fkey', table, 'users', ['user_id'], ['id'])
+    op.create_foreign_key(f'{table}_job_id_fkey', table, 'jobs', ['job_id'], ['id'])
+    op.create_foreign_key(f'{table}_candidate_id_fkey', table, 'candidates', ['candidate_id'], ['id'])
+    if partitioned:
+        for n in range(PARTITIONS):
+            op.execute(f'CREATE TABLE {table}_p{n} PARTITION OF {table} '
+                       f'FOR VALUES WITH (MODULUS {PARTITIONS}, REMAINDER {n})')
+    op.create_index(f'ix_{table}_id', table, ['id'], unique=False)
+    for name, columns in new_indexes.items():
+        op.create_index(name, table, columns, unique=False)
+
+    op.execute(f'INSERT INTO {table} SELECT * FROM {old}')
+    op.execute(f'ALTER SEQUENCE {table}_id_seq OWNED BY {table}.id')
+    op.drop_table(old)
+    op.execute(f'ANALYZE {table}')
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if op.get_context().dialect.name != 'postgresql':
+        for table, indexes in NEW_INDEXES.items():
+            for name, columns in indexes.items():
+                op.create_index(name, table, columns, unique=False)
+        return
+    for table in ('matches', 'interviews'):
+        _rebuild(table, True, OLD_INDEXES[table], {**OLD_INDEXES[table], **NEW_INDEXES[table]})
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_context().dialect.name != 'postgresql':
+        for table, indexes in NEW_INDEXES.items():
+            for name in indexes:
+                op.drop_index(name, table_name=table)
+        return
+    for table in ('matches', 'interviews'):
+        _rebuild(table, False, {**OLD_INDEXES[table], **NEW_INDEXES[table]}, OLD_INDEXES[table])
@@ -0,0 +1,38 @@
+"""create match_claims table
+
+Revision ID: b3f8d1a6c2e9
+Revises: e7a4c2f9b1d8
+Create Date: 2026-10-19 16:21:08.514927
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b3f8d1a6c2e9'
+down_revision: Union[str, Sequence[str], None] = 'e7a4c2f9b1d8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'match_claims',
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('job_id', sa.Integer(), nullable=False),
+        sa.Column('candidate_id', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+        sa.ForeignKeyConstraint(['candidate_id'], ['candidates.id'], ),
+        sa.ForeignKeyConstraint(['job_id'], ['jobs.id'], ),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('user_id', 'job_id', 'candidate_id')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('match_claims')
@@ -0,0 +1,43 @@
+"""create backfill_checkpoints table
+
+Revision ID: c84c6803e4c9
+Revises: 6be5fd5e0b52
+Create Date: 2026-10-19 11:02:17.288410
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c84c6803e4c9'
+down_revision: Union[str, Sequence[str], None] = '6be5fd5e0b52'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'backfill_checkpoints',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('name', sa.String(), nullable=False),
+        sa.Column('target', sa.String(), nullable=False),
+        sa.Column('last_id', sa.Integer(), nullable=False),
+        sa.Column('processed', sa.Integer(), nullable=False),
+        sa.Column('errors', sa.Integer(), nullable=False),
+        sa.Column('started_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.Column('finished_at', sa.DateTime(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('name')
+    )
+    op.create_index(op.f('ix_backfill_checkpoints_id'), 'backfill_checkpoints', ['id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_backfill_checkpoints_id'), table_name='backfill_checkpoints')
+    op.drop_table('backfill_checkpoints')
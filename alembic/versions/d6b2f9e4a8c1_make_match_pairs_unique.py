@@ -0,0 +1,40 @@
+"""make match pairs unique
+
+Duplicate matches for the same (user_id, job_id, candidate_id), left by batch and
+auto-match inserts racing a claimed /matches/create, are removed first: the newest
+row of each pair is kept.
+
+Revision ID: d6b2f9e4a8c1
+Revises: a4d7e2c9f1b6
+Create Date: 2026-10-19 21:14:37.602158
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd6b2f9e4a8c1'
+down_revision: Union[str, Sequence[str], None] = 'a4d7e2c9f1b6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEX = 'ix_matches_user_id_job_id_candidate_id'
+COLUMNS = ['user_id', 'job_id', 'candidate_id']
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute('DELETE FROM matches WHERE id NOT IN '
+               '(SELECT max(id) FROM matches GROUP BY user_id, job_id, candidate_id)')
+    op.drop_index(INDEX, table_name='matches')
+    # includes user_id, the partition key, so Postgres accepts it on the partitioned table
+    op.create_index(INDEX, 'matches', COLUMNS, unique=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(INDEX, table_name='matches')
+    op.create_index(INDEX, 'matches', COLUMNS, unique=False)
@@ -0,0 +1,36 @@
+"""create backfill_failures table
+
+Revision ID: e8c3a5d1f7b4
+Revises: d6b2f9e4a8c1
+Create Date: 2026-10-19 22:03:51.418736
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e8c3a5d1f7b4'
+down_revision: Union[str, Sequence[str], None] = 'd6b2f9e4a8c1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'backfill_failures',
+        sa.Column('checkpoint_id', sa.Integer(), nullable=False),
+        sa.Column('row_id', sa.Integer(), nullable=False),
+        sa.Column('error', sa.Text(), nullable=True),
+        sa.Column('failed_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.ForeignKeyConstraint(['checkpoint_id'], ['backfill_checkpoints.id'], ),
+        sa.PrimaryKeyConstraint('checkpoint_id', 'row_id')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('backfill_failures')
@@ -0,0 +1,74 @@
+from dataclasses import dataclass
+from typing import Optional, Union
+from pydantic_ai.models import Model
+
+
+@dataclass(frozen=True)
+class AgentPolicy:
+    # first entry is the primary model, the rest are fallbacks tried in order
+    models: tuple[Union[str, Model], ...]
+    timeout: float                      # seconds allowed for a single attempt
+    total_budget: float                 # seconds allowed for the whole call, retries included
+    max_retries: int = 2                # retries per model before falling back
+    backoff_base: float = 0.5
+    backoff_max: float = 4.0
+    hedge: bool = False                 # fire a second request if the first is slow
+    hedge_after: Optional[float] = None # seconds, None = use the observed p95 latency
+    hedge_min_samples: int = 20
+    breaker_threshold: int = 5          # consecutive failures before the circuit opens
+    breaker_cooldown: float = 30.0      # seconds the circuit stays open before one probe call is let through
+
+
+# Per-agent execution settings, keyed by the agent's module-level name.
+AGENT_POLICIES: dict[str, AgentPolicy] = {
+    "cv_agent": AgentPolicy(
+        models=("llama-3.3-70b-versatile", "llama-3.1-8b-instant"),
+        timeout=30,
+        total_budget=60,
+        hedge=True,
+    ),
+    "jd_agent": AgentPolicy(
+        models=("llama-3.3-70b-versatile", "llama-3.1-8b-instant"),
+        timeout=30,
+        total_budget=60,
+        hedge=True,
+    ),
+    "matcher_agent": AgentPolicy(
+        models=("openai/gpt-oss-120b", "openai/gpt-oss-20b"),
+        timeout=45,
+        total_budget=90,
+    ),
+    # one job with several candidates per call: longer output, so a longer per-attempt timeout
+    "packed_matcher_agent": AgentPolicy(
+        models=("openai/gpt-oss-120b", "openai/gpt-oss-20b"),
+        timeout=90,
+        total_budget=150,
+        max_retries=1,
+    ),
+    "interview_email_agent": AgentPolicy(
+        models=("openai/gpt-oss-120b", "openai/gpt-oss-20b"),
+        timeout=30,
+        total_budget=60,
+    ),
+}
+
+
+@dataclass(frozen=True)
+class ModelLimits:
+    rpm: int                        # requests per minute
+    tpm: int                        # tokens per minute
+    concurrency: int = 8            # in-flight calls per worker
+    max_queue: int = 100            # callers allowed to wait for a slot
+    max_wait: float = 120.0         # seconds a caller may wait before giving up
+    output_tokens: int = 1024       # reserved per call for the completion
+
+
+DEFAULT_MODEL_LIMITS = ModelLimits(rpm=30, tpm=6000)
+
+# Provider quotas, shared by every worker through the rate limiter backend.
+MODEL_LIMITS: dict[str, ModelLimits] = {
+    "llama-3.3-70b-versatile": ModelLimits(rpm=30, tpm=12000),
+    "llama-3.1-8b-instant": ModelLimits(rpm=30, tpm=6000),
+    "openai/gpt-oss-120b": ModelLimits(rpm=30, tpm=8000),
+    "openai/gpt-oss-20b": ModelLimits(rpm=30, tpm=8000),
+}
@@ -1,5 +1,6 @@
 from pydantic_ai import Agent
-from pydantic_ai.models.groq import GroqModel
+from app.agents.config import AGENT_POLICIES
+from app.agents.runner import get_model
 from app.schemas import candidate_schema
 from dotenv import load_dotenv
 
@@ -8,10 +9,12 @@ load_dotenv()
 
 cv_agent = Agent(
     name="Profile Extractor",
-    model=GroqModel('llama-3.3-70b-versatile'),
+    model=get_model(AGENT_POLICIES["cv_agent"].models[0]),
     output_type=candidate_schema.CVOutput,
     system_prompt=(
         """Extract candidate details from the given resume.
+        The resume may be split into [Section] blocks, and may start with an "Already extracted:" line;
+        return null for the fields listed there, they are filled in from it.
         Respond ONLY with a valid JSON object that strictly matches this schema:
         {name, email, phone, skills, education, experience, certifications}.
         Each key must be present in the JSON.
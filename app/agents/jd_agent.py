@@ -1,5 +1,6 @@
 from pydantic_ai import Agent
-from pydantic_ai.models.groq import GroqModel
+from app.agents.config import AGENT_POLICIES
+from app.agents.runner import get_model
 from app.schemas import job_schema
 from dotenv import load_dotenv
 
@@ -8,7 +9,7 @@ load_dotenv()
 
 jd_agent = Agent(
     name="JD Summarizer",
-    model =GroqModel('llama-3.3-70b-versatile'),
+    model=get_model(AGENT_POLICIES["jd_agent"].models[0]),
     output_type=job_schema.JDOutput,
     system_prompt=(
         """Extract job details from the given job description.
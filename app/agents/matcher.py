@@ -1,13 +1,15 @@
 from pydantic_ai import Agent
-from pydantic_ai.models.groq import GroqModel
+from app.agents.config import AGENT_POLICIES
+from app.agents.runner import get_model
 from dotenv import load_dotenv
+import re
 from app.schemas import match_schema
 
 load_dotenv()
 
 matcher_agent = Agent(
     name="Matcher Agent",
-    model=GroqModel('openai/gpt-oss-120b'),
+    model=get_model(AGENT_POLICIES["matcher_agent"].models[0]),
     output_type=match_schema.MatchLLMOutput,
     system_prompt=(
         """You are a strict job-candidate matching assistant.\n
@@ -26,4 +28,67 @@ matcher_agent = Agent(
         - Do not output explanations, commentary, or text outside.\n
         - Do not call or use any tool. or function.\n"""
     )
-)
\ No newline at end of file
+)
+
+
+def build_match_payload(job_dict: dict, candidate_dict: dict) -> str:
+    job_text = " | ".join(f"{k}: {v}" for k, v in job_dict.items() if k not in ("id", "title"))
+    cand_text = " | ".join(f"{k}: {v}" for k, v in candidate_dict.items() if k not in ("id", "name"))
+
+    return f"""
+    Job Details:
+    {job_text}
+
+    Candidate Details:
+    {cand_text}
+    """
+
+
+packed_matcher_agent = Agent(
+    name="Packed Matcher Agent",
+    model=get_model(AGENT_POLICIES["packed_matcher_agent"].models[0]),
+    output_type=match_schema.PackedMatchLLMOutput,
+    system_prompt=(
+        """You are a strict job-candidate matching assistant.\n
+        You will be given one job description and several candidate profiles, each starting with its candidate_id.\n\n
+        Your task, for every candidate independently:\n
+        - Compare required vs candidate skills, experience, and education.\n
+        - Return a numeric match_score between 0 and 100.\n
+        - Provide reasoning in 1–2 sentences.\n
+        - Explicitly list only the missing_skills, missing_experience, and missing_education 
+        (as comma-separated text, or null if none).\n
+        - Do not list skills, experience, or education the candidate already has.\n
+        - Output one entry in "matches" per candidate with the exact fields: {candidate_id, match_score, 
+        reasoning, missing_skills, missing_experience, missing_education}.\n
+        - Copy candidate_id exactly as given; do not skip, merge or invent candidates.\n
+        - If there are no missing items, set the value to null.\n
+        - Do not output explanations, commentary, or text outside.\n
+        - Do not call or use any tool. or function.\n"""
+    )
+)
+
+# contact details and names do not affect fit, so packed profiles leave them out
+PACKED_CANDIDATE_FIELDS = ("skills", "experience", "education", "certifications")
+PACKED_FIELD_MAX_CHARS = 600
+
+
+def _compact(value) -> str:
+    text = re.sub(r"\s+", " ", str(value)).strip()
+    return text if len(text) <= PACKED_FIELD_MAX_CHARS else text[:PACKED_FIELD_MAX_CHARS].rstrip() + "…"
+
+
+def build_packed_match_payload(job_dict: dict, candidate_dicts: list[dict]) -> str:
+    job_text = " | ".join(f"{k}: {v}" for k, v in job_dict.items() if k not in ("id", "title", "user_id"))
+    profiles = "\n".join(
+        f"candidate_id: {c['id']} | " + " | ".join(
+            f"{k}: {_compact(c[k])}" for k in PACKED_CANDIDATE_FIELDS if c.get(k))
+        for c in candidate_dicts
+    )
+
+    return f"""
+    Job Details:
+    {job_text}
+
+    Candidates:
+    {profiles}
+    """
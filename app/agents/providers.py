@@ -0,0 +1,61 @@
+import importlib.util
+import os
+from typing import Optional
+
+import httpx
+from dotenv import load_dotenv
+from groq import AsyncGroq
+from pydantic_ai.providers.groq import GroqProvider
+
+load_dotenv()
+
+_http_client: Optional[httpx.AsyncClient] = None
+_groq_provider: Optional[GroqProvider] = None
+
+
+def _env_float(name: str, default: float) -> float:
+    return float(os.getenv(name, default))
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """One pooled client shared by every agent, so bursts reuse warm keep-alive connections."""
+    global _http_client
+    if _http_client is None:
+        _http_client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=int(os.getenv("LLM_HTTP_MAX_CONNECTIONS", 100)),
+                max_keepalive_connections=int(os.getenv("LLM_HTTP_MAX_KEEPALIVE", 20)),
+                keepalive_expiry=_env_float("LLM_HTTP_KEEPALIVE_EXPIRY", 60),
+            ),
+            timeout=httpx.Timeout(
+                connect=_env_float("LLM_HTTP_CONNECT_TIMEOUT", 5),
+                read=_env_float("LLM_HTTP_READ_TIMEOUT", 60),
+                write=_env_float("LLM_HTTP_WRITE_TIMEOUT", 30),
+                pool=_env_float("LLM_HTTP_POOL_TIMEOUT", 10),
+            ),
+            # HTTP/2 multiplexes concurrent calls over one connection; needs the optional h2 package
+            http2=importlib.util.find_spec("h2") is not None,
+        )
+    return _http_client
+
+
+def get_groq_provider() -> GroqProvider:
+    global _groq_provider
+    if _groq_provider is None:
+        # retries are owned by app.agents.runner, so the SDK's own retry loop is disabled
+        client = AsyncGroq(
+            api_key=os.getenv("GROQ_API_KEY"),
+            base_url=os.getenv("GROQ_BASE_URL"),
+            http_client=get_http_client(),
+            max_retries=0,
+        )
+        _groq_provider = GroqProvider(groq_client=client)
+    return _groq_provider
+
+
+async def close_http_client():
+    """Closes the shared client; the next agent call (e.g. after a lifespan restart) opens a new one."""
+    global _http_client, _groq_provider
+    if _http_client is not None:
+        await _http_client.aclose()
+    _http_client = _groq_provider = None
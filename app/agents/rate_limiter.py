@@ -0,0 +1,215 @@
+import asyncio
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import Optional
+
+from dotenv import load_dotenv
+
+from app.agents.config import DEFAULT_MODEL_LIMITS, MODEL_LIMITS, ModelLimits
+from app.tracing import span
+
+load_dotenv()
+
+# per-request accumulator set by the HTTP middleware; agent calls add their queue wait to it
+queue_wait: ContextVar[Optional[dict]] = ContextVar("queue_wait", default=None)
+
+
+class RateLimitQueueFull(Exception):
+    """Raised when a caller cannot get a slot within the bounded queue for a model."""
+
+
+def _refill(tokens: float, updated: float, capacity: float, rate: float, now: float) -> float:
+    return min(capacity, tokens + (now - updated) * rate)
+
+
+class MemoryBucketBackend:
+    """Token buckets held in this process only; fine for a single worker."""
+
+    def __init__(self):
+        self._buckets: dict[str, tuple[float, float]] = {}
+        self._lock = threading.Lock()
+
+    def take(self, requests: list[tuple[str, float, float, float]]) -> float:
+        """Atomically take ``amount`` from every ``(key, capacity, rate, amount)`` bucket,
+        or nothing. Returns 0 on success, otherwise seconds until the take could succeed."""
+        with self._lock:
+            now = time.time()
+            levels, wait = {}, 0.0
+            for key, capacity, rate, amount in requests:
+                tokens, updated = self._buckets.get(key, (capacity, now))
+                levels[key] = _refill(tokens, updated, capacity, rate, now)
+                if levels[key] < amount:
+                    wait = max(wait, (amount - levels[key]) / rate)
+            if wait == 0:
+                for key, _, _, amount in requests:
+                    levels[key] -= amount
+            for key, tokens in levels.items():
+                self._buckets[key] = (tokens, now)
+            return wait
+
+    def debit(self, key: str, capacity: float, rate: float, amount: float):
+        """Take ``amount`` even if that leaves the bucket negative; a negative amount credits it, up to ``capacity``."""
+        with self._lock:
+            now = time.time()
+            tokens, updated = self._buckets.get(key, (capacity, now))
+            self._buckets[key] = (min(capacity, _refill(tokens, updated, capacity, rate, now) - amount), now)
+
+
+class SQLiteBucketBackend:
+    """Token buckets in a SQLite file, so every worker on the host shares one quota.
+    ``BEGIN IMMEDIATE`` takes the database write lock, which serialises updates across processes."""
+
+    def __init__(self, path: str):
+        self.path = path
+        conn = self._connect()
+        try:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS buckets (key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL)"
+            )
+        finally:
+            conn.close()
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=30, isolation_level=None)
+
+    def _update(self, fn):
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            now = time.time()
+
+            def load(key, capacity, rate):
+                row = conn.execute("SELECT tokens, updated FROM buckets WHERE key = ?", (key,)).fetchone()
+                return capacity if row is None else _refill(row[0], row[1], capacity, rate, now)
+
+            levels, result = fn(load)
+            conn.executemany(
+                "INSERT INTO buckets (key, tokens, updated) VALUES (?, ?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET tokens = excluded.tokens, updated = excluded.updated",
+                [(key, tokens, now) for key, tokens in levels.items()],
+            )
+            conn.execute("COMMIT")
+            return result
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+    def take(self, requests: list[tuple[str, float, float, float]]) -> float:
+        def fn(load):
+            levels, wait = {}, 0.0
+            for key, capacity, rate, amount in requests:
+                levels[key] = load(key, capacity, rate)
+                if levels[key] < amount:
+                    wait = max(wait, (amount - levels[key]) / rate)
+            if wait == 0:
+                for key, _, _, amount in requests:
+                    levels[key] -= amount
+            return levels, wait
+
+        return self._update(fn)
+
+    def debit(self, key: str, capacity: float, rate: float, amount: float):
+        self._update(lambda load: ({key: min(capacity, load(key, capacity, rate) - amount)}, None))
+
+
+class RateLimiter:
+    """Requests/min and tokens/min token buckets per model plus a per-worker concurrency cap.
+    Callers queue until capacity frees up; only an over-long queue or wait raises."""
+
+    def __init__(self, backend, limits: Optional[dict[str, ModelLimits]] = None):
+        self.backend = backend
+        self.limits = MODEL_LIMITS if limits is None else limits
+        self._semaphores: dict[str, asyncio.Semaphore] = {}
+        self._waiting: dict[str, int] = {}
+        self.stats: dict[str, dict[str, float]] = {}
+
+    def limits_for(self, model: str) -> ModelLimits:
+        return self.limits.get(model, DEFAULT_MODEL_LIMITS)
+
+    def estimate_tokens(self, model: str, prompt) -> int:
+        return len(str(prompt)) // 4 + self.limits_for(model).output_tokens
+
+    def _buckets(self, model: str, tokens: int):
+        limits = self.limits_for(model)
+        return [
+            (f"{model}:rpm", limits.rpm, limits.rpm / 60, 1),
+            (f"{model}:tpm", limits.tpm, limits.tpm / 60, min(tokens, limits.tpm)),
+        ]
+
+    def _record(self, model: str, waited: float):
+        entry = self.stats.setdefault(model, {"calls": 0, "wait_total": 0.0, "wait_max": 0.0})
+        entry["calls"] += 1
+        entry["wait_total"] += waited
+        entry["wait_max"] = max(entry["wait_max"], waited)
+        current = queue_wait.get()
+        if current is not None:
+            current["seconds"] += waited
+
+    @asynccontextmanager
+    async def limit(self, model: str, tokens: int):
+        if self.backend is None:
+            yield
+            return
+        limits = self.limits_for(model)
+        if self._waiting.get(model, 0) >= limits.max_queue:
+            raise RateLimitQueueFull(f"Too many queued calls for {model}")
+
+        semaphore = self._semaphores.setdefault(model, asyncio.Semaphore(limits.concurrency))
+        started = time.monotonic()
+        deadline = started + limits.max_wait
+        self._waiting[model] = self._waiting.get(model, 0) + 1
+        try:
+            with span("queue", stage="queue", model=model):
+                try:
+                    await asyncio.wait_for(semaphore.acquire(), limits.max_wait)
+                except asyncio.TimeoutError:
+                    raise RateLimitQueueFull(f"Timed out waiting for a {model} slot")
+                try:
+                    while True:
+                        wait = await asyncio.to_thread(self.backend.take, self._buckets(model, tokens))
+                        if wait == 0:
+                            break
+                        if time.monotonic() + wait > deadline:
+                            raise RateLimitQueueFull(f"Rate limit wait for {model} exceeds {limits.max_wait}s")
+                        await asyncio.sleep(wait)
+                except BaseException:
+                    semaphore.release()
+                    raise
+        finally:
+            self._waiting[model] -= 1
+
+        self._record(model, time.monotonic() - started)
+        try:
+            yield
+        finally:
+            semaphore.release()
+
+    async def record_usage(self, model: str, estimated: int, actual: int):
+        """Settle the tpm bucket with the reported tokens: charge what the call used beyond its
+        reservation, or give back the unused part (the reservation assumes the longest completion).
+        A call that reports no usage keeps its reservation."""
+        if self.backend is None or not actual:
+            return
+        limits = self.limits_for(model)
+        reserved = min(estimated, limits.tpm)
+        if actual != reserved:
+            await asyncio.to_thread(self.backend.debit, f"{model}:tpm", limits.tpm, limits.tpm / 60, actual - reserved)
+
+
+def _make_backend():
+    target = os.getenv("RATE_LIMIT_BACKEND", os.path.join(tempfile.gettempdir(), "aptivhire_ratelimit.db"))
+    if target == "off":
+        return None
+    if target == "memory":
+        return MemoryBucketBackend()
+    return SQLiteBucketBackend(target)
+
+
+limiter = RateLimiter(_make_backend())
@@ -0,0 +1,235 @@
+import asyncio
+import random
+import time
+from collections import deque
+from typing import Optional, Union
+
+import httpx
+from pydantic_ai import Agent
+from pydantic_ai.exceptions import ModelHTTPError, UnexpectedModelBehavior
+from pydantic_ai.models import Model
+from pydantic_ai.models.groq import GroqModel
+from pydantic_ai.providers.groq import GroqProvider
+
+from app.agents.config import AGENT_POLICIES, AgentPolicy
+from app.agents.providers import get_groq_provider
+from app.agents.rate_limiter import RateLimitQueueFull, limiter
+from app.tracing import span
+
+RETRYABLE_STATUS = {408, 409, 425, 429, 500, 502, 503, 504}
+
+
+class AgentUnavailableError(Exception):
+    """Raised when every model in an agent's chain failed or the latency budget ran out."""
+
+    def __init__(self, policy_name: str, last_error: Optional[BaseException] = None):
+        self.policy_name = policy_name
+        self.last_error = last_error
+        message = f"{policy_name} is temporarily unavailable"
+        if last_error is not None:
+            message += f": {type(last_error).__name__}: {last_error}"
+        super().__init__(message)
+
+
+class CircuitBreaker:
+    def __init__(self, threshold: int, cooldown: float):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self.probe_started: Optional[float] = None
+
+    def allow(self) -> bool:
+        if self.opened_at is None:
+            return True
+        now = time.monotonic()
+        if now - self.opened_at < self.cooldown:
+            return False
+        # half-open: one probe at a time, until its result closes or re-opens the circuit;
+        # a probe that never reports back (cancelled, non-retryable error) frees the slot after a cooldown
+        if self.probe_started is not None and now - self.probe_started < self.cooldown:
+            return False
+        self.probe_started = now
+        return True
+
+    def record_success(self):
+        self.failures = 0
+        self.opened_at = None
+        self.probe_started = None
+
+    def record_failure(self):
+        self.failures += 1
+        self.probe_started = None
+        if self.failures >= self.threshold:
+            self.opened_at = time.monotonic()
+
+
+class LatencyTracker:
+    def __init__(self, size: int = 200):
+        self.samples = deque(maxlen=size)
+
+    def record(self, seconds: float):
+        self.samples.append(seconds)
+
+    def p95(self) -> Optional[float]:
+        if not self.samples:
+            return None
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+
+
+# by spec: the provider the model was built on, and the model
+_models: dict[str, tuple[GroqProvider, Model]] = {}
+_breakers: dict[str, CircuitBreaker] = {}
+_latencies: dict[str, LatencyTracker] = {}
+
+
+def get_model(spec: Union[str, Model]) -> Model:
+    if isinstance(spec, Model):
+        return spec
+    provider = get_groq_provider()
+    cached = _models.get(spec)
+    if cached is None or cached[0] is not provider:
+        # built again after close_http_client replaced the provider
+        cached = _models[spec] = (provider, GroqModel(spec, provider=provider))
+    return cached[1]
+
+
+def _model_key(spec: Union[str, Model]) -> str:
+    return spec if isinstance(spec, str) else f"{spec.system}:{spec.model_name}"
+
+
+def _breaker(key: str, policy: AgentPolicy) -> CircuitBreaker:
+    if key not in _breakers:
+        _breakers[key] = CircuitBreaker(policy.breaker_threshold, policy.breaker_cooldown)
+    return _breakers[key]
+
+
+def _tracker(key: str) -> LatencyTracker:
+    if key not in _latencies:
+        _latencies[key] = LatencyTracker()
+    return _latencies[key]
+
+
+def is_retryable(exc: BaseException) -> bool:
+    if isinstance(exc, ModelHTTPError):
+        return exc.status_code in RETRYABLE_STATUS
+    return isinstance(exc, (asyncio.TimeoutError, httpx.TransportError, UnexpectedModelBehavior, ConnectionError))
+
+
+def _backoff(policy: AgentPolicy, attempt: int) -> float:
+    # full jitter
+    return random.uniform(0, min(policy.backoff_max, policy.backoff_base * 2 ** attempt))
+
+
+async def _limited_run(agent: Agent, prompt, spec):
+    key = _model_key(spec)
+    tokens = limiter.estimate_tokens(key, prompt)
+    async with limiter.limit(key, tokens):
+        result = await agent.run(prompt, model=get_model(spec))
+    await limiter.record_usage(key, tokens, result.usage().total_tokens or 0)
+    return result
+
+
+async def _hedged(agent: Agent, prompt, spec, hedge_after: float):
+    first = asyncio.create_task(agent.run(prompt, model=get_model(spec)))
+    pending = {first}
+    error = None
+    try:
+        done, _ = await asyncio.wait(pending, timeout=hedge_after)
+        if done:
+            return first.result()
+
+        # the hedge takes its own rate limiter slot
+        pending.add(asyncio.create_task(_limited_run(agent, prompt, spec)))
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    return task.result()
+                error = task.exception()
+        raise error
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+async def _attempt(agent: Agent, prompt, spec, policy: AgentPolicy, timeout: float):
+    key = _model_key(spec)
+    tracker = _tracker(key)
+    hedge_after = policy.hedge_after
+    if hedge_after is None and len(tracker.samples) >= policy.hedge_min_samples:
+        hedge_after = tracker.p95()
+
+    # time spent queued for the rate limiter does not count against the attempt timeout
+    tokens = limiter.estimate_tokens(key, prompt)
+    async with limiter.limit(key, tokens):
+        started = time.monotonic()
+        with span(f"llm {key}", stage="llm", kind="CLIENT", **{"gen_ai.request.model": key}):
+            if policy.hedge and hedge_after is not None and hedge_after < timeout:
+                result = await asyncio.wait_for(_hedged(agent, prompt, spec, hedge_after), timeout)
+            else:
+                result = await asyncio.wait_for(agent.run(prompt, model=get_model(spec)), timeout)
+        tracker.record(time.monotonic() - started)
+    await limiter.record_usage(key, tokens, result.usage().total_tokens or 0)
+    return result
+
+
+_in_flight = 0
+
+
+def in_flight() -> int:
+    return _in_flight
+
+
+async def drain(timeout: float) -> int:
+    """Wait up to ``timeout`` seconds for running agent calls to finish; returns how many are left."""
+    deadline = time.monotonic() + timeout
+    while _in_flight and time.monotonic() < deadline:
+        await asyncio.sleep(0.05)
+    return _in_flight
+
+
+async def run_agent(agent: Agent, prompt, policy: str, policies: Optional[dict[str, AgentPolicy]] = None):
+    """Run ``agent`` under the named policy: per-attempt timeouts, jittered retries,
+    optional hedging, a fallback model chain and a per-model circuit breaker."""
+    global _in_flight
+    _in_flight += 1
+    try:
+        with span(f"agent {policy}", stage="agent"):
+            return await _run_agent(agent, prompt, policy, policies)
+    finally:
+        _in_flight -= 1
+
+
+async def _run_agent(agent: Agent, prompt, policy: str, policies: Optional[dict[str, AgentPolicy]]):
+    config = (policies or AGENT_POLICIES)[policy]
+    deadline = time.monotonic() + config.total_budget
+    last_error: Optional[BaseException] = None
+
+    for spec in config.models:
+        breaker = _breaker(_model_key(spec), config)
+        for attempt in range(config.max_retries + 1):
+            if not breaker.allow():
+                break
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise AgentUnavailableError(policy, last_error or asyncio.TimeoutError())
+            try:
+                result = await _attempt(agent, prompt, spec, config, min(config.timeout, remaining))
+            except RateLimitQueueFull as e:
+                # this model is saturated, move on to the next one in the chain
+                last_error = e
+                break
+            except Exception as e:
+                if not is_retryable(e):
+                    raise
+                breaker.record_failure()
+                last_error = e
+                if attempt < config.max_retries:
+                    await asyncio.sleep(min(_backoff(config, attempt), max(0.0, deadline - time.monotonic())))
+                continue
+            breaker.record_success()
+            return result
+
+    raise AgentUnavailableError(policy, last_error)
@@ -1,5 +1,6 @@
 from pydantic_ai import Agent
-from pydantic_ai.models.groq import GroqModel
+from app.agents.config import AGENT_POLICIES
+from app.agents.runner import get_model
 from dotenv import load_dotenv
 from app.schemas import interview_schema
 
@@ -7,7 +8,7 @@ load_dotenv()
 
 interview_email_agent = Agent(
     name="Interview Email Agent",
-    model=GroqModel('openai/gpt-oss-120b'),
+    model=get_model(AGENT_POLICIES["interview_email_agent"].models[0]),
     output_type=interview_schema.EmailContent,
     system_prompt=(
             """You are an AI-powered interview scheduling assistant.
@@ -45,4 +46,32 @@ interview_email_agent = Agent(
         Your goal is to produce a natural, professional email suitable for sending directly to a candidate.
         """
     )
-)
\ No newline at end of file
+)
+
+
+def build_interview_payload(job_dict: dict, candidate_dict: dict, interview: interview_schema.InterviewPOSTEndpoint) -> str:
+    job_no_id = {k: v for k, v in job_dict.items() if k != "id"}
+    candidate_no_id = {k: v for k, v in candidate_dict.items() if k != "id"}
+
+    job_no_title = {k: v for k, v in job_no_id.items() if k != "title"}
+    candidate_no_name = {k: v for k, v in candidate_no_id.items() if k != "name"}
+
+    job_text = " | ".join(f"{k}: {v}" for k, v in job_no_title.items())
+    cand_text = " | ".join(f"{k}: {v}" for k, v in candidate_no_name.items())
+
+    return f"""
+        Job Details:
+        {job_text}
+
+        Candidate Details:
+        {cand_text}
+        
+        Interview DateTime:
+        {interview.interview_datetime.isoformat()}
+        
+        Interview Duration:
+        {interview.duration_minutes} minutes
+        
+        Interview Format:
+        {interview.interview_format}
+        """
@@ -0,0 +1,250 @@
+"""Re-run cv_agent or matcher_agent over existing rows after a prompt or model change.
+
+    python -m app.backfill candidates --name cv-prompt-v2 --concurrency 4
+    python -m app.backfill matches --name matcher-v2 --user-id 3
+
+    python -m app.backfill candidates --name cv-prompt-v2 --retry-failed
+
+Rows are streamed with a server-side cursor in id order. Each batch is scored concurrently
+and written back through ``crud.py``, one bulk UPDATE per recruiter (row by row if that fails),
+so rescored matches lose their stale flag, matches of re-extracted candidates go stale as after
+an edit, and cached reads are dropped. The highest processed id is
+checkpointed in ``backfill_checkpoints``, so re-running with the same ``--name`` resumes where
+it stopped. Rows that could not be rescored or written are kept in ``backfill_failures``;
+``--retry-failed`` runs only those. Candidates are re-extracted from the stored
+``resume_documents.raw_text``; candidates uploaded before resumes were stored are skipped, and
+fields the agent leaves empty keep their stored value.
+"""
+import argparse
+import asyncio
+import time
+from datetime import datetime, timezone
+from typing import Optional
+
+from sqlalchemy import delete, func, insert, select, update
+
+from app import crud, extraction, models
+from app.agents.matcher import build_match_payload, matcher_agent
+from app.agents.runner import run_agent
+from app.db import SessionLocal
+from app.schemas import candidate_schema, job_schema
+from app.utils.resume_parser import prepare_resume_text
+
+TARGETS = ("candidates", "matches")
+
+
+def source_query(target: str, after_id: int, user_id: Optional[int], row_ids: Optional[list[int]] = None):
+    if target == "candidates":
+        latest_document = (
+            select(func.max(models.ResumeDocument.id))
+            .where(models.ResumeDocument.candidate_id == models.Candidate.id)
+            .correlate(models.Candidate)
+            .scalar_subquery()
+        )
+        stmt = (
+            select(models.Candidate.id, models.Candidate.user_id, models.Candidate.name, models.ResumeDocument.raw_text)
+            .join(models.ResumeDocument, models.ResumeDocument.id == latest_document)
+            .where(models.Candidate.id > after_id)
+            .order_by(models.Candidate.id)
+        )
+        if user_id is not None:
+            stmt = stmt.where(models.Candidate.user_id == user_id)
+        if row_ids is not None:
+            stmt = stmt.where(models.Candidate.id.in_(row_ids))
+    else:
+        stmt = (
+            select(models.Match.id, models.Match.user_id, models.Job, models.Candidate)
+            .join(models.Job, models.Job.id == models.Match.job_id)
+            .join(models.Candidate, models.Candidate.id == models.Match.candidate_id)
+            .where(models.Match.id > after_id)
+            .order_by(models.Match.id)
+        )
+        if user_id is not None:
+            stmt = stmt.where(models.Match.user_id == user_id)
+        if row_ids is not None:
+            stmt = stmt.where(models.Match.id.in_(row_ids))
+    return stmt
+
+
+async def rescore_row(target: str, row) -> dict:
+    """Returns the column values to write back for one source row, keyed by primary key."""
+    if target == "candidates":
+        values = await extraction.extract_cv(prepare_resume_text(row.raw_text))
+        # a field the agent could not find keeps its stored value (name and email are NOT NULL)
+        return {"id": row.id, **{field: value for field, value in values.items() if value is not None}}
+
+    job_dict = job_schema.Job.model_validate(row.Job).model_dump()
+    candidate_dict = candidate_schema.Candidate.model_validate(row.Candidate).model_dump()
+    result = await run_agent(matcher_agent, build_match_payload(job_dict, candidate_dict), policy="matcher_agent")
+    return {"id": row.id, **result.output.model_dump()}
+
+
+def load_checkpoint(name: str, target: str, restart: bool) -> models.BackfillCheckpoint:
+    with SessionLocal() as db:
+        checkpoint = db.query(models.BackfillCheckpoint).filter(models.BackfillCheckpoint.name == name).first()
+        if checkpoint and checkpoint.target != target:
+            raise SystemExit(f"Checkpoint {name!r} belongs to a {checkpoint.target} backfill")
+        if checkpoint is None:
+            checkpoint = models.BackfillCheckpoint(name=name, target=target, last_id=0, processed=0, errors=0)
+            db.add(checkpoint)
+        elif restart:
+            checkpoint.last_id, checkpoint.processed, checkpoint.errors, checkpoint.finished_at = 0, 0, 0, None
+            db.execute(delete(models.BackfillFailure).where(models.BackfillFailure.checkpoint_id == checkpoint.id))
+        db.commit()
+        db.refresh(checkpoint)
+        db.expunge(checkpoint)
+        return checkpoint
+
+
+def failed_row_ids(checkpoint_id: int) -> list[int]:
+    with SessionLocal() as db:
+        return list(db.scalars(select(models.BackfillFailure.row_id)
+                               .where(models.BackfillFailure.checkpoint_id == checkpoint_id)
+                               .order_by(models.BackfillFailure.row_id)))
+
+
+# crud writers taking (db, user_id, [values keyed by id])
+WRITERS = {"candidates": crud.update_extracted_candidates, "matches": crud.update_match_scores}
+
+
+def write_updates(target: str, updates: list[tuple[int, dict]]) -> dict[int, str]:
+    """Writes ``(user_id, values)`` pairs, one bulk UPDATE per recruiter or row by row if that
+    fails; returns the ids not written."""
+    by_user: dict[int, list[dict]] = {}
+    for user_id, values in updates:
+        by_user.setdefault(user_id, []).append(values)
+    write = WRITERS[target]
+    failed = {}
+    with SessionLocal() as writer:
+        for user_id, user_updates in by_user.items():
+            try:
+                write(writer, user_id, user_updates)
+                continue
+            except Exception:
+                writer.rollback()
+            for values in user_updates:
+                try:
+                    write(writer, user_id, [values])
+                except Exception as e:
+                    writer.rollback()
+                    failed[values["id"]] = f"{type(e).__name__}: {e}"
+    return failed
+
+
+def record_batch(checkpoint_id: int, batch, failed: dict[int, str], advance: bool):
+    """Replaces the batch's entries in backfill_failures and, unless retrying, moves the checkpoint past it."""
+    with SessionLocal() as writer:
+        writer.execute(delete(models.BackfillFailure).where(
+            models.BackfillFailure.checkpoint_id == checkpoint_id,
+            models.BackfillFailure.row_id.in_([row.id for row in batch])))
+        if failed:
+            writer.execute(insert(models.BackfillFailure), [
+                {"checkpoint_id": checkpoint_id, "row_id": row_id, "error": error[:1000]} for row_id, error in failed.items()])
+        if advance:
+            writer.execute(
+                update(models.BackfillCheckpoint)
+                .where(models.BackfillCheckpoint.id == checkpoint_id)
+                .values(
+                    last_id=batch[-1].id,
+                    processed=models.BackfillCheckpoint.processed + len(batch),
+                    errors=models.BackfillCheckpoint.errors + len(failed),
+                )
+            )
+        writer.commit()
+
+
+async def run_backfill(target: str, name: str, concurrency: int = 4, batch_size: int = 50,
+                       user_id: Optional[int] = None, limit: Optional[int] = None, restart: bool = False,
+                       retry_failed: bool = False):
+    checkpoint = load_checkpoint(name, target, restart)
+    row_ids = None
+    if retry_failed:
+        row_ids = failed_row_ids(checkpoint.id)
+        print(f"{name}: retrying {len(row_ids)} failed {target}")
+        if not row_ids:
+            return checkpoint
+    elif checkpoint.finished_at and not restart:
+        print(f"{name}: already finished at {checkpoint.finished_at}; pass --restart to run again")
+        return checkpoint
+    else:
+        print(f"{name}: {target} after id {checkpoint.last_id} "
+              f"({checkpoint.processed} done, {checkpoint.errors} errors so far)")
+    semaphore = asyncio.Semaphore(concurrency)
+    failed_ids = []
+    processed = errors = 0
+    started = time.perf_counter()
+
+    async def guarded(row, failed: dict[int, str]):
+        async with semaphore:
+            try:
+                return await rescore_row(target, row)
+            except Exception as e:
+                failed[row.id] = f"{type(e).__name__}: {e}"
+                print(f"  {target[:-1]} {row.id}: {failed[row.id]}")
+                return None
+
+    # the reader keeps its server-side cursor open, so writes go through separate sessions
+    with SessionLocal() as reader:
+        after_id = 0 if retry_failed else checkpoint.last_id
+        stmt = source_query(target, after_id, user_id, row_ids).execution_options(yield_per=batch_size)
+        for batch in reader.execute(stmt).partitions(batch_size):
+            if limit is not None:
+                batch = batch[:max(0, limit - processed)]
+                if not batch:
+                    break
+            failed: dict[int, str] = {}
+            results = await asyncio.gather(*(guarded(row, failed) for row in batch))
+            # a row the database rejects is recorded like an agent failure instead of ending the run
+            written = write_updates(target, [(row.user_id, values) for row, values in zip(batch, results)
+                                             if values is not None])
+            for row_id, error in written.items():
+                print(f"  {target[:-1]} {row_id}: {error}")
+            failed.update(written)
+            record_batch(checkpoint.id, batch, failed, advance=not retry_failed)
+            failed_ids.extend(failed)
+            batch_errors = len(failed)
+
+            processed += len(batch)
+            errors += batch_errors
+            elapsed = time.perf_counter() - started
+            print(f"  up to id {batch[-1].id}: {processed} rows, {errors} errors, {processed / elapsed:.2f} rows/s")
+
+    finished = limit is None or processed < limit
+    with SessionLocal() as writer:
+        if finished and not retry_failed:
+            writer.execute(
+                update(models.BackfillCheckpoint)
+                .where(models.BackfillCheckpoint.id == checkpoint.id)
+                .values(finished_at=datetime.now(timezone.utc))
+            )
+            writer.commit()
+        checkpoint = writer.get(models.BackfillCheckpoint, checkpoint.id)
+
+    elapsed = time.perf_counter() - started
+    print(f"{name}: {processed} rows in {elapsed:.1f}s ({processed / elapsed if elapsed else 0:.2f} rows/s), "
+          f"{errors} errors{'' if finished else ', stopped at --limit'}")
+    if failed_ids:
+        print(f"failed ids: {failed_ids[:50]}{' ...' if len(failed_ids) > 50 else ''}; "
+              f"rerun with --retry-failed to try them again")
+    return checkpoint
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("target", choices=TARGETS)
+    parser.add_argument("--name", required=True, help="checkpoint name; reuse it to resume an interrupted run")
+    parser.add_argument("--concurrency", type=int, default=4, help="agent calls in flight at once")
+    parser.add_argument("--batch-size", type=int, default=50, help="rows per fetch, update and checkpoint")
+    parser.add_argument("--user-id", type=int, help="only backfill this recruiter's rows")
+    parser.add_argument("--limit", type=int, help="stop after this many rows (the run stays resumable)")
+    parser.add_argument("--restart", action="store_true", help="ignore the saved checkpoint and start over")
+    parser.add_argument("--retry-failed", action="store_true", help="only rerun the rows this run failed on")
+    args = parser.parse_args(argv)
+    if args.restart and args.retry_failed:
+        parser.error("--restart drops the failed rows; use one or the other")
+    asyncio.run(run_backfill(args.target, args.name, args.concurrency, args.batch_size,
+                             args.user_id, args.limit, args.restart, args.retry_failed))
+
+
+if __name__ == "__main__":
+    main()
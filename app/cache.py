@@ -0,0 +1,161 @@
+"""Per-user cache with LRU eviction and TTL expiry, in-process or shared through Redis.
+
+Entries are keyed by the user's generation number; ``invalidate_user`` bumps it, which makes
+every cached value for that user unreachable at once. The write paths in ``crud.py`` call it,
+so cached reads never outlive a write made through this worker.
+
+CACHE_BACKEND=memory (default) keeps entries and generations per worker: writes made by other
+workers or processes are only picked up when the TTL runs out, so under several workers the
+server profile caps it at CACHE_MULTI_WORKER_TTL_SECONDS (see ``limit_ttl_for_workers``).
+CACHE_BACKEND=redis (needs the ``redis`` package and CACHE_REDIS_URL) shares both, so a write
+is seen by every worker at once and the full TTL is kept.
+"""
+import logging
+import math
+import os
+import pickle
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+CACHE_TTL_SECONDS = float(os.getenv("CACHE_TTL_SECONDS", 60))
+CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", 10000))
+# longest a worker may serve data another worker has already overwritten, with the in-process cache
+CACHE_MULTI_WORKER_TTL_SECONDS = float(os.getenv("CACHE_MULTI_WORKER_TTL_SECONDS", 2))
+
+_MISSING = object()
+
+
+class TTLCache:
+    def __init__(self, max_entries: int = CACHE_MAX_ENTRIES, ttl: float = CACHE_TTL_SECONDS):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._generations: dict[int, int] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default=None):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return default
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return default
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value, ttl: float = None):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + (self.ttl if ttl is None else ttl), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def generation(self, user_id: int) -> int:
+        return self._generations.get(user_id, 0)
+
+    def bump_generation(self, user_id: int):
+        with self._lock:
+            self._generations[user_id] = self._generations.get(user_id, 0) + 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class RedisCache:
+    """Entries and generations in Redis, shared by every worker. Values are pickled, so
+    the Redis instance must only be reachable by this app.
+
+    A Redis outage degrades to cache misses (reads go to the database) rather than errors."""
+
+    def __init__(self, url: str, ttl: float = CACHE_TTL_SECONDS, prefix: str = "aptivhire:cache:"):
+        import redis
+
+        self.client = redis.Redis.from_url(url)
+        self.ttl = ttl
+        self.prefix = prefix
+        self._errors = redis.RedisError
+
+    def _key(self, key: Hashable) -> str:
+        # keys are tuples of ints and strings, whose repr is stable across processes
+        return self.prefix + repr(key)
+
+    def get(self, key: Hashable, default=None):
+        try:
+            raw = self.client.get(self._key(key))
+        except self._errors as e:
+            logger.warning("cache read failed: %s", e)
+            return default
+        return default if raw is None else pickle.loads(raw)
+
+    def set(self, key: Hashable, value, ttl: float = None):
+        try:
+            self.client.set(self._key(key), pickle.dumps(value), ex=max(1, math.ceil(self.ttl if ttl is None else ttl)))
+        except self._errors as e:
+            logger.warning("cache write failed: %s", e)
+
+    def generation(self, user_id: int) -> int:
+        try:
+            return int(self.client.get(f"{self.prefix}gen:{user_id}") or 0)
+        except self._errors as e:
+            logger.warning("cache read failed: %s", e)
+            return -1    # an unreadable generation never matches a stored entry's key
+
+    def bump_generation(self, user_id: int):
+        try:
+            self.client.incr(f"{self.prefix}gen:{user_id}")
+        except self._errors as e:
+            # other workers keep serving this user's entries until CACHE_TTL_SECONDS runs out
+            logger.error("cache invalidation for user %s failed: %s", user_id, e)
+
+    def clear(self):
+        for key in self.client.scan_iter(match=self.prefix + "*"):
+            self.client.delete(key)
+
+
+def _make_cache():
+    if os.getenv("CACHE_BACKEND") == "redis":
+        return RedisCache(os.getenv("CACHE_REDIS_URL", "redis://localhost:6379/0"))
+    return TTLCache()
+
+
+cache = _make_cache()
+
+
+def limit_ttl_for_workers(workers: int) -> bool:
+    """Caps the in-process cache's TTL when ``workers`` processes serve the app, since an
+    invalidation only reaches the worker that made the write. Returns whether it was capped."""
+    if workers <= 1 or not isinstance(cache, TTLCache) or cache.ttl <= CACHE_MULTI_WORKER_TTL_SECONDS:
+        return False
+    cache.ttl = CACHE_MULTI_WORKER_TTL_SECONDS
+    return True
+
+
+def user_generation(user_id: int) -> int:
+    return cache.generation(int(user_id))
+
+
+def invalidate_user(user_id: int):
+    cache.bump_generation(int(user_id))
+
+
+def cached(user_id: int, key: Hashable, loader: Callable[[], Any], ttl: float = None):
+    """Return the cached value for (user, key), calling ``loader`` on a miss."""
+    generation = user_generation(user_id)
+    full_key = (int(user_id), generation, key)
+    value = cache.get(full_key, _MISSING) if generation >= 0 else _MISSING
+    if value is _MISSING:
+        value = loader()
+        if generation >= 0:
+            cache.set(full_key, value, ttl)
+    return value
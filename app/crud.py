@@ -1,5 +1,8 @@
-from sqlalchemy.orm import Session
-from app import models
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import insert, select, update, delete, literal, and_, func, case, text
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, load_only
+from app import models, cache
 from app.schemas import job_schema,candidate_schema,match_schema,interview_schema, auth_schema
 from app.auth import hash_password
 
@@ -30,16 +33,63 @@ def create_job(db:Session, job:job_schema.JobBase):
     )
     db.add(db_job)
     db.commit()
+    cache.invalidate_user(job.user_id)
     db.refresh(db_job)
     return db_job
 
+def bulk_create_jobs(db: Session, jobs: list[job_schema.JobBase]) -> list[int]:
+    # one multi-row INSERT ... RETURNING per call, committed as a single transaction
+    ids = db.scalars(insert(models.Job).returning(models.Job.id), [job.model_dump() for job in jobs]).all()
+    db.commit()
+    for user_id in {job.user_id for job in jobs}:
+        cache.invalidate_user(user_id)
+    return list(ids)
+
 
-def get_jobs(db: Session,user_id: int,skip: int=0,limit: int=100):
-    return db.query(models.Job).filter(models.Job.user_id==user_id).offset(skip).limit(limit).all()
+def _only(query, model, columns: list[str]=None):
+    # unlisted columns are not selected; touching one raises instead of lazy-loading it row by row
+    if columns is None:
+        return query
+    return query.options(load_only(*(getattr(model, name) for name in columns), raiseload=True))
+
+def get_jobs(db: Session,user_id: int,skip: int=0,limit: int=100,columns: list[str]=None):
+    return _only(db.query(models.Job), models.Job, columns).filter(models.Job.user_id==user_id).offset(skip).limit(limit).all()
 
 def get_job_by_id(db: Session, user_id: int,job_id: int):
     return db.query(models.Job).filter(models.Job.id == job_id,models.Job.user_id==user_id).first()
 
+# Fields that feed the matcher prompt; editing any of them makes existing scores stale.
+# The rest (title, name, email, phone) are cosmetic and only copied onto denormalized columns.
+JOB_MATCH_FIELDS = {"summary", "skills", "experience_required", "education_required", "responsibilities"}
+CANDIDATE_MATCH_FIELDS = {"skills", "education", "experience", "certifications"}
+
+def _apply_changes(row, changes: dict) -> list[str]:
+    changed = [field for field, value in changes.items() if getattr(row, field) != value]
+    for field in changed:
+        setattr(row, field, changes[field])
+    return changed
+
+def update_job(db: Session, user_id: int, job_id: int, changes: dict):
+    """Applies ``changes`` and marks dependent matches stale; returns (job, changed_fields, stale_matches).
+
+    Returns None when the job does not exist."""
+    db_job = get_job_by_id(db=db, user_id=user_id, job_id=job_id)
+    if not db_job:
+        return None
+    changed = _apply_changes(db_job, changes)
+    stale = 0
+    if JOB_MATCH_FIELDS.intersection(changed):
+        stale = db.execute(update(models.Match).where(
+            models.Match.job_id == job_id, models.Match.user_id == user_id).values(is_stale=True)).rowcount
+    if "title" in changed:
+        for model in (models.Match, models.Interview):
+            db.execute(update(model).where(model.job_id == job_id, model.user_id == user_id).values(job_title=db_job.title))
+    if changed:
+        db.commit()
+        cache.invalidate_user(user_id)
+        db.refresh(db_job)
+    return db_job, changed, stale
+
 
 # Candidate CRUD
 def create_candidate(db: Session,candidate:candidate_schema.CandidateBase):
@@ -55,15 +105,96 @@ def create_candidate(db: Session,candidate:candidate_schema.CandidateBase):
     )
     db.add(db_candidate)
     db.commit()
+    cache.invalidate_user(candidate.user_id)
     db.refresh(db_candidate)
     return db_candidate
 
-def get_candidates(db: Session,user_id: int,skip: int=0,limit: int=100):
-    return db.query(models.Candidate).filter(models.Candidate.user_id==user_id).offset(skip).limit(limit).all()
+def create_candidate_with_document(db: Session, candidate: candidate_schema.CandidateBase,
+                                   document: candidate_schema.ResumeDocumentBase) -> candidate_schema.Candidate:
+    """Stores a candidate and the resume it was extracted from in one transaction."""
+    db_candidate = models.Candidate(**candidate.model_dump())
+    db.add(db_candidate)
+    db.flush()
+    db.add(models.ResumeDocument(**document.model_dump(exclude={"candidate_id"}), candidate_id=db_candidate.id))
+    # serialised before the commit, which would expire the row and force a reload
+    created = candidate_schema.Candidate.model_validate(db_candidate)
+    db.commit()
+    cache.invalidate_user(candidate.user_id)
+    return created
+
+def bulk_create_candidates(db: Session, candidates: list[candidate_schema.CandidateBase]) -> list[int]:
+    ids = db.scalars(insert(models.Candidate).returning(models.Candidate.id), [c.model_dump() for c in candidates]).all()
+    db.commit()
+    for user_id in {c.user_id for c in candidates}:
+        cache.invalidate_user(user_id)
+    return list(ids)
+
+def get_candidates(db: Session,user_id: int,skip: int=0,limit: int=100,columns: list[str]=None):
+    return _only(db.query(models.Candidate), models.Candidate, columns).filter(models.Candidate.user_id==user_id).offset(skip).limit(limit).all()
 
 def get_candidates_by_id(db:Session,user_id: int,candidate_id: int):
     return db.query(models.Candidate).filter(models.Candidate.id == candidate_id,models.Candidate.user_id==user_id).first()
 
+def update_candidate(db: Session, user_id: int, candidate_id: int, changes: dict):
+    """Same as ``update_job``, for a candidate."""
+    db_candidate = get_candidates_by_id(db=db, user_id=user_id, candidate_id=candidate_id)
+    if not db_candidate:
+        return None
+    changed = _apply_changes(db_candidate, changes)
+    stale = 0
+    if CANDIDATE_MATCH_FIELDS.intersection(changed):
+        stale = db.execute(update(models.Match).where(
+            models.Match.candidate_id == candidate_id, models.Match.user_id == user_id).values(is_stale=True)).rowcount
+    if "name" in changed:
+        for model in (models.Match, models.Interview):
+            db.execute(update(model).where(model.candidate_id == candidate_id, model.user_id == user_id)
+                       .values(candidate_name=db_candidate.name))
+    if changed:
+        db.commit()
+        cache.invalidate_user(user_id)
+        db.refresh(db_candidate)
+    return db_candidate, changed, stale
+
+def update_extracted_candidates(db: Session, user_id: int, updates: list[dict]):
+    """Writes re-extracted candidates (dicts keyed by ``id``) in one bulk UPDATE, with the rules of
+    ``update_candidate``: their matches go stale when a matched field changed, and a new name is
+    copied to their matches and interviews. Ids of other recruiters' candidates are skipped."""
+    table = models.Candidate.__table__
+    stored = {row.id: row for row in db.execute(select(table).where(
+        table.c.user_id == user_id, table.c.id.in_([values["id"] for values in updates])))}
+    updates = [values for values in updates if values["id"] in stored]
+    if not updates:
+        return
+    db.execute(update(models.Candidate), updates)
+    stale, renamed = [], {}
+    for values in updates:
+        row = stored[values["id"]]
+        changed = {field for field, value in values.items() if getattr(row, field) != value}
+        if CANDIDATE_MATCH_FIELDS.intersection(changed):
+            stale.append(row.id)
+        if "name" in changed:
+            renamed[row.id] = values["name"]
+    if stale:
+        db.execute(update(models.Match).where(
+            models.Match.candidate_id.in_(stale), models.Match.user_id == user_id).values(is_stale=True))
+    for candidate_id, name in renamed.items():
+        for model in (models.Match, models.Interview):
+            db.execute(update(model).where(model.candidate_id == candidate_id, model.user_id == user_id)
+                       .values(candidate_name=name))
+    db.commit()
+    cache.invalidate_user(user_id)
+
+
+# Resume document CRUD
+def get_resume_document_by_sha(db: Session, user_id: int, sha256: str):
+    return db.query(models.ResumeDocument).filter(
+        models.ResumeDocument.sha256 == sha256, models.ResumeDocument.user_id == user_id).first()
+
+def get_resume_document_by_candidate_id(db: Session, user_id: int, candidate_id: int):
+    return db.query(models.ResumeDocument).filter(
+        models.ResumeDocument.candidate_id == candidate_id, models.ResumeDocument.user_id == user_id
+    ).order_by(models.ResumeDocument.id.desc()).first()
+
 
 # Match CRUD
 def create_match(db: Session, match: match_schema.MatchBase):
@@ -80,12 +211,47 @@ def create_match(db: Session, match: match_schema.MatchBase):
         missing_education = match.missing_education
     )
     db.add(db_match)
-    db.commit()
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        # a batch or auto-match stored the pair first; anything else (a missing job or candidate) is raised
+        existing = get_matches_by_job_and_candidate_id(db=db, user_id=match.user_id, job_id=match.job_id, candidate_id=match.candidate_id)
+        if existing is None:
+            raise
+        return existing
+    cache.invalidate_user(match.user_id)
     db.refresh(db_match)
     return db_match
 
-def get_matches(db: Session,user_id: int,skip: int=0,limit: int=100):
-    return db.query(models.Match).filter(models.Match.user_id==user_id).offset(skip).limit(limit).all()
+def _insert_skipping_stored_pairs(db: Session):
+    """INSERT into matches that skips (user_id, job_id, candidate_id) pairs already stored."""
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    else:
+        return insert(models.Match.__table__)
+    return dialect_insert(models.Match.__table__).on_conflict_do_nothing(
+        index_elements=["user_id", "job_id", "candidate_id"])
+
+def bulk_create_matches(db: Session, matches: list[match_schema.MatchBase]) -> list[match_schema.Match]:
+    """Stores ``matches`` and returns the stored ones; pairs that already have a match are skipped."""
+    if not matches:
+        return []
+    # one INSERT ... RETURNING: a Core insert with the same keys on every row is never split up,
+    # and the returned rows are converted before the commit (ORM rows would be expired by it)
+    table = models.Match.__table__
+    rows = db.execute(_insert_skipping_stored_pairs(db).returning(*table.c),
+                      [{**m.model_dump(), "is_stale": False} for m in matches]).all()
+    created = [match_schema.Match.model_validate(row._mapping) for row in sorted(rows, key=lambda row: row.id)]
+    db.commit()
+    cache.invalidate_user(matches[0].user_id)
+    return created
+
+def get_matches(db: Session,user_id: int,skip: int=0,limit: int=100,columns: list[str]=None):
+    return _only(db.query(models.Match), models.Match, columns).filter(models.Match.user_id==user_id).offset(skip).limit(limit).all()
 
 def get_matches_by_job_and_candidate_id(db:Session,user_id: int,job_id: int, candidate_id: int):
     return db.query(models.Match).filter(
@@ -93,8 +259,106 @@ def get_matches_by_job_and_candidate_id(db:Session,user_id: int,job_id: int, can
             models.Match.candidate_id == candidate_id,models.Match.user_id==user_id).first()
 
 
+def claim_match(db: Session, user_id: int, job_id: int, candidate_id: int, stale_after: float) -> bool:
+    """Claims the pair for one matcher call; False while another worker holds a claim younger than ``stale_after`` seconds."""
+    now = datetime.now(timezone.utc)
+    for _ in range(2):
+        db.add(models.MatchClaim(user_id=user_id, job_id=job_id, candidate_id=candidate_id, created_at=now))
+        try:
+            db.commit()
+            return True
+        except IntegrityError:
+            db.rollback()
+        # a claim left behind by a worker that died mid-call is taken over
+        taken_over = db.execute(delete(models.MatchClaim).where(
+            models.MatchClaim.user_id == user_id,
+            models.MatchClaim.job_id == job_id,
+            models.MatchClaim.candidate_id == candidate_id,
+            models.MatchClaim.created_at < now - timedelta(seconds=stale_after),
+        )).rowcount
+        db.commit()
+        if not taken_over:
+            return False
+    return False
+
+def release_match_claim(db: Session, user_id: int, job_id: int, candidate_id: int):
+    db.execute(delete(models.MatchClaim).where(
+        models.MatchClaim.user_id == user_id,
+        models.MatchClaim.job_id == job_id,
+        models.MatchClaim.candidate_id == candidate_id,
+    ))
+    db.commit()
+
+def get_unmatched_jobs(db: Session, user_id: int, candidate_id: int):
+    """The recruiter's jobs that have no match with this candidate yet."""
+    matched = select(models.Match.id).where(
+        models.Match.job_id == models.Job.id, models.Match.candidate_id == candidate_id, models.Match.user_id == user_id)
+    return db.query(models.Job).filter(models.Job.user_id == user_id, ~matched.exists()).order_by(models.Job.id).all()
+
+def get_unmatched_candidates(db: Session, user_id: int, job_id: int, candidate_ids: list[int]=None, limit: int=None):
+    """The recruiter's candidates (optionally only ``candidate_ids``, at most ``limit``) with no match for this job yet."""
+    matched = select(models.Match.id).where(
+        models.Match.candidate_id == models.Candidate.id, models.Match.job_id == job_id, models.Match.user_id == user_id)
+    query = db.query(models.Candidate).filter(models.Candidate.user_id == user_id, ~matched.exists())
+    if candidate_ids is not None:
+        query = query.filter(models.Candidate.id.in_(candidate_ids))
+    return query.order_by(models.Candidate.id).limit(limit).all()
+
+def get_stale_matches(db: Session, user_id: int, job_id: int=None, candidate_id: int=None):
+    """Stale matches with their job and candidate, as (Match, Job, Candidate) rows."""
+    stmt = (
+        select(models.Match, models.Job, models.Candidate)
+        .join(models.Job, models.Job.id == models.Match.job_id)
+        .join(models.Candidate, models.Candidate.id == models.Match.candidate_id)
+        .where(models.Match.user_id == user_id, models.Match.is_stale.is_(True))
+        .order_by(models.Match.id)
+    )
+    if job_id is not None:
+        stmt = stmt.where(models.Match.job_id == job_id)
+    if candidate_id is not None:
+        stmt = stmt.where(models.Match.candidate_id == candidate_id)
+    return db.execute(stmt).all()
+
+def update_match_scores(db: Session, user_id: int, scores: list[dict]):
+    """Writes re-scored matches (dicts keyed by ``id``) in one bulk UPDATE and clears their stale flag."""
+    if not scores:
+        return
+    # user_id in the WHERE clause lets Postgres go straight to the recruiter's partition
+    db.execute(update(models.Match).where(models.Match.user_id == user_id).execution_options(synchronize_session=None),
+               [{**score, "is_stale": False} for score in scores])
+    db.commit()
+    cache.invalidate_user(user_id)
+
+
+def _context_query(user_id: int, job_id: int, candidate_id: int, existing):
+    # anchor on a one-row select so every part is an outer join and missing rows come back as None
+    anchor = select(literal(1).label("anchor")).subquery()
+    return (
+        select(models.Job, models.Candidate, existing)
+        .select_from(anchor)
+        .outerjoin(models.Job, and_(models.Job.id == job_id, models.Job.user_id == user_id))
+        .outerjoin(models.Candidate, and_(models.Candidate.id == candidate_id, models.Candidate.user_id == user_id))
+        .outerjoin(existing, and_(existing.job_id == job_id, existing.candidate_id == candidate_id, existing.user_id == user_id))
+        .limit(1)
+    )
+
+def get_match_context(db: Session, user_id: int, job_id: int, candidate_id: int):
+    """Returns (job, candidate, existing_match) in one round trip; each is None when missing."""
+    return tuple(db.execute(_context_query(user_id, job_id, candidate_id, models.Match)).one())
+
+
 # Interview CRUD
-def create_interview(db: Session,interview: interview_schema.InterviewBase):
+# pg_advisory_xact_lock(CALENDAR_LOCK_KEY, user_id) serializes one recruiter's bookings
+CALENDAR_LOCK_KEY = 720932
+
+def lock_calendar(db: Session, user_id: int):
+    """Holds the recruiter's calendar until the transaction ends. Postgres only: on SQLite the
+    write lock taken by the insert already serializes bookings."""
+    if db.get_bind().dialect.name == "postgresql":
+        db.execute(text("SELECT pg_advisory_xact_lock(:key, :user_id)"), {"key": CALENDAR_LOCK_KEY, "user_id": user_id})
+
+def add_interview(db: Session,interview: interview_schema.InterviewBase):
+    """Inserts the interview without committing: the caller checks for overlaps in the same transaction."""
     db_interview = models.Interview(
         user_id= interview.user_id,
         candidate_id = interview.candidate_id,
@@ -103,18 +367,153 @@ def create_interview(db: Session,interview: interview_schema.InterviewBase):
         job_title = interview.job_title,
         interview_time = interview.interview_time,
         format = interview.format,
-        invite_email = interview.invite_email
+        invite_email = interview.invite_email,
+        duration_minutes = interview.duration_minutes
     )
 
     db.add(db_interview)
-    db.commit()
-    db.refresh(db_interview)
+    db.flush()
     return db_interview
 
+def delete_interview(db: Session, user_id: int, interview_id: int):
+    db.execute(delete(models.Interview).where(models.Interview.id == interview_id, models.Interview.user_id == user_id))
+    db.commit()
+    cache.invalidate_user(user_id)
+
 def get_interviews(db: Session,user_id: int,skip: int=0,limit: int=100):
     return db.query(models.Interview).filter(models.Interview.user_id==user_id).offset(skip).limit(limit).all()
 
+def get_interview_intervals(db: Session, user_id: int):
+    """(interview_time, duration_minutes) of all the recruiter's interviews, read off the (user_id, interview_time) index."""
+    return db.execute(
+        select(models.Interview.interview_time, models.Interview.duration_minutes)
+        .where(models.Interview.user_id == user_id)
+        .order_by(models.Interview.interview_time)
+    ).all()
+
+def get_interviews_starting_between(db: Session, user_id: int, after, before):
+    return db.query(models.Interview).filter(
+        models.Interview.user_id == user_id,
+        models.Interview.interview_time > after,
+        models.Interview.interview_time < before,
+    ).order_by(models.Interview.interview_time).all()
+
+def get_interview_context(db: Session, user_id: int, job_id: int, candidate_id: int):
+    """Returns (job, candidate, existing_interview) in one round trip; each is None when missing."""
+    return tuple(db.execute(_context_query(user_id, job_id, candidate_id, models.Interview)).one())
+
 def get_interviews_by_job_and_candidate_id(db:Session,user_id: int,job_id: int,candidate_id: int):
     return db.query(models.Interview).filter(
         models.Interview.job_id == job_id,
-        models.Interview.candidate_id == candidate_id,models.Interview.user_id==user_id).first()
\ No newline at end of file
+        models.Interview.candidate_id == candidate_id,models.Interview.user_id==user_id).first()
+
+
+# Export streams: rows are fetched through a server-side cursor in batches of yield_per
+def _match_filters(query, job_id=None, min_score=None, max_score=None):
+    if job_id is not None:
+        query = query.filter(models.Match.job_id == job_id)
+    if min_score is not None:
+        query = query.filter(models.Match.match_score >= min_score)
+    if max_score is not None:
+        query = query.filter(models.Match.match_score <= max_score)
+    return query
+
+def stream_candidates(db: Session, user_id: int, job_id=None, min_score=None, max_score=None, yield_per: int=500):
+    query = db.query(models.Candidate).filter(models.Candidate.user_id==user_id)
+    if job_id is not None or min_score is not None or max_score is not None:
+        matched = _match_filters(
+            db.query(models.Match.id).filter(models.Match.candidate_id==models.Candidate.id,models.Match.user_id==user_id),
+            job_id, min_score, max_score)
+        query = query.filter(matched.exists())
+    return query.order_by(models.Candidate.id).yield_per(yield_per)
+
+def stream_matches(db: Session, user_id: int, job_id=None, min_score=None, max_score=None, yield_per: int=500):
+    query = _match_filters(db.query(models.Match).filter(models.Match.user_id==user_id), job_id, min_score, max_score)
+    return query.order_by(models.Match.id).yield_per(yield_per)
+
+def stream_interviews(db: Session, user_id: int, job_id=None, min_score=None, max_score=None, yield_per: int=500):
+    query = db.query(models.Interview).filter(models.Interview.user_id==user_id)
+    if job_id is not None:
+        query = query.filter(models.Interview.job_id==job_id)
+    if min_score is not None or max_score is not None:
+        matched = _match_filters(
+            db.query(models.Match.id).filter(
+                models.Match.job_id==models.Interview.job_id,
+                models.Match.candidate_id==models.Interview.candidate_id,
+                models.Match.user_id==user_id),
+            None, min_score, max_score)
+        query = query.filter(matched.exists())
+    return query.order_by(models.Interview.id).yield_per(yield_per)
+
+
+# Analytics: aggregated in SQL, so the cost does not grow with what is sent to the client
+SCORE_BUCKET_WIDTH = 10
+
+def _score_bucket():
+    # a CASE ladder instead of floor()/CAST, which round differently on SQLite and Postgres
+    last = 100 // SCORE_BUCKET_WIDTH - 1
+    return case(
+        *[(models.Match.match_score < (i + 1) * SCORE_BUCKET_WIDTH, i) for i in range(last)],
+        else_=last,
+    ).label("bucket")
+
+def get_analytics_totals(db: Session, user_id: int):
+    def count(model):
+        return select(func.count()).select_from(model).where(model.user_id == user_id).scalar_subquery()
+    return db.execute(select(
+        count(models.Job).label("jobs"),
+        count(models.Candidate).label("candidates"),
+        count(models.Match).label("matches"),
+        count(models.Interview).label("interviews"),
+        select(func.avg(models.Match.match_score)).where(models.Match.user_id == user_id).scalar_subquery().label("avg_match_score"),
+    )).one()
+
+def get_job_analytics(db: Session, user_id: int):
+    match_stats = (
+        select(
+            models.Match.job_id,
+            func.count(func.distinct(models.Match.candidate_id)).label("candidates"),
+            func.avg(models.Match.match_score).label("avg_match_score"),
+            func.max(models.Match.match_score).label("max_match_score"),
+        )
+        .where(models.Match.user_id == user_id)
+        .group_by(models.Match.job_id)
+        .subquery()
+    )
+    interview_stats = (
+        select(models.Interview.job_id, func.count().label("interviews"))
+        .where(models.Interview.user_id == user_id)
+        .group_by(models.Interview.job_id)
+        .subquery()
+    )
+    return db.execute(
+        select(
+            models.Job.id.label("job_id"),
+            models.Job.title,
+            func.coalesce(match_stats.c.candidates, 0).label("candidates"),
+            match_stats.c.avg_match_score,
+            match_stats.c.max_match_score,
+            func.coalesce(interview_stats.c.interviews, 0).label("interviews"),
+        )
+        .outerjoin(match_stats, match_stats.c.job_id == models.Job.id)
+        .outerjoin(interview_stats, interview_stats.c.job_id == models.Job.id)
+        .where(models.Job.user_id == user_id)
+        .order_by(models.Job.id)
+    ).all()
+
+def get_score_distribution(db: Session, user_id: int):
+    bucket = _score_bucket()
+    return db.execute(
+        select(bucket, func.count().label("count"))
+        .where(models.Match.user_id == user_id)
+        .group_by(bucket)
+        .order_by(bucket)
+    ).all()
+
+def get_interview_format_counts(db: Session, user_id: int):
+    return db.execute(
+        select(models.Interview.format, func.count().label("count"))
+        .where(models.Interview.user_id == user_id)
+        .group_by(models.Interview.format)
+        .order_by(models.Interview.format)
+    ).all()
@@ -1,7 +1,8 @@
-from sqlalchemy import create_engine, event
+from sqlalchemy import create_engine, event, text
 from sqlalchemy.engine import Engine
 from sqlalchemy.orm import sessionmaker, declarative_base
 import os
+from contextlib import contextmanager
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -10,7 +11,17 @@ DATABASE_URL = os.getenv(
     "DATABASE_URL"
 )
 
-engine = create_engine(DATABASE_URL,echo=True)
+connect_args = {"check_same_thread": False} if DATABASE_URL.startswith("sqlite") else {}
+
+engine = create_engine(DATABASE_URL,echo=os.getenv("DB_ECHO","true").lower()=="true",connect_args=connect_args)
+
+if DATABASE_URL.startswith("sqlite"):
+    # WAL lets a long-running reader (e.g. a streaming cursor) coexist with writers
+    @event.listens_for(engine, "connect")
+    def set_sqlite_pragma(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.close()
 
 if os.getenv("DB_ENV") == "neon":
     @event.listens_for(Engine, "connect")
@@ -29,4 +40,47 @@ def get_db():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+
+# arbitrary app-wide key for pg_advisory_lock
+INIT_LOCK_KEY = 720931
+
+@contextmanager
+def _sqlite_init_lock():
+    path = engine.url.database
+    try:
+        import fcntl
+    except ImportError:    # Windows: dev only, run a single worker
+        fcntl = None
+    if fcntl is None or not path or path == ":memory:":
+        yield
+        return
+    with open(f"{path}.init-lock", "w") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+def init_db():
+    """Create missing tables, one process at a time.
+
+    Called by the gunicorn master before workers fork and by each app's startup; the
+    lock keeps workers (or replicas sharing a Postgres) from racing on CREATE TABLE.
+    Alembic stays the tool for changing existing tables.
+    """
+    from app import models  # noqa: F401  registers the tables on Base.metadata
+
+    if engine.dialect.name == "postgresql":
+        with engine.connect() as conn:
+            conn.execute(text("SELECT pg_advisory_lock(:key)"), {"key": INIT_LOCK_KEY})
+            try:
+                Base.metadata.create_all(bind=conn)
+                conn.commit()
+            finally:
+                conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": INIT_LOCK_KEY})
+                conn.commit()
+    else:
+        with _sqlite_init_lock():
+            Base.metadata.create_all(bind=engine)
@@ -0,0 +1,190 @@
+"""Structured extraction from resumes and job descriptions, chunked when the text is long.
+
+Inputs up to EXTRACTION_CHUNK_THRESHOLD characters go to the agent in one call, as before.
+Longer ones are cut on section and page boundaries into chunks of about EXTRACTION_CHUNK_CHARS,
+the chunks are extracted concurrently, and the partial outputs are merged field by field in
+document order:
+
+FIRST   the first non-null value (name, title: the top of the document wins)
+LIST    the ordered union of comma/semicolon separated items (skills, certifications)
+TEXT    the distinct non-null values joined with newlines (experience, responsibilities)
+"""
+import asyncio
+import os
+import re
+from typing import Optional
+
+from dotenv import load_dotenv
+from pydantic import BaseModel
+from pydantic_ai import Agent
+
+from app.agents.cv_agent import cv_agent
+from app.agents.jd_agent import jd_agent
+from app.agents.runner import run_agent
+from app.schemas import candidate_schema, job_schema
+from app.tracing import span
+from app.utils.resume_parser import MAX_HEADING_WORDS, PreparedResume
+
+load_dotenv()
+
+# ~4 characters per token: 16000 characters is about 4000 prompt tokens
+EXTRACTION_CHUNK_THRESHOLD = int(os.getenv("EXTRACTION_CHUNK_THRESHOLD", 16000))
+EXTRACTION_CHUNK_CHARS = int(os.getenv("EXTRACTION_CHUNK_CHARS", 6000))
+EXTRACTION_CONCURRENCY = int(os.getenv("EXTRACTION_CONCURRENCY", 4))
+
+FIRST, LIST, TEXT = "first", "list", "text"
+
+CV_MERGE = {
+    "name": FIRST, "email": FIRST, "phone": FIRST,
+    "skills": LIST, "certifications": LIST,
+    "education": TEXT, "experience": TEXT,
+}
+JD_MERGE = {
+    "title": FIRST, "summary": FIRST,
+    "skills": LIST,
+    "experience_required": TEXT, "education_required": TEXT, "responsibilities": TEXT,
+}
+
+_PARAGRAPHS = re.compile(r"\n\s*\n|\f")
+_LINES = re.compile("\n")
+_SENTENCES = re.compile(r"(?<=[.!?;])\s+")
+_LIST_ITEMS = re.compile(r"[,;\n•]+")
+
+
+def text_blocks(raw_text: str) -> list[str]:
+    """Paragraphs of plain text (blank lines and form feeds), with a lone heading line kept
+    together with the paragraph under it."""
+    blocks, heading = [], None
+    for paragraph in _PARAGRAPHS.split(raw_text):
+        paragraph = paragraph.strip()
+        if not paragraph:
+            continue
+        if "\n" not in paragraph and len(paragraph.split()) <= MAX_HEADING_WORDS:
+            if heading:
+                blocks.append(heading)
+            heading = paragraph
+            continue
+        if heading:
+            paragraph, heading = f"{heading}\n{paragraph}", None
+        blocks.append(paragraph)
+    if heading:
+        blocks.append(heading)
+    return blocks
+
+
+def _pieces(text: str, separator: re.Pattern, joiner: str, size: int) -> list[str]:
+    pieces, current = [], ""
+    for part in separator.split(text):
+        if current and len(current) + len(part) + 1 > size:
+            pieces.append(current)
+            current = part
+        else:
+            current = f"{current}{joiner}{part}" if current else part
+    if current:
+        pieces.append(current)
+    return pieces
+
+
+def split_block(block: str, size: int) -> list[str]:
+    """Cuts a block longer than ``size`` at line, then sentence, then word boundaries.
+    A heading on the block's first line is repeated on every piece."""
+    if len(block) <= size:
+        return [block]
+    first, _, rest = block.partition("\n")
+    heading = first if rest and len(first.split()) <= MAX_HEADING_WORDS else None
+    body = rest if heading else block
+    room = max(1, size - len(heading or "") - 1)
+
+    pieces = []
+    for line_group in _pieces(body, _LINES, "\n", room):
+        for sentence_group in (_pieces(line_group, _SENTENCES, " ", room) if len(line_group) > room else [line_group]):
+            while len(sentence_group) > room:
+                cut = sentence_group.rfind(" ", 0, room)
+                cut = cut if cut > 0 else room
+                pieces.append(sentence_group[:cut])
+                sentence_group = sentence_group[cut:].lstrip()
+            if sentence_group:
+                pieces.append(sentence_group)
+    return [f"{heading}\n{piece}" if heading else piece for piece in pieces]
+
+
+def chunk_blocks(blocks: list[str], size: int) -> list[str]:
+    """Packs blocks in order into chunks of at most ``size`` characters, cutting only
+    blocks that are larger than a chunk on their own."""
+    chunks, current = [], []
+    length = 0
+    for block in blocks:
+        for piece in split_block(block, size):
+            if current and length + len(piece) > size:
+                chunks.append("\n\n".join(current))
+                current, length = [], 0
+            current.append(piece)
+            length += len(piece) + 2
+    if current:
+        chunks.append("\n\n".join(current))
+    return chunks
+
+
+def _list_items(value: str) -> list[str]:
+    return [item.strip(" .-") for item in _LIST_ITEMS.split(value) if item.strip(" .-")]
+
+
+def merge_outputs(outputs: list[BaseModel], rules: dict[str, str]) -> dict:
+    """Combines partial outputs, given in document order, into one set of fields."""
+    merged = {}
+    for name, rule in rules.items():
+        values = [value for value in (getattr(output, name) for output in outputs) if value]
+        if not values:
+            merged[name] = None
+        elif rule == FIRST:
+            merged[name] = values[0]
+        else:
+            parts = [item for value in values for item in _list_items(value)] if rule == LIST else values
+            seen, unique = set(), []
+            for part in parts:
+                key = " ".join(part.lower().split())
+                if key not in seen:
+                    seen.add(key)
+                    unique.append(part)
+            merged[name] = (", " if rule == LIST else "\n").join(unique)
+    return merged
+
+
+async def extract(agent: Agent, policy: str, prompt: str, rules: dict[str, str], header: str = "",
+                  blocks: Optional[list[str]] = None, threshold: Optional[int] = None,
+                  chunk_chars: Optional[int] = None, concurrency: Optional[int] = None) -> dict:
+    """Runs ``agent`` over ``prompt`` and returns the output fields.
+
+    Above the threshold, ``blocks`` (default: the prompt's paragraphs) are packed into chunks,
+    each sent with ``header`` in front of it."""
+    threshold = threshold or EXTRACTION_CHUNK_THRESHOLD
+    chunk_chars = chunk_chars or EXTRACTION_CHUNK_CHARS
+    if len(prompt) <= threshold:
+        result = await run_agent(agent, prompt, policy=policy)
+        return result.output.model_dump()
+
+    chunks = chunk_blocks(blocks if blocks is not None else text_blocks(prompt), max(1, chunk_chars - len(header) - 2))
+    semaphore = asyncio.Semaphore(concurrency or EXTRACTION_CONCURRENCY)
+
+    async def run(chunk: str):
+        async with semaphore:
+            result = await run_agent(agent, f"{header}\n\n{chunk}" if header else chunk, policy=policy)
+            return result.output
+
+    with span(f"extract {policy}", chunks=len(chunks), chars=len(prompt)):
+        # any failed chunk fails the extraction: a merge without it would silently drop fields
+        outputs = await asyncio.gather(*(run(chunk) for chunk in chunks))
+    return merge_outputs(outputs, rules)
+
+
+async def extract_cv(prepared: PreparedResume, **options) -> dict:
+    """CVOutput fields for a prepared resume, with the locally found contact fields applied."""
+    fields = await extract(cv_agent, "cv_agent", prepared.prompt, CV_MERGE, header=prepared.header,
+                           blocks=prepared.blocks(), **options)
+    return {**candidate_schema.CVOutput(**fields).model_dump(), **prepared.known}
+
+
+async def extract_jd(raw_text: str, **options) -> dict:
+    """JDOutput fields for a pasted job description."""
+    fields = await extract(jd_agent, "jd_agent", raw_text, JD_MERGE, **options)
+    return job_schema.JDOutput(**fields).model_dump()
@@ -0,0 +1,43 @@
+"""Sparse fieldsets for list endpoints.
+
+``?fields=:summary`` returns the resource's summary schema (the colon keeps it apart from a
+``summary`` column); ``?fields=id,title`` returns just those fields (``id`` is always included).
+Without ``fields`` the full records are returned; an empty ``fields`` is a 400.
+The chosen schema also decides which columns the query loads, so long text columns that are
+not asked for are never read from the database.
+"""
+from functools import lru_cache
+from typing import Optional
+
+from fastapi import HTTPException
+from pydantic import BaseModel, ConfigDict, create_model
+
+SUMMARY = ":summary"
+DESCRIPTION = '":summary" for the lightweight list schema, or a comma-separated list of field names'
+
+
+@lru_cache(maxsize=256)
+def _subset(full: type[BaseModel], names: tuple[str, ...]) -> type[BaseModel]:
+    fields = {name: (full.model_fields[name].annotation, full.model_fields[name]) for name in names}
+    return create_model(f"{full.__name__}Fields", __config__=ConfigDict(from_attributes=True), **fields)
+
+
+def resolve(fields: Optional[str], full: type[BaseModel], summary: type[BaseModel]) -> type[BaseModel]:
+    """The schema to serialize with; unknown field names are a 400."""
+    if fields is None:
+        return full
+    if fields.strip() == SUMMARY:
+        return summary
+    requested = {name.strip() for name in fields.split(",") if name.strip()}
+    if not requested:
+        raise HTTPException(status_code=400, detail="No fields requested")
+    unknown = sorted(requested - set(full.model_fields))
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+    # declaration order, so the same set always maps to the same schema (and cache entry)
+    return _subset(full, tuple(name for name in full.model_fields if name == "id" or name in requested))
+
+
+def columns(schema: type[BaseModel], full: type[BaseModel]) -> Optional[list[str]]:
+    """Column names to load for ``schema``, or None when every column is needed."""
+    return None if schema is full else list(schema.model_fields)
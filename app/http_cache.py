@@ -0,0 +1,53 @@
+"""Cached JSON read responses with strong ETags, so polling clients get 304s.
+
+The serialized body is cached per user through ``app.cache`` (and dropped by every write in
+``crud.py``); the ETag is a hash of those bytes. A poll that sends the ETag back in
+``If-None-Match`` gets an empty 304, usually without touching the database. Because the tag
+depends only on the content, a write that leaves a response unchanged still answers 304.
+"""
+import hashlib
+from functools import lru_cache
+from typing import Any, Callable, Hashable
+
+from fastapi import Request, Response
+from pydantic import TypeAdapter
+
+from app import cache
+
+# clients may keep the body but must revalidate it on every use
+CACHE_CONTROL = "private, no-cache"
+
+
+@lru_cache(maxsize=None)
+def _adapter(response_type) -> TypeAdapter:
+    return TypeAdapter(response_type)
+
+
+def etag_for(body: bytes) -> str:
+    return '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+
+def _not_modified(if_none_match: str, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # If-None-Match uses weak comparison: W/"x" matches "x"
+    return any(tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(","))
+
+
+def cached_json(request: Request, user_id: int, key: Hashable, loader: Callable[[], Any], response_type) -> Response:
+    """Serves ``loader()``, validated and serialized as ``response_type``, from the per-user cache.
+
+    ``key`` is a tuple naming the response among the user's entries (route and parameters).
+    ``loader`` may return ORM rows. Exceptions it raises (e.g. a 404 HTTPException) are not cached."""
+    def load() -> tuple[str, bytes]:
+        adapter = _adapter(response_type)
+        body = adapter.dump_json(adapter.validate_python(loader(), from_attributes=True))
+        return etag_for(body), body
+
+    etag, body = cache.cached(user_id, ("http",) + key, load)
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+    if _not_modified(request.headers.get("if-none-match", ""), etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
@@ -0,0 +1,208 @@
+"""``Idempotency-Key`` support for POST endpoints that run LLM agents or send email.
+
+A client that sends the same key again (per user) gets the first response back without
+the request running a second time. Keys live in ``idempotency_keys`` with a fingerprint
+of the request, so reusing a key for a different request is a 422. A retry that arrives
+while the original is still running waits for its result: in-process through
+``SingleFlight``, across workers by polling the claimed row.
+
+5xx and 429 answers are not stored, so a retry after a transient failure runs again.
+Rows expire after IDEMPOTENCY_TTL_HOURS and are purged periodically.
+"""
+import asyncio
+import hashlib
+import logging
+import os
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from dotenv import load_dotenv
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, Response
+from sqlalchemy import delete, or_, and_
+from sqlalchemy.exc import IntegrityError
+
+from app import models
+from app.auth import decode_token
+from app.db import SessionLocal
+from app.utils.singleflight import SingleFlight
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+IDEMPOTENT_ROUTES = {
+    ("POST", "/jobs/create"),
+    ("POST", "/candidates/create"),
+    ("POST", "/interviews/create"),
+}
+IDEMPOTENCY_TTL_HOURS = float(os.getenv("IDEMPOTENCY_TTL_HOURS", 24))
+# how long a retry waits for the original request; above the longest agent latency budget
+IDEMPOTENCY_WAIT_TIMEOUT = float(os.getenv("IDEMPOTENCY_WAIT_TIMEOUT", 180))
+# an unfinished claim this old belongs to a worker that died; a retry may take it over
+IDEMPOTENCY_STALE_AFTER = float(os.getenv("IDEMPOTENCY_STALE_AFTER", 600))
+PURGE_INTERVAL = 300
+POLL_INTERVAL = 0.25
+MAX_KEY_LENGTH = 255
+
+_flights = SingleFlight()
+_last_purge = 0.0
+
+
+@dataclass(frozen=True)
+class StoredResponse:
+    fingerprint: str
+    status_code: Optional[int]       # None: the original request is still running
+    content_type: Optional[str] = None
+    body: bytes = b""
+
+
+def fingerprint(request: Request, body: bytes) -> str:
+    content_type = request.headers.get("content-type", "")
+    media_type, _, params = content_type.partition(";")
+    # multipart boundaries are random per attempt, so they are left out of the fingerprint
+    boundary = next((p.split("=", 1)[1].strip('" ') for p in params.split(";") if p.strip().startswith("boundary=")), None)
+    if boundary:
+        body = body.replace(boundary.encode(), b"")
+    digest = hashlib.sha256()
+    for part in (request.method, request.url.path, request.url.query, media_type.strip()):
+        digest.update(part.encode())
+        digest.update(b"\0")
+    digest.update(body)
+    return digest.hexdigest()
+
+
+def _user_id(request: Request) -> Optional[int]:
+    scheme, _, token = request.headers.get("authorization", "").partition(" ")
+    payload = decode_token(token) if scheme.lower() == "bearer" and token else None
+    if not payload or payload.get("type") != "access":
+        return None
+    return int(payload["sub"])
+
+
+def _purge_expired(db, now: datetime):
+    global _last_purge
+    if time.monotonic() - _last_purge < PURGE_INTERVAL:
+        return
+    _last_purge = time.monotonic()
+    purged = db.execute(delete(models.IdempotencyKey).where(models.IdempotencyKey.expires_at < now)).rowcount
+    db.commit()
+    if purged:
+        logger.info("purged %d expired idempotency keys", purged)
+
+
+def _claim(user_id: int, key: str, request_fingerprint: str) -> Optional[StoredResponse]:
+    """Claims the key for this request (returns None), or returns what is already stored for it."""
+    now = datetime.now(timezone.utc)
+    with SessionLocal() as db:
+        _purge_expired(db, now)
+        for _ in range(2):
+            db.add(models.IdempotencyKey(
+                user_id=user_id, key=key, fingerprint=request_fingerprint,
+                created_at=now, expires_at=now + timedelta(hours=IDEMPOTENCY_TTL_HOURS),
+            ))
+            try:
+                db.commit()
+                return None
+            except IntegrityError:
+                db.rollback()
+            # an expired row, or a claim abandoned by a dead worker, is replaced
+            replaced = db.execute(delete(models.IdempotencyKey).where(
+                models.IdempotencyKey.user_id == user_id,
+                models.IdempotencyKey.key == key,
+                or_(models.IdempotencyKey.expires_at < now,
+                    and_(models.IdempotencyKey.status_code.is_(None),
+                         models.IdempotencyKey.created_at < now - timedelta(seconds=IDEMPOTENCY_STALE_AFTER))),
+            )).rowcount
+            db.commit()
+            if not replaced:
+                break
+        return _load(db, user_id, key) or StoredResponse(request_fingerprint, None)
+
+
+def _load(db, user_id: int, key: str) -> Optional[StoredResponse]:
+    row = db.query(models.IdempotencyKey).filter(
+        models.IdempotencyKey.user_id == user_id, models.IdempotencyKey.key == key).first()
+    if row is None:
+        return None
+    return StoredResponse(row.fingerprint, row.status_code, row.content_type, row.response_body or b"")
+
+
+def _finish(user_id: int, key: str, stored: Optional[StoredResponse]):
+    """Stores the response for replays, or drops the claim (``stored`` None) so a retry runs again."""
+    with SessionLocal() as db:
+        query = db.query(models.IdempotencyKey).filter(
+            models.IdempotencyKey.user_id == user_id, models.IdempotencyKey.key == key)
+        if stored is None:
+            query.delete()
+        else:
+            query.update({
+                "status_code": stored.status_code,
+                "content_type": stored.content_type,
+                "response_body": stored.body,
+            })
+        db.commit()
+
+
+async def _execute(request: Request, call_next, user_id: int, key: str, request_fingerprint: str):
+    """Returns (stored response, original headers when this call ran the request itself)."""
+    deadline = time.monotonic() + IDEMPOTENCY_WAIT_TIMEOUT
+    while True:
+        existing = _claim(user_id, key, request_fingerprint)
+        if existing is None:
+            break
+        if existing.status_code is not None or existing.fingerprint != request_fingerprint:
+            return existing, None
+        # another worker is running the original request
+        if time.monotonic() > deadline:
+            return StoredResponse(request_fingerprint, 409, "application/json",
+                                  b'{"detail":"A request with this Idempotency-Key is still in progress"}'), None
+        await asyncio.sleep(POLL_INTERVAL)
+
+    try:
+        response = await call_next(request)
+        body = b"".join([chunk async for chunk in response.body_iterator])
+    except BaseException:
+        _finish(user_id, key, None)
+        raise
+    stored = StoredResponse(request_fingerprint, response.status_code, response.headers.get("content-type"), body)
+    transient = response.status_code >= 500 or response.status_code == 429
+    _finish(user_id, key, None if transient else stored)
+    headers = {k: v for k, v in response.headers.items() if k.lower() != "content-length"}
+    return stored, headers
+
+
+def install(app: FastAPI):
+    @app.middleware("http")
+    async def idempotency_middleware(request: Request, call_next):
+        key = request.headers.get("idempotency-key")
+        if not key or (request.method, request.url.path) not in IDEMPOTENT_ROUTES:
+            return await call_next(request)
+        if len(key) > MAX_KEY_LENGTH:
+            return JSONResponse(status_code=400, content={"detail": f"Idempotency-Key longer than {MAX_KEY_LENGTH} characters"})
+        user_id = _user_id(request)
+        if user_id is None:
+            return await call_next(request)    # the route itself answers 401
+
+        body = await request.body()
+        request_fingerprint = fingerprint(request, body)
+        led = []
+
+        async def run():
+            led.append(True)
+            return await _execute(request, call_next, user_id, key, request_fingerprint)
+
+        stored, headers = await _flights.do((user_id, key), run)
+        if not led:
+            headers = None    # an in-process retry shares the original's result: a replay
+
+        if stored.fingerprint != request_fingerprint:
+            return JSONResponse(status_code=422, content={"detail": "Idempotency-Key was already used for a different request"})
+        return Response(
+            content=stored.body,
+            status_code=stored.status_code,
+            media_type=stored.content_type,
+            headers=headers if headers is not None else {"Idempotent-Replayed": "true"},
+        )
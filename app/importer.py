@@ -0,0 +1,118 @@
+"""Bulk import of already-structured jobs and candidates, bypassing the LLM agents.
+
+    python -m app.importer jobs jobs.ndjson --user-id 3
+    python -m app.importer candidates candidates.csv --user-id 3 --chunk-size 1000
+
+Input is NDJSON (one JSON object per line) or CSV with a header row, using the field
+names of ``JobBase`` / ``CandidateBase``. Rows are validated as they are read. Valid rows
+are inserted in chunks, each chunk one multi-row ``INSERT ... RETURNING`` in its own
+transaction. Invalid rows are reported by line number and skipped.
+"""
+import argparse
+import csv
+import json
+import time
+from typing import Iterable, Iterator, Optional
+
+from pydantic import ValidationError
+from sqlalchemy.orm import Session
+
+from app import crud
+from app.db import SessionLocal
+from app.schemas import candidate_schema, job_schema
+
+IMPORTS = {
+    "jobs": (job_schema.JobBase, crud.bulk_create_jobs, ("title",)),
+    "candidates": (candidate_schema.CandidateBase, crud.bulk_create_candidates, ("name", "email")),
+}
+MAX_REPORTED_ERRORS = 100
+
+
+def detect_format(filename: Optional[str], content_type: Optional[str] = None) -> str:
+    if (filename or "").lower().endswith(".csv") or (content_type or "").startswith("text/csv"):
+        return "csv"
+    return "ndjson"
+
+
+def iter_records(lines: Iterable[str], fmt: str) -> Iterator[tuple[int, object]]:
+    """Yields (line number, raw record) lazily; unparseable NDJSON lines yield the error instead."""
+    if fmt == "csv":
+        reader = csv.DictReader(lines)
+        for record in reader:
+            # empty CSV cells mean "missing", like null in NDJSON
+            yield reader.line_num, {k: (v if v != "" else None) for k, v in record.items() if k}
+        return
+    for line_no, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            yield line_no, json.loads(line)
+        except json.JSONDecodeError as e:
+            yield line_no, e
+
+
+def import_records(db: Session, kind: str, lines: Iterable[str], fmt: str, user_id: int,
+                   chunk_size: int = 500) -> dict:
+    schema, bulk_create, required = IMPORTS[kind]
+    inserted, chunks = 0, 0
+    errors, error_count = [], 0
+    chunk = []
+    started = time.perf_counter()
+
+    def flush():
+        nonlocal inserted, chunks
+        inserted += len(bulk_create(db, chunk))
+        chunks += 1
+        chunk.clear()
+
+    for line_no, record in iter_records(lines, fmt):
+        try:
+            if isinstance(record, Exception):
+                raise ValueError(f"invalid JSON: {record}")
+            if not isinstance(record, dict):
+                raise ValueError("expected an object")
+            # rows always belong to the importing recruiter
+            row = schema(**{**record, "user_id": user_id})
+            missing = [field for field in required if getattr(row, field) is None]
+            if missing:
+                raise ValueError(f"missing required field(s): {', '.join(missing)}")
+        except (ValidationError, ValueError, TypeError) as e:
+            error_count += 1
+            if len(errors) < MAX_REPORTED_ERRORS:
+                errors.append({"line": line_no, "error": str(e)})
+            continue
+        chunk.append(row)
+        if len(chunk) >= chunk_size:
+            flush()
+    if chunk:
+        flush()
+
+    elapsed = time.perf_counter() - started
+    return {
+        "kind": kind,
+        "inserted": inserted,
+        "chunks": chunks,
+        "failed": error_count,
+        "errors": errors,
+        "elapsed_s": round(elapsed, 3),
+        "rows_per_s": round(inserted / elapsed, 1) if elapsed else None,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("kind", choices=sorted(IMPORTS))
+    parser.add_argument("path")
+    parser.add_argument("--user-id", type=int, required=True, help="recruiter that will own the imported rows")
+    parser.add_argument("--format", choices=["csv", "ndjson"], help="defaults to the file extension")
+    parser.add_argument("--chunk-size", type=int, default=500, help="rows per INSERT and transaction")
+    args = parser.parse_args(argv)
+
+    fmt = args.format or detect_format(args.path)
+    with open(args.path, newline="", encoding="utf-8") as f, SessionLocal() as db:
+        summary = import_records(db, args.kind, f, fmt, args.user_id, args.chunk_size)
+    print(json.dumps(summary, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,29 @@
-from fastapi import  FastAPI
+from fastapi import  FastAPI, Request
 from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
-from app.db import Base,engine
-from app.routers import jobs,candidates,matches,interviews,auth
+import os
+from app.db import engine, init_db
+from app.routers import jobs,candidates,matches,interviews,auth,exports,imports,analytics
 from pathlib import Path
 from fastapi.responses import FileResponse
+from app.agents.rate_limiter import queue_wait
+from app.agents.providers import close_http_client
+from app.agents import runner
+from contextlib import asynccontextmanager
+from app import query_counter, idempotency, tracing, profiling
 
-Base.metadata.create_all(bind = engine)
+# seconds to wait at shutdown for LLM calls that are still running
+SHUTDOWN_DRAIN_TIMEOUT = float(os.getenv("SHUTDOWN_DRAIN_TIMEOUT", 30))
 
-app = FastAPI(title="Recruiting Muti-Agent System API")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    init_db()
+    yield
+    # finish in-flight agent calls before their shared HTTP client goes away
+    await runner.drain(SHUTDOWN_DRAIN_TIMEOUT)
+    await close_http_client()
+
+app = FastAPI(title="Recruiting Muti-Agent System API", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -18,10 +33,32 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.middleware("http")
+async def add_queue_wait_header(request: Request, call_next):
+    # exposes how long this request spent queued behind the LLM rate limiter
+    waited = {"seconds": 0.0}
+    queue_wait.set(waited)
+    response = await call_next(request)
+    if waited["seconds"]:
+        response.headers["X-Queue-Wait-Ms"] = f"{waited['seconds'] * 1000:.0f}"
+    return response
+
+query_counter.install(app, engine)
+# wraps the middlewares above: replays skip the whole request
+idempotency.install(app)
+# outermost, so Server-Timing and the slow-request log cover every other middleware
+tracing.install(app, engine)
+
 app.include_router(auth.router)
 app.include_router(jobs.router)
 app.include_router(candidates.router)
 app.include_router(matches.router)
 app.include_router(interviews.router)
+app.include_router(exports.router)
+app.include_router(imports.router)
+app.include_router(analytics.router)
+# after the routers (it follows their sync endpoints into the threadpool) and outermost
+profiling.install(app)
 
-app.mount("/", StaticFiles(directory="frontend/dist", html=True), name="frontend")
\ No newline at end of file
+if Path("frontend/dist").is_dir():
+    app.mount("/", StaticFiles(directory="frontend/dist", html=True), name="frontend")
\ No newline at end of file
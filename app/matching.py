@@ -0,0 +1,270 @@
+"""Matching beyond one request: coalescing duplicate match calls, re-scoring stale matches after an
+edit, and auto-matching new candidates."""
+import asyncio
+import logging
+import os
+import re
+import time
+from typing import Optional
+
+from dotenv import load_dotenv
+from pydantic import ValidationError
+from sqlalchemy.orm import Session
+
+from app import crud, query_counter
+from app.db import SessionLocal
+from app.agents.matcher import build_match_payload, build_packed_match_payload, matcher_agent, packed_matcher_agent
+from app.agents.config import AGENT_POLICIES
+from app.agents.runner import run_agent
+from app.schemas import candidate_schema, job_schema, match_schema
+from app.utils.singleflight import SingleFlight
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+RESCORE_CONCURRENCY = int(os.getenv("RESCORE_CONCURRENCY", 4))
+# candidates sent with one job per packed matcher call; 1 turns packing off
+MATCH_PACK_SIZE = int(os.getenv("MATCH_PACK_SIZE", 8))
+# candidates scored by one /matches/batch request
+MATCH_BATCH_MAX = int(os.getenv("MATCH_BATCH_MAX", 100))
+# auto-match only sends jobs to the matcher when enough of their listed skills show up in the profile
+AUTO_MATCH_MIN_RELEVANCE = float(os.getenv("AUTO_MATCH_MIN_RELEVANCE", 0.2))
+AUTO_MATCH_MAX_JOBS = int(os.getenv("AUTO_MATCH_MAX_JOBS", 25))
+# a request for a pair that another worker is scoring waits this long for its result
+MATCH_CLAIM_WAIT = AGENT_POLICIES["matcher_agent"].total_budget + 10
+# a claim this old belongs to a worker that died mid-call
+MATCH_CLAIM_STALE_AFTER = float(os.getenv("MATCH_CLAIM_STALE_AFTER", 300))
+MATCH_CLAIM_POLL_INTERVAL = 0.25
+
+_TERM_SEPARATORS = re.compile(r"[,;|\n]+|\band\b")
+_WORDS = re.compile(r"[a-z0-9+#]+(?:\.[a-z0-9]+)*")
+
+_pair_flights = SingleFlight()
+
+
+class MatchInProgress(Exception):
+    pass
+
+
+async def score(job: job_schema.Job, candidate: candidate_schema.Candidate) -> dict:
+    """Runs matcher_agent for one pair and returns the LLM output fields."""
+    payload = build_match_payload(job.model_dump(), candidate.model_dump())
+    result = await run_agent(matcher_agent, payload, policy="matcher_agent")
+    return result.output.model_dump()
+
+
+async def create_match_once(user_id: int, job: job_schema.Job,
+                            candidate: candidate_schema.Candidate) -> match_schema.Match:
+    """Scores and stores one pair, or returns the match that already exists for it.
+
+    Concurrent calls for the same ``(user_id, job_id, candidate_id)`` share one matcher call
+    and one row: within a worker they await the same future, across workers the first one
+    holds a ``match_claims`` row and the others poll until its match is stored. Raises
+    MatchInProgress if that takes longer than MATCH_CLAIM_WAIT."""
+    return await _pair_flights.do((user_id, job.id, candidate.id), lambda: _create_claimed(user_id, job, candidate))
+
+
+_CLAIMED = object()
+
+
+def _claim_or_existing(user_id: int, job_id: int, candidate_id: int):
+    """_CLAIMED if this call may score the pair, the stored match if there is one, else None (someone else is scoring it)."""
+    with SessionLocal() as db:
+        claimed = crud.claim_match(db=db, user_id=user_id, job_id=job_id, candidate_id=candidate_id,
+                                   stale_after=MATCH_CLAIM_STALE_AFTER)
+        # checked after claiming as well: the previous holder may have stored its match and released in between
+        existing = crud.get_matches_by_job_and_candidate_id(db=db, user_id=user_id, job_id=job_id, candidate_id=candidate_id)
+        if claimed and not existing:
+            return _CLAIMED
+        if claimed:
+            crud.release_match_claim(db=db, user_id=user_id, job_id=job_id, candidate_id=candidate_id)
+        return match_schema.Match.model_validate(existing) if existing else None
+
+
+async def _create_claimed(user_id: int, job: job_schema.Job,
+                          candidate: candidate_schema.Candidate) -> match_schema.Match:
+    deadline = time.monotonic() + MATCH_CLAIM_WAIT
+    outcome = _claim_or_existing(user_id, job.id, candidate.id)
+    while outcome is None:
+        if time.monotonic() > deadline:
+            raise MatchInProgress(f"Job {job.id} and candidate {candidate.id} are still being matched by another request")
+        await asyncio.sleep(MATCH_CLAIM_POLL_INTERVAL)
+        with query_counter.uncounted():
+            outcome = _claim_or_existing(user_id, job.id, candidate.id)
+    if outcome is not _CLAIMED:
+        return outcome
+
+    try:
+        values = await score(job, candidate)
+        with SessionLocal() as db:
+            return match_schema.Match.model_validate(crud.create_match(db=db, match=match_schema.MatchBase(
+                user_id=user_id,
+                job_id=job.id,
+                job_title=job.title,
+                candidate_id=candidate.id,
+                candidate_name=candidate.name,
+                **values,
+            )))
+    finally:
+        # released after the match is stored, so a waiting worker finds the row when the claim goes
+        with SessionLocal() as db:
+            crud.release_match_claim(db=db, user_id=user_id, job_id=job.id, candidate_id=candidate.id)
+
+
+def _validated(item: match_schema.PackedMatchItem) -> Optional[dict]:
+    try:
+        values = match_schema.MatchLLMOutput.model_validate(item.model_dump(exclude={"candidate_id"})).model_dump()
+    except ValidationError:
+        return None
+    return values if 0 <= values["match_score"] <= 100 else None
+
+
+async def _score_pack(job: job_schema.Job, pack: list[candidate_schema.Candidate]) -> dict[int, dict]:
+    """One packed call for several candidates; returns the valid items by candidate id."""
+    payload = build_packed_match_payload(job.model_dump(), [candidate.model_dump() for candidate in pack])
+    try:
+        result = await run_agent(packed_matcher_agent, payload, policy="packed_matcher_agent")
+    except Exception as e:
+        logger.warning("packed match of job %s with %d candidates failed: %s", job.id, len(pack), e)
+        return {}
+    wanted = {candidate.id for candidate in pack}
+    scores = {}
+    for item in result.output.matches:
+        if item.candidate_id in wanted and item.candidate_id not in scores:
+            values = _validated(item)
+            if values is not None:
+                scores[item.candidate_id] = values
+    return scores
+
+
+async def score_many(job: job_schema.Job, candidates: list[candidate_schema.Candidate],
+                     pack_size: int = MATCH_PACK_SIZE, concurrency: int = RESCORE_CONCURRENCY,
+                     semaphore: Optional[asyncio.Semaphore] = None) -> dict[int, Optional[dict]]:
+    """Scores ``candidates`` against one job; maps candidate id to the LLM output fields, or None on failure.
+
+    Candidates are sent ``pack_size`` at a time so the job text is paid for once per pack.
+    Items missing from a packed answer, or failing validation, are re-run on their own."""
+    semaphore = semaphore or asyncio.Semaphore(concurrency)
+
+    async def single(candidate):
+        async with semaphore:
+            try:
+                return candidate.id, await score(job, candidate)
+            except Exception as e:
+                logger.warning("match of job %s with candidate %s failed: %s", job.id, candidate.id, e)
+                return candidate.id, None
+
+    async def packed(pack):
+        if len(pack) == 1:
+            return dict([await single(pack[0])])
+        async with semaphore:
+            scores = await _score_pack(job, pack)
+        retry = [candidate for candidate in pack if candidate.id not in scores]
+        if retry:
+            logger.info("packed match of job %s: %d of %d items retried alone", job.id, len(retry), len(pack))
+        return {**scores, **dict(await asyncio.gather(*(single(candidate) for candidate in retry)))}
+
+    size = max(1, pack_size)
+    results = {}
+    for scores in await asyncio.gather(*(packed(candidates[i:i + size]) for i in range(0, len(candidates), size))):
+        results.update(scores)
+    return results
+
+
+async def rescore_stale(db: Session, user_id: int, job_id: Optional[int] = None,
+                        candidate_id: Optional[int] = None,
+                        concurrency: int = RESCORE_CONCURRENCY) -> match_schema.RescoreResult:
+    """Re-scores only the stale matches (optionally of one job or candidate), ``concurrency`` calls at a time.
+
+    Stale matches of the same job are packed into shared matcher calls. Matches whose agent
+    call fails stay stale and are reported in ``failed``."""
+    rows = crud.get_stale_matches(db=db, user_id=user_id, job_id=job_id, candidate_id=candidate_id)
+    # plain copies, so the session can be left alone while agent calls are in flight
+    by_job: dict[int, tuple[job_schema.Job, list]] = {}
+    for match, job, candidate in rows:
+        by_job.setdefault(job.id, (job_schema.Job.model_validate(job), []))[1].append(
+            (match.id, candidate_schema.Candidate.model_validate(candidate)))
+    semaphore = asyncio.Semaphore(concurrency)
+
+    job_results = await asyncio.gather(*(
+        score_many(job, [candidate for _, candidate in items], semaphore=semaphore)
+        for job, items in by_job.values()
+    ))
+    scores, failed = [], []
+    for (job, items), results in zip(by_job.values(), job_results):
+        for match_id, candidate in items:
+            values = results.get(candidate.id)
+            if values is None:
+                failed.append(match_id)
+            else:
+                scores.append({"id": match_id, **values})
+    crud.update_match_scores(db=db, user_id=user_id, scores=scores)
+    return match_schema.RescoreResult(rescored=len(scores), failed=failed)
+
+
+def _skill_terms(text: Optional[str]) -> list[tuple[str, ...]]:
+    # "Python, REST APIs; Node.js" -> [("python",), ("rest", "apis"), ("node.js",)]
+    terms = (_WORDS.findall(part.lower()) for part in _TERM_SEPARATORS.split(text or ""))
+    return [tuple(words) for words in terms if words]
+
+
+def relevance(job: job_schema.Job, candidate: candidate_schema.Candidate) -> float:
+    """Share (0..1) of the job's listed skills found as whole words in the candidate's profile.
+
+    Jobs that list no skills score 1.0: there is nothing to filter on, so the matcher decides."""
+    wanted = _skill_terms(job.skills)
+    if not wanted:
+        return 1.0
+    profile = set(_WORDS.findall(" ".join(
+        filter(None, (candidate.skills, candidate.experience, candidate.certifications))).lower()))
+    return sum(all(word in profile for word in term) for term in wanted) / len(wanted)
+
+
+async def auto_match(user_id: int, candidate_id: int, concurrency: int = RESCORE_CONCURRENCY) -> dict:
+    """Matches a newly created candidate against the recruiter's jobs; run as a background task.
+
+    Jobs are ranked by ``relevance``; those below AUTO_MATCH_MIN_RELEVANCE are skipped and
+    at most AUTO_MATCH_MAX_JOBS go to matcher_agent, ``concurrency`` at a time. Each match
+    is stored as soon as its score arrives, unless the pair was matched in the meantime."""
+    # the request's session is closed by the time background tasks run; this one is closed
+    # again before the matcher calls, so no pooled connection is held while they are in flight
+    with SessionLocal() as db:
+        db_candidate = crud.get_candidates_by_id(db=db, user_id=user_id, candidate_id=candidate_id)
+        if not db_candidate:
+            return {"jobs": 0, "sent": 0, "matched": 0, "failed": 0}
+        candidate = candidate_schema.Candidate.model_validate(db_candidate)
+        jobs = [job_schema.Job.model_validate(job) for job in crud.get_unmatched_jobs(db=db, user_id=user_id, candidate_id=candidate_id)]
+
+    ranked = sorted(((relevance(job, candidate), job) for job in jobs), key=lambda pair: -pair[0])
+    survivors = [job for rank, job in ranked if rank >= AUTO_MATCH_MIN_RELEVANCE][:AUTO_MATCH_MAX_JOBS]
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def match(job):
+        async with semaphore:
+            try:
+                return job, await score(job, candidate)
+            except Exception as e:
+                logger.warning("auto-match of candidate %s with job %s failed: %s", candidate.id, job.id, e)
+                return job, None
+
+    matched = failed = 0
+    for next_done in asyncio.as_completed([match(job) for job in survivors]):
+        job, values = await next_done
+        if values is None:
+            failed += 1
+            continue
+        # not claimed: a pair stored meanwhile by /matches/create or a batch is skipped
+        with SessionLocal() as db:
+            matched += len(crud.bulk_create_matches(db=db, matches=[match_schema.MatchBase(
+                user_id=user_id,
+                job_id=job.id,
+                job_title=job.title,
+                candidate_id=candidate.id,
+                candidate_name=candidate.name,
+                **values,
+            )]))
+
+    logger.info("auto-matched candidate %s: %d jobs, %d sent to matcher, %d stored, %d failed",
+                candidate_id, len(jobs), len(survivors), matched, failed)
+    return {"jobs": len(jobs), "sent": len(survivors), "matched": matched, "failed": failed}
@@ -1,6 +1,32 @@
-from sqlalchemy import Column,Integer,String,Text,ForeignKey,Float,DateTime
+from sqlalchemy import Column,Integer,String,Text,ForeignKey,Float,DateTime,Boolean,Index,LargeBinary,UniqueConstraint,func,false,DDL,event
 from app.db import Base
 
+# On Postgres, matches and interviews are hash-partitioned by user_id: a recruiter's queries and
+# vacuums touch one partition instead of every tenant's rows. Changing the count means rebuilding
+# both tables in a migration.
+TENANT_PARTITIONS = 16
+
+
+def _not_postgres(ddl, target, bind, dialect, **kw):
+    return dialect.name != "postgresql"
+
+
+def _partition_by_user(table):
+    """Creates ``table`` hash-partitioned by user_id on Postgres, and as a plain table elsewhere.
+
+    A partitioned table's primary key must contain the partition key, so on Postgres it is
+    (id, user_id). The ORM keeps ``id`` as the identity: ids stay unique through the sequence.
+    """
+    table.primary_key.ddl_if(callable_=_not_postgres)
+    statements = [f"ALTER TABLE {table.name} ADD CONSTRAINT {table.name}_pkey PRIMARY KEY (id, user_id)"] + [
+        f"CREATE TABLE {table.name}_p{n} PARTITION OF {table.name} "
+        f"FOR VALUES WITH (MODULUS {TENANT_PARTITIONS}, REMAINDER {n})"
+        for n in range(TENANT_PARTITIONS)
+    ]
+    for statement in statements:
+        event.listen(table, "after_create", DDL(statement).execute_if(dialect="postgresql"))
+
+
 
 class User(Base):
     __tablename__ = "users"
@@ -49,6 +75,15 @@ class Match(Base):
     missing_skills = Column(Text, nullable=True)
     missing_experience = Column(Text, nullable=True)
     missing_education = Column(Text, nullable=True)
+    is_stale = Column(Boolean, nullable=False, default=False, server_default=false())   # job/candidate inputs edited since scoring
+
+    # every query is scoped by user_id, which leads each index (and picks the partition on Postgres);
+    # one match per pair, whichever path stores it (bulk inserts skip pairs already stored)
+    __table_args__ = (
+        Index("ix_matches_user_id_job_id_candidate_id", "user_id", "job_id", "candidate_id", unique=True),
+        Index("ix_matches_user_id_candidate_id", "user_id", "candidate_id"),
+        {"postgresql_partition_by": "HASH (user_id)"},
+    )
 
 
 class Interview(Base):
@@ -62,4 +97,79 @@ class Interview(Base):
     job_title = Column(Text, nullable=False)
     interview_time = Column(DateTime(timezone=True), nullable=False)
     format = Column(String, nullable=False)   #EG: "online", "onsite"
-    invite_email = Column(String, nullable=False)
\ No newline at end of file
+    invite_email = Column(String, nullable=False)
+    duration_minutes = Column(Integer, nullable=False, default=60, server_default="60")
+
+    __table_args__ = (
+        # calendar lookups: a recruiter's interviews in a time range
+        Index("ix_interviews_user_id_interview_time", "user_id", "interview_time"),
+        Index("ix_interviews_user_id_job_id_candidate_id", "user_id", "job_id", "candidate_id"),
+        {"postgresql_partition_by": "HASH (user_id)"},
+    )
+
+
+_partition_by_user(Match.__table__)
+_partition_by_user(Interview.__table__)
+
+class ResumeDocument(Base):
+    __tablename__ = "resume_documents"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    candidate_id = Column(Integer, ForeignKey("candidates.id"), nullable=False, index=True)
+    sha256 = Column(String(64), nullable=False, index=True)   # key into the blob store
+    filename = Column(String, nullable=False)
+    content_type = Column(String, nullable=True)
+    size_bytes = Column(Integer, nullable=False)
+    raw_text = Column(Text, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+
+class BackfillCheckpoint(Base):
+    __tablename__ = "backfill_checkpoints"
+
+    id = Column(Integer, primary_key=True, index=True)
+    name = Column(String, unique=True, nullable=False)     # run name, resumes the run when reused
+    target = Column(String, nullable=False)               # "candidates" or "matches"
+    last_id = Column(Integer, nullable=False, default=0)  # highest row id already processed
+    processed = Column(Integer, nullable=False, default=0)
+    errors = Column(Integer, nullable=False, default=0)
+    started_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+
+
+class BackfillFailure(Base):
+    __tablename__ = "backfill_failures"
+
+    # rows a backfill run could not rescore or write, re-queued by --retry-failed
+    checkpoint_id = Column(Integer, ForeignKey("backfill_checkpoints.id"), primary_key=True)
+    row_id = Column(Integer, primary_key=True)
+    error = Column(Text, nullable=True)
+    failed_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
+
+
+class IdempotencyKey(Base):
+    __tablename__ = "idempotency_keys"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    key = Column(String(255), nullable=False)                # client-supplied Idempotency-Key header
+    fingerprint = Column(String(64), nullable=False)         # sha256 of method, path, query and body
+    status_code = Column(Integer, nullable=True)             # null while the original request is in flight
+    content_type = Column(String, nullable=True)
+    response_body = Column(LargeBinary, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    expires_at = Column(DateTime(timezone=True), nullable=False, index=True)
+
+    __table_args__ = (UniqueConstraint("user_id", "key", name="uq_idempotency_keys_user_id_key"),)
+
+
+class MatchClaim(Base):
+    """Marks a (job, candidate) pair whose matcher call is running in some worker."""
+    __tablename__ = "match_claims"
+
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    job_id = Column(Integer, ForeignKey("jobs.id"), primary_key=True)
+    candidate_id = Column(Integer, ForeignKey("candidates.id"), primary_key=True)
+    created_at = Column(DateTime(timezone=True), nullable=False)
@@ -0,0 +1,282 @@
+"""On-demand request profiling, for requests that are slow in production and nowhere else.
+
+A request is profiled when it carries ``X-Profile: <PROFILE_TOKEN>``, or at random with
+probability PROFILE_SAMPLE_RATE. Sampled profiles are only kept when the request took longer
+than PROFILE_MIN_MS, so sampling collects the slow outliers. The response of a kept profile
+carries ``X-Profile-Id``.
+
+Profiles are written to PROFILE_DIR, which keeps the newest PROFILE_KEEP of them (shared by the
+workers). ``GET /admin/profiles`` lists them and ``GET /admin/profiles/{id}`` downloads one; both
+need the ``X-Profile-Token`` header.
+
+PROFILER=cprofile      (default) ``.pstats`` for ``python -m pstats`` / snakeviz, and an HTML table
+                       of the top functions. cProfile sees everything the event loop runs while
+                       the request is in flight, other requests' coroutines included.
+PROFILER=pyinstrument  sampling profiler (optional package), an HTML call tree of this request only
+
+Sync endpoints run in the threadpool; while a request is profiled, its endpoint is profiled in
+that thread too and merged into the same profile. On Python >= 3.12 cProfile allows one active
+profiler per process, which already records every thread, so no thread profiler is started.
+One request per worker is profiled at a time.
+
+PROFILING=off          (default) nothing is installed, zero overhead
+"""
+import asyncio
+import cProfile
+import functools
+import html
+import json
+import logging
+import marshal
+import os
+import pstats
+import random
+import re
+import secrets
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Optional
+
+from dotenv import load_dotenv
+from fastapi import APIRouter, Depends, FastAPI, Header, HTTPException, Query, Request
+from fastapi.responses import FileResponse
+from fastapi.routing import APIRoute
+
+from app.tracing import SLOW_REQUEST_MS
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+PROFILING_ENABLED = os.getenv("PROFILING", "off").lower() == "on"
+PROFILER = os.getenv("PROFILER", "cprofile").lower()
+PROFILE_TOKEN = os.getenv("PROFILE_TOKEN", "")
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", 0))
+PROFILE_MIN_MS = float(os.getenv("PROFILE_MIN_MS", SLOW_REQUEST_MS))
+PROFILE_DIR = Path(os.getenv("PROFILE_DIR", "profiles"))
+PROFILE_KEEP = int(os.getenv("PROFILE_KEEP", 50))
+PROFILE_TOP_FUNCTIONS = 80
+
+_PROFILE_ID = re.compile(r"^\d+-[0-9a-f]{6}$")
+_FORMATS = {"html": "text/html", "pstats": "application/octet-stream"}
+
+
+class RequestProfile:
+    """Profilers for one request: one on the event loop, one per threadpool call of its endpoint."""
+
+    def __init__(self, kind: str):
+        self.kind = kind
+        self.main = None
+        self.threads = []
+        self._lock = threading.Lock()
+
+    def _new(self, async_mode: str = "enabled"):
+        if self.kind == "pyinstrument":
+            from pyinstrument import Profiler
+
+            return Profiler(interval=0.001, async_mode=async_mode)
+        return cProfile.Profile()
+
+    def _start(self, profiler):
+        profiler.start() if self.kind == "pyinstrument" else profiler.enable()
+
+    def _stop(self, profiler):
+        profiler.stop() if self.kind == "pyinstrument" else profiler.disable()
+
+    def start(self):
+        self.main = self._new()
+        self._start(self.main)
+
+    def stop(self):
+        self._stop(self.main)
+
+    @contextmanager
+    def in_thread(self):
+        profiler = self._new(async_mode="disabled")
+        try:
+            self._start(profiler)
+        except ValueError:
+            # "Another profiling tool is already active": cProfile on sys.monitoring (3.12+),
+            # where self.main sees this thread's calls too
+            profiler = None
+        try:
+            yield
+        finally:
+            if profiler is not None:
+                self._stop(profiler)
+                with self._lock:
+                    self.threads.append(profiler)
+
+    def render(self, title: str) -> dict[str, bytes]:
+        """The profile's files, by format."""
+        if self.kind == "pyinstrument":
+            from pyinstrument.renderers import HTMLRenderer
+            from pyinstrument.session import Session
+
+            session = self.main.last_session
+            for profiler in self.threads:
+                session = Session.combine(session, profiler.last_session)
+            return {"html": HTMLRenderer().render(session).encode()}
+
+        stats = pstats.Stats(self.main, *self.threads)
+        # the format Stats.dump_stats writes
+        return {"pstats": marshal.dumps(stats.stats), "html": _stats_html(stats, title).encode()}
+
+
+def _stats_html(stats: pstats.Stats, title: str) -> str:
+    rows = sorted(stats.stats.items(), key=lambda item: item[1][3], reverse=True)[:PROFILE_TOP_FUNCTIONS]
+    body = "".join(
+        f"<tr><td>{calls if calls == primitive else f'{calls}/{primitive}'}</td><td>{tottime * 1000:.2f}</td>"
+        f"<td>{cumtime * 1000:.2f}</td><td>{html.escape(pstats.func_std_string(func))}</td></tr>"
+        for func, (primitive, calls, tottime, cumtime, _) in rows
+    )
+    return (
+        f"<!doctype html><meta charset=utf-8><title>{html.escape(title)}</title>"
+        "<style>body{font:13px monospace}td,th{padding:2px 8px;text-align:right}td:last-child{text-align:left}</style>"
+        f"<h3>{html.escape(title)}</h3><p>{stats.total_calls} calls in {stats.total_tt * 1000:.1f} ms "
+        f"(top {PROFILE_TOP_FUNCTIONS} by cumulative time; full data in the .pstats file)</p>"
+        "<table><tr><th>ncalls</th><th>tottime ms</th><th>cumtime ms</th><th>function</th></tr>"
+        f"{body}</table>"
+    )
+
+
+_active: ContextVar[Optional[RequestProfile]] = ContextVar("active_profile", default=None)
+_busy = False
+_pending: set[asyncio.Task] = set()
+
+
+def _follow(call):
+    """Profiles a sync endpoint in its threadpool thread when its request is being profiled."""
+    @functools.wraps(call)
+    def run(*args, **kwargs):
+        profile = _active.get()
+        if profile is None:
+            return call(*args, **kwargs)
+        with profile.in_thread():
+            return call(*args, **kwargs)
+    return run
+
+
+def _sync_endpoints(app: FastAPI):
+    for route in app.routes:
+        if isinstance(route, APIRoute) and not asyncio.iscoroutinefunction(route.dependant.call):
+            # the request handler reads dependant.call on every request
+            route.dependant.call = _follow(route.dependant.call)
+
+
+def save(profile_id: str, meta: dict, files: dict[str, bytes], directory: Optional[Path] = None,
+         keep: Optional[int] = None):
+    directory = PROFILE_DIR if directory is None else directory
+    keep = PROFILE_KEEP if keep is None else keep
+    directory.mkdir(parents=True, exist_ok=True)
+    for fmt, data in files.items():
+        (directory / f"{profile_id}.{fmt}").write_bytes(data)
+    (directory / f"{profile_id}.json").write_text(json.dumps({**meta, "formats": sorted(files)}))
+
+    # ids start with a nanosecond timestamp, so name order is age order
+    for old in sorted(directory.glob("*.json"))[:-keep or None]:
+        for path in directory.glob(f"{old.stem}.*"):
+            path.unlink(missing_ok=True)
+
+
+def list_profiles(directory: Optional[Path] = None) -> list[dict]:
+    directory = PROFILE_DIR if directory is None else directory
+    profiles = []
+    for path in sorted(directory.glob("*.json"), reverse=True):
+        try:
+            profiles.append({"id": path.stem, **json.loads(path.read_text())})
+        except (OSError, ValueError):
+            continue  # removed by the ring, or still being written
+    return profiles
+
+
+def _triggered(request: Request) -> Optional[str]:
+    header = request.headers.get("x-profile")
+    if header and PROFILE_TOKEN and secrets.compare_digest(header, PROFILE_TOKEN):
+        return "header"
+    if PROFILE_SAMPLE_RATE and random.random() < PROFILE_SAMPLE_RATE:
+        return "sample"
+    return None
+
+
+def require_token(x_profile_token: str = Header("")):
+    if not PROFILE_TOKEN or not secrets.compare_digest(x_profile_token, PROFILE_TOKEN):
+        raise HTTPException(status_code=403, detail="Invalid profile token")
+
+
+router = APIRouter(prefix="/admin/profiles", tags=["Admin"], dependencies=[Depends(require_token)],
+                   include_in_schema=False)
+
+
+@router.get("")
+def read_profiles():
+    return list_profiles()
+
+
+@router.get("/{profile_id}")
+def download_profile(profile_id: str, format: str = Query("html", pattern="^(html|pstats)$")):
+    if not _PROFILE_ID.match(profile_id):
+        raise HTTPException(status_code=404, detail="Profile Not Found")
+    path = PROFILE_DIR / f"{profile_id}.{format}"
+    if not path.exists():
+        raise HTTPException(status_code=404, detail="Profile Not Found")
+    return FileResponse(path, media_type=_FORMATS[format], filename=path.name)
+
+
+def install(app: FastAPI):
+    """Call after the routers are included: their sync endpoints are wrapped here."""
+    if not PROFILING_ENABLED:
+        return
+    if PROFILER == "pyinstrument":
+        import pyinstrument  # noqa: F401  fail at startup, not on the first profiled request
+    if not PROFILE_TOKEN and not PROFILE_SAMPLE_RATE:
+        logger.warning("PROFILING=on without PROFILE_TOKEN or PROFILE_SAMPLE_RATE: no request will be profiled")
+
+    app.include_router(router)
+    _sync_endpoints(app)
+
+    @app.middleware("http")
+    async def profiling_middleware(request: Request, call_next):
+        global _busy
+        trigger = None if _busy else _triggered(request)
+        if trigger is None:
+            return await call_next(request)
+
+        _busy = True
+        profile = RequestProfile(PROFILER)
+        token = _active.set(profile)
+        started = time.perf_counter()
+        profile.start()
+        try:
+            response = await call_next(request)
+        finally:
+            profile.stop()
+            _active.reset(token)
+            _busy = False
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        if trigger == "sample" and elapsed_ms < PROFILE_MIN_MS:
+            return response
+
+        route = request.scope.get("route")
+        profile_id = f"{time.time_ns()}-{secrets.token_hex(3)}"
+        meta = {
+            "method": request.method, "path": request.url.path, "route": getattr(route, "path", None),
+            "status": response.status_code, "duration_ms": round(elapsed_ms, 1), "trigger": trigger,
+            "profiler": PROFILER, "created": time.time(),
+        }
+        title = f"{request.method} {request.url.path} {response.status_code} {elapsed_ms:.0f} ms"
+        # rendering and writing happen off the request
+        task = asyncio.create_task(asyncio.to_thread(lambda: save(profile_id, meta, profile.render(title))))
+        _pending.add(task)
+        task.add_done_callback(_saved)
+        response.headers["X-Profile-Id"] = profile_id
+        return response
+
+
+def _saved(task: asyncio.Task):
+    _pending.discard(task)
+    if not task.cancelled() and task.exception() is not None:
+        logger.warning("could not save profile: %r", task.exception())
@@ -0,0 +1,125 @@
+"""Per-request SQL query counting with per-route budgets, to keep N+1 patterns out.
+
+QUERY_COUNTER=off      (default) nothing is installed, zero overhead
+QUERY_COUNTER=debug    X-Query-Count / X-Query-Budget headers, warning logged over budget
+QUERY_COUNTER=enforce  a route over its budget answers 500 instead of its normal response (for tests)
+"""
+import logging
+import os
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional
+
+from dotenv import load_dotenv
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+QUERY_COUNTER_MODE = os.getenv("QUERY_COUNTER", "off").lower()
+
+# Maximum statements per request, keyed by "METHOD /route/path".
+ROUTE_BUDGETS: dict[str, int] = {
+    "POST /auth/register": 3,
+    "POST /auth/login": 1,
+    "POST /jobs/create": 2,
+    "GET /jobs/read": 1,
+    "GET /jobs/{job_id}": 1,
+    "POST /candidates/create": 5,
+    "GET /candidates/read": 1,
+    "GET /candidates/{candidate_id}": 1,
+    "GET /candidates/{candidate_id}/resume": 1,
+    "POST /matches/create": 8,     # context, claim (+2 taking over a dead claim), re-check, insert + refresh, release
+    "POST /matches/batch": 3,
+    "GET /matches/read": 1,
+    "GET /matches/{job_id}/{candidate_id}": 1,
+    "POST /interviews/create": 5,
+    "GET /interviews/slots": 1,
+    "GET /interviews/read": 1,
+    "GET /interviews/{job_id}/{candidate_id}": 1,
+    "GET /analytics/summary": 4,
+}
+
+_current: ContextVar[Optional["QueryCounter"]] = ContextVar("query_counter", default=None)
+
+
+class QueryCounter:
+    def __init__(self):
+        self.count = 0
+        self.statements: list[str] = []
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    counter = _current.get()
+    if counter is not None:
+        counter.count += 1
+        counter.statements.append(statement)
+
+
+def install_listener(engine: Engine):
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+
+
+@contextmanager
+def count_queries(budget: Optional[int] = None):
+    """Counts statements run inside the block; raises QueryBudgetExceeded past ``budget``.
+
+        with count_queries(budget=3) as counter:
+            client.post("/matches/create", ...)
+    """
+    counter = QueryCounter()
+    token = _current.set(counter)
+    try:
+        yield counter
+    finally:
+        _current.reset(token)
+    if budget is not None and counter.count > budget:
+        raise QueryBudgetExceeded(f"{counter.count} queries, budget {budget}:\n" + "\n".join(counter.statements))
+
+
+@contextmanager
+def uncounted():
+    """Statements inside the block are not charged to the current request, e.g. polling while
+    another worker finishes the same work: the number of polls depends on timing, not on the route."""
+    token = _current.set(None)
+    try:
+        yield
+    finally:
+        _current.reset(token)
+
+
+def install(app: FastAPI, engine: Engine, mode: str = QUERY_COUNTER_MODE):
+    if mode == "off":
+        return
+    install_listener(engine)
+
+    @app.middleware("http")
+    async def query_budget_middleware(request: Request, call_next):
+        counter = QueryCounter()
+        _current.set(counter)
+        response = await call_next(request)
+
+        route = request.scope.get("route")
+        key = f"{request.method} {getattr(route, 'path', request.url.path)}"
+        budget = ROUTE_BUDGETS.get(key)
+        if budget is not None and counter.count > budget:
+            logger.warning("%s ran %d queries (budget %d):\n%s", key, counter.count, budget, "\n".join(counter.statements))
+            if mode == "enforce":
+                return JSONResponse(
+                    status_code=500,
+                    content={"detail": f"Query budget exceeded for {key}: {counter.count} > {budget}",
+                             "statements": counter.statements},
+                )
+        response.headers["X-Query-Count"] = str(counter.count)
+        if budget is not None:
+            response.headers["X-Query-Budget"] = str(budget)
+        return response
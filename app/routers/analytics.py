@@ -0,0 +1,35 @@
+from fastapi import APIRouter, Depends
+from sqlalchemy.orm import Session
+from app import crud, cache
+from app.schemas import analytics_schema
+from app.db import get_db
+from app.dependencies import get_current_user
+from app.models import User
+
+router = APIRouter(prefix="/analytics", tags=["Analytics"])
+
+
+def _summary(db: Session, user_id: int) -> analytics_schema.AnalyticsSummary:
+    totals = crud.get_analytics_totals(db, user_id)
+    width = crud.SCORE_BUCKET_WIDTH
+    counts = {row.bucket: row.count for row in crud.get_score_distribution(db, user_id)}
+    return analytics_schema.AnalyticsSummary(
+        **totals._asdict(),
+        per_job=[analytics_schema.JobStats.model_validate(row) for row in crud.get_job_analytics(db, user_id)],
+        # every bucket is listed, empty ones included, so the chart keeps a fixed x axis
+        score_distribution=[
+            analytics_schema.ScoreBucket(min_score=i * width, max_score=(i + 1) * width, count=counts.get(i, 0))
+            for i in range(100 // width)
+        ],
+        interview_formats=[
+            analytics_schema.FormatCount(format=row.format, count=row.count)
+            for row in crud.get_interview_format_counts(db, user_id)
+        ],
+    )
+
+
+@router.get("/summary", response_model=analytics_schema.AnalyticsSummary)
+def read_summary(db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+    # cached until the next write for this user through crud.py
+    user_id = current_user["id"]
+    return cache.cached(user_id, "analytics:summary", lambda: _summary(db, user_id))
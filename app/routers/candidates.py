@@ -1,11 +1,15 @@
 import os.path
-from fastapi import APIRouter,HTTPException, Depends, UploadFile,File
+from fastapi import APIRouter,HTTPException, Depends, UploadFile,File, BackgroundTasks, Query, Request
+from fastapi.responses import FileResponse, RedirectResponse
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
-from app import crud
+from typing import Optional
+from app import crud, matching, http_cache, fieldsets, extraction
 from app.schemas import candidate_schema
 from app.db import get_db
-from app.agents.cv_agent import cv_agent
-from app.utils.pdf_parser import extract_text_from_pdf
+from app.agents.runner import AgentUnavailableError
+from app.utils.resume_parser import prepare_resume, prepare_resume_text
+from app.utils.blob_store import blob_store, blob_key, spool_upload
 from app.dependencies import get_current_user
 from app.models import User
 
@@ -13,39 +17,107 @@ from app.models import User
 router = APIRouter(prefix="/candidates",tags=["Candidates"])
 
 @router.post("/create",response_model=candidate_schema.Candidate)
-async def create_candidate(file: UploadFile = File(...),db: Session=Depends(get_db),current_user: User = Depends(get_current_user)):
-    temp_path=f"temp_{file.filename}"
+async def create_candidate(background_tasks: BackgroundTasks, file: UploadFile = File(...), auto_match: bool=False, db: Session=Depends(get_db),current_user: User = Depends(get_current_user)):
+    temp_path = None
     try:
-        with open(temp_path,"wb") as f:
-            f.write(await file.read())
+        temp_path, sha256, size = await spool_upload(file)
 
-        pdf_data = extract_text_from_pdf(temp_path)
-        cv_input = candidate_schema.CVInput(**pdf_data)
+        # the same file uploaded before already has its text extracted
+        existing_document = crud.get_resume_document_by_sha(db=db,user_id=current_user["id"],sha256=sha256)
+        if existing_document:
+            prepared = prepare_resume_text(existing_document.raw_text)
+        else:
+            # headings and contact fields are found locally; the agent only gets what needs interpreting.
+            # PyMuPDF holds the thread for the whole parse, so it runs off the event loop
+            prepared = await run_in_threadpool(prepare_resume, temp_path)
+        cv_input = candidate_schema.CVInput(raw_text=prepared.raw_text)
 
 
-        result = await cv_agent.run(cv_input.raw_text)
-        cv_data = result.output.dict()
+        # long resumes are extracted in chunks and merged
+        cv_data = await extraction.extract_cv(prepared)
 
         cv_payload={
             "user_id": current_user["id"],
             **cv_data
         }
 
-        return crud.create_candidate(db=db,candidate=candidate_schema.CandidateBase(**cv_payload))
+        # the file is stored first: a failed upload leaves no candidate without its resume, and a
+        # failed insert only leaves a content-addressed blob that the next upload of it reuses
+        try:
+            await run_in_threadpool(blob_store.put_file, temp_path, blob_key(sha256))
+        except Exception as e:
+            raise HTTPException(status_code=503,detail=f"Resume storage unavailable: {e}")
+
+        created = crud.create_candidate_with_document(db=db,candidate=candidate_schema.CandidateBase(**cv_payload),
+                                                      document=candidate_schema.ResumeDocumentBase(
+            user_id=current_user["id"],
+            sha256=sha256,
+            filename=os.path.basename(file.filename or "resume.pdf"),
+            content_type=file.content_type,
+            size_bytes=size,
+            raw_text=cv_input.raw_text
+        ))
+        if auto_match:
+            # runs after the response is sent; matches appear as the matcher returns
+            background_tasks.add_task(matching.auto_match, current_user["id"], created.id)
+        return created
+    except HTTPException:
+        raise
+    except AgentUnavailableError as e:
+        raise HTTPException(status_code=503,detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=404,detail=str(e))
     finally:
-        if os.path.exists(temp_path):
+        if temp_path and os.path.exists(temp_path):
             os.remove(temp_path)
 
 @router.get("/read",response_model=list[candidate_schema.Candidate])
-def read_candidates(skip: int=0, limit: int=100, db: Session=Depends(get_db),current_user: User = Depends(get_current_user)):
-    return crud.get_candidates(db=db,user_id=current_user["id"],skip=skip,limit=limit)
+def read_candidates(request: Request, skip: int=0, limit: int=100, fields: Optional[str]=Query(None, description=fieldsets.DESCRIPTION),
+                    db: Session=Depends(get_db),current_user: User = Depends(get_current_user)):
+    schema = fieldsets.resolve(fields, candidate_schema.Candidate, candidate_schema.CandidateSummary)
+    columns = fieldsets.columns(schema, candidate_schema.Candidate)
+    return http_cache.cached_json(request, current_user["id"], ("candidates", skip, limit, tuple(schema.model_fields)),
+                                  lambda: crud.get_candidates(db=db,user_id=current_user["id"],skip=skip,limit=limit,columns=columns), list[schema])
 
 @router.get("/{candidate_id}",response_model=candidate_schema.Candidate)
-def read_candidates_by_id(candidate_id: int,db: Session=Depends(get_db),current_user: User = Depends(get_current_user)):
-    db_candidate = crud.get_candidates_by_id(db=db,user_id=current_user["id"],candidate_id=candidate_id)
-    if not db_candidate:
+def read_candidates_by_id(candidate_id: int,request: Request,db: Session=Depends(get_db),current_user: User = Depends(get_current_user)):
+    def load():
+        db_candidate = crud.get_candidates_by_id(db=db,user_id=current_user["id"],candidate_id=candidate_id)
+        if not db_candidate:
+            raise HTTPException(status_code=404,detail="Candidate Not Found")
+        return db_candidate
+    return http_cache.cached_json(request, current_user["id"], ("candidate", candidate_id), load, candidate_schema.Candidate)
+
+@router.patch("/{candidate_id}",response_model=candidate_schema.CandidateUpdateResult)
+async def update_candidate(candidate_id: int, candidate_update: candidate_schema.CandidateUpdate, rescore: bool=False, db: Session=Depends(get_db),current_user: User = Depends(get_current_user)):
+    changes = candidate_update.model_dump(exclude_unset=True)
+    for field in ("name", "email"):
+        if field in changes and not changes[field]:
+            raise HTTPException(status_code=400,detail=f"{field} cannot be empty")
+
+    updated = crud.update_candidate(db=db,user_id=current_user["id"],candidate_id=candidate_id,changes=changes)
+    if not updated:
         raise HTTPException(status_code=404,detail="Candidate Not Found")
-    else:
-        return db_candidate
\ No newline at end of file
+    db_candidate, changed_fields, stale_matches = updated
+    candidate = candidate_schema.Candidate.model_validate(db_candidate)
+
+    result = candidate_schema.CandidateUpdateResult(candidate=candidate, changed_fields=changed_fields, stale_matches=stale_matches)
+    if rescore and stale_matches:
+        rescored = await matching.rescore_stale(db=db,user_id=current_user["id"],candidate_id=candidate_id)
+        result.rescored, result.rescore_failed = rescored.rescored, rescored.failed
+    return result
+
+@router.get("/{candidate_id}/resume")
+def download_candidate_resume(candidate_id: int,db: Session=Depends(get_db),current_user: User = Depends(get_current_user)):
+    document = crud.get_resume_document_by_candidate_id(db=db,user_id=current_user["id"],candidate_id=candidate_id)
+    if not document:
+        raise HTTPException(status_code=404,detail="Resume Not Found")
+
+    key = blob_key(document.sha256)
+    path = blob_store.local_path(key)
+    if path is None:
+        return RedirectResponse(blob_store.presigned_url(key, document.filename))
+    if not path.exists():
+        raise HTTPException(status_code=404,detail="Resume file missing from storage")
+    # FileResponse streams from disk in chunks and honours Range requests
+    return FileResponse(path, media_type=document.content_type or "application/pdf", filename=document.filename)
@@ -0,0 +1,81 @@
+import csv
+import io
+import json
+from datetime import datetime
+from typing import Literal, Optional
+from fastapi import APIRouter, Depends
+from fastapi.responses import StreamingResponse
+from app import crud
+from app.db import SessionLocal
+from app.schemas import candidate_schema, match_schema, interview_schema
+from app.dependencies import get_current_user
+from app.models import User
+
+router = APIRouter(prefix="/exports", tags=["Exports"])
+
+FLUSH_ROWS = 200
+
+def _columns(schema) -> list[str]:
+    return ["id"] + [name for name in schema.model_fields if name != "id"]
+
+EXPORTS = {
+    "candidates": (crud.stream_candidates, _columns(candidate_schema.Candidate)),
+    "matches": (crud.stream_matches, _columns(match_schema.Match)),
+    "interviews": (crud.stream_interviews, _columns(interview_schema.Interview)),
+}
+
+
+def _value(value):
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+def _export_rows(kind: str, fmt: str, user_id: int, filters: dict):
+    stream, columns = EXPORTS[kind]
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if fmt == "csv":
+        writer.writerow(columns)
+
+    # the request's session is closed before the body is streamed, so the export owns its own
+    with SessionLocal() as db:
+        for count, row in enumerate(stream(db, user_id=user_id, **filters), start=1):
+            values = [_value(getattr(row, column)) for column in columns]
+            if fmt == "csv":
+                writer.writerow(values)
+            else:
+                buffer.write(json.dumps(dict(zip(columns, values))))
+                buffer.write("\n")
+            if count % FLUSH_ROWS == 0:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+    yield buffer.getvalue()
+
+
+def _export(kind: str, fmt: str, user_id: int, filters: dict):
+    media_type = "text/csv" if fmt == "csv" else "application/x-ndjson"
+    extension = "csv" if fmt == "csv" else "ndjson"
+    return StreamingResponse(
+        _export_rows(kind, fmt, user_id, filters),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{kind}.{extension}"'},
+    )
+
+
+@router.get("/candidates")
+def export_candidates(format: Literal["csv", "ndjson"] = "csv", job_id: Optional[int] = None,
+                      min_score: Optional[float] = None, max_score: Optional[float] = None,
+                      current_user: User = Depends(get_current_user)):
+    return _export("candidates", format, current_user["id"], {"job_id": job_id, "min_score": min_score, "max_score": max_score})
+
+@router.get("/matches")
+def export_matches(format: Literal["csv", "ndjson"] = "csv", job_id: Optional[int] = None,
+                   min_score: Optional[float] = None, max_score: Optional[float] = None,
+                   current_user: User = Depends(get_current_user)):
+    return _export("matches", format, current_user["id"], {"job_id": job_id, "min_score": min_score, "max_score": max_score})
+
+@router.get("/interviews")
+def export_interviews(format: Literal["csv", "ndjson"] = "csv", job_id: Optional[int] = None,
+                      min_score: Optional[float] = None, max_score: Optional[float] = None,
+                      current_user: User = Depends(get_current_user)):
+    return _export("interviews", format, current_user["id"], {"job_id": job_id, "min_score": min_score, "max_score": max_score})
@@ -0,0 +1,27 @@
+import io
+from typing import Literal, Optional
+from fastapi import APIRouter, Depends, UploadFile, File
+from sqlalchemy.orm import Session
+from app.db import get_db
+from app.importer import import_records, detect_format
+from app.dependencies import get_current_user
+from app.models import User
+
+router = APIRouter(prefix="/imports", tags=["Imports"])
+
+
+def _run_import(kind: str, file: UploadFile, format: Optional[str], chunk_size: int, db: Session, user_id: int):
+    fmt = format or detect_format(file.filename, file.content_type)
+    # read the spooled upload line by line instead of loading it into memory
+    lines = io.TextIOWrapper(file.file, encoding="utf-8", newline="")
+    return import_records(db, kind, lines, fmt, user_id, chunk_size)
+
+@router.post("/jobs")
+def import_jobs(file: UploadFile = File(...), format: Optional[Literal["csv", "ndjson"]] = None, chunk_size: int = 500,
+                db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+    return _run_import("jobs", file, format, chunk_size, db, current_user["id"])
+
+@router.post("/candidates")
+def import_candidates(file: UploadFile = File(...), format: Optional[Literal["csv", "ndjson"]] = None, chunk_size: int = 500,
+                      db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+    return _run_import("candidates", file, format, chunk_size, db, current_user["id"])
@@ -1,9 +1,12 @@
-from fastapi import APIRouter,HTTPException,Depends
+from fastapi import APIRouter,HTTPException,Depends,Query,Request
 from sqlalchemy.orm import Session
-from app import crud
+from app import crud, scheduling, http_cache
+from datetime import datetime, timedelta, timezone
+from typing import Optional
 from app.schemas import interview_schema, job_schema, candidate_schema
 from app.db import get_db
-from app.agents.scheduler import interview_email_agent
+from app.agents.scheduler import interview_email_agent, build_interview_payload
+from app.agents.runner import run_agent, AgentUnavailableError
 from app.utils.gmail_helper import send_email
 from app.models import User
 from app.dependencies import get_current_user
@@ -13,84 +16,96 @@ router = APIRouter(prefix="/interviews",tags=["Interviews"])
 
 @router.post("/create",response_model=interview_schema.Interview)
 async def create_interview(interview: interview_schema.InterviewPOSTEndpoint, db: Session=Depends(get_db),current_user: User = Depends(get_current_user)):
-    job = crud.get_job_by_id(db=db, job_id=interview.job_id,user_id=current_user["id"])
+    job, candidate, existing_interview = crud.get_interview_context(db=db,job_id=interview.job_id,candidate_id=interview.candidate_id,user_id=current_user["id"])
     if not job:
         raise HTTPException(status_code=404, detail=f"Job {interview.job_id} not found")
 
-    candidate = crud.get_candidates_by_id(db=db, candidate_id=interview.candidate_id,user_id=current_user["id"])
     if not candidate:
         raise HTTPException(status_code=404, detail=f"Candidate {interview.candidate_id} not found")
 
     job_dict = job_schema.Job.model_validate(job).model_dump()
     candidate_dict = candidate_schema.Candidate.model_validate(candidate).model_dump()
 
-    existing_interview = crud.get_interviews_by_job_and_candidate_id(db=db,job_id=interview.job_id,candidate_id=interview.candidate_id,user_id=current_user["id"])
     if existing_interview:
         raise HTTPException(
             status_code=460,
             detail=f"Interview already exists for Job {interview.job_id} and Candidate {interview.candidate_id}"
         )
 
-    job_no_id = {k: v for k, v in job_dict.items() if k != "id"}
-    candidate_no_id = {k: v for k, v in candidate_dict.items() if k != "id"}
-
-    job_no_title = {k: v for k, v in job_no_id.items() if k != "title"}
-    candidate_no_name = {k: v for k, v in candidate_no_id.items() if k != "name"}
-
-    job_text = " | ".join(f"{k}: {v}" for k, v in job_no_title.items())
-    cand_text = " | ".join(f"{k}: {v}" for k, v in candidate_no_name.items())
-
-    payload = f"""
-        Job Details:
-        {job_text}
-
-        Candidate Details:
-        {cand_text}
-        
-        Interview DateTime:
-        {interview.interview_datetime.isoformat()}
-        
-        Interview Format:
-        {interview.interview_format}
-        """
+    # reject double bookings before paying for the email agent; the hold is released if booking fails
+    try:
+        async with scheduling.hold(db=db,user_id=current_user["id"],start=interview.interview_datetime,duration_minutes=interview.duration_minutes) as (start, end):
+            return await _book_interview(db, current_user, interview, job_dict, candidate_dict, start, end)
+    except scheduling.SlotConflict as e:
+        raise HTTPException(status_code=409,detail=str(e))
+
+async def _book_interview(db: Session, current_user: User, interview: interview_schema.InterviewPOSTEndpoint,
+                          job_dict: dict, candidate_dict: dict, start: datetime, end: datetime):
+    payload = build_interview_payload(job_dict, candidate_dict, interview)
     try:
-        result = await interview_email_agent.run(payload)
+        result = await run_agent(interview_email_agent, payload, policy="interview_email_agent")
         email_data = result.output.model_dump()
+    except AgentUnavailableError as e:
+        raise HTTPException(status_code=503,detail=f"Error at email generation: {e}")
     except Exception as e:
         raise HTTPException(status_code=404,detail=f"Error at email generation: {e}")
 
-    sent = await send_email(
-        subject=email_data["subject"],
-        body=email_data["body"],
-        recipient_email=email_data["recipient_email"],
-        reply_to=current_user["email"]
-    )
-    if not sent:
-        raise HTTPException(status_code=500,detail="Failed to send interview email")
-
     interview_payload = {
         "user_id":current_user["id"],
         "candidate_id": candidate_dict["id"],
         "candidate_name": candidate_dict["name"],
         "job_id": job_dict["id"],
         "job_title": job_dict["title"],
-        "interview_time": interview.interview_datetime.isoformat(),
+        # stored in UTC so range queries compare like with like on every backend
+        "interview_time": start.isoformat(),
+        "duration_minutes": interview.duration_minutes,
         "format": interview.interview_format,
         "invite_email": candidate_dict["email"]
     }
 
+    # stored before the email goes out: another worker may have booked the slot while the email
+    # was being written, and the check and the insert must be one step (SlotConflict: 409)
     try:
-        return crud.create_interview(db=db,interview=interview_schema.InterviewBase(**interview_payload))
+        booked = scheduling.book(db=db,interview=interview_schema.InterviewBase(**interview_payload),start=start,end=end)
+    except scheduling.SlotConflict:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500,detail=f"Error at interview db insertion:{e}")
 
+    sent = await send_email(
+        subject=email_data["subject"],
+        body=email_data["body"],
+        recipient_email=email_data["recipient_email"],
+        reply_to=current_user["email"]
+    )
+    if not sent:
+        crud.delete_interview(db=db,user_id=current_user["id"],interview_id=booked.id)
+        raise HTTPException(status_code=500,detail="Failed to send interview email")
+    return booked
+
+@router.get("/slots",response_model=list[interview_schema.Slot])
+def read_free_slots(start: Optional[datetime]=None, end: Optional[datetime]=None, duration_minutes: int=Query(60, gt=0, le=scheduling.MAX_INTERVIEW_MINUTES),
+                    db: Session=Depends(get_db),current_user: User = Depends(get_current_user)):
+    # naive values are taken as UTC, as everywhere else in the calendar
+    start = scheduling.as_utc(start) if start else datetime.now(timezone.utc)
+    end = scheduling.as_utc(end) if end else start + timedelta(days=7)
+    if end <= start:
+        raise HTTPException(status_code=400,detail="end must be after start")
+    if end - start > timedelta(days=scheduling.MAX_SLOT_SEARCH_DAYS):
+        raise HTTPException(status_code=400,detail=f"Range is limited to {scheduling.MAX_SLOT_SEARCH_DAYS} days")
+    return [interview_schema.Slot(start=s, end=e) for s, e in scheduling.free_slots(
+        db=db,user_id=current_user["id"],start=start,end=end,duration_minutes=duration_minutes)]
+
 @router.get("/read",response_model=list[interview_schema.Interview])
-def read_interviews(skip: int=0,limit: int=100,db: Session=Depends(get_db),current_user: User = Depends(get_current_user)):
-    return crud.get_interviews(db=db,skip=skip,limit=limit,user_id=current_user["id"])
+def read_interviews(request: Request,skip: int=0,limit: int=100,db: Session=Depends(get_db),current_user: User = Depends(get_current_user)):
+    return http_cache.cached_json(request, current_user["id"], ("interviews", skip, limit),
+                                  lambda: crud.get_interviews(db=db,skip=skip,limit=limit,user_id=current_user["id"]), list[interview_schema.Interview])
 
 @router.get("/{job_id}/{candidate_id}",response_model=interview_schema.Interview)
-def read_interviews_by_job_and_candidate(job_id: int,candidate_id: int,db: Session=Depends(get_db),current_user: User = Depends(get_current_user)):
-    db_interview = crud.get_interviews_by_job_and_candidate_id(db=db,job_id=job_id,candidate_id=candidate_id,user_id=current_user["id"])
-    if not db_interview:
-        raise HTTPException(status_code=404,detail=f"No interview found for Job ID {job_id} and Candidate ID {candidate_id}")
-    return db_interview
\ No newline at end of file
+def read_interviews_by_job_and_candidate(job_id: int,candidate_id: int,request: Request,db: Session=Depends(get_db),current_user: User = Depends(get_current_user)):
+    def load():
+        db_interview = crud.get_interviews_by_job_and_candidate_id(db=db,job_id=job_id,candidate_id=candidate_id,user_id=current_user["id"])
+        if not db_interview:
+            raise HTTPException(status_code=404,detail=f"No interview found for Job ID {job_id} and Candidate ID {candidate_id}")
+        return db_interview
+    return http_cache.cached_json(request, current_user["id"], ("interview", job_id, candidate_id), load, interview_schema.Interview)
\ No newline at end of file
@@ -1,9 +1,10 @@
-from fastapi import APIRouter, Depends, HTTPException
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from sqlalchemy.orm import Session
-from app  import crud
+from app  import crud, matching, http_cache, fieldsets, extraction
 from app.schemas import job_schema
 from app.db import get_db
-from app.agents.jd_agent import jd_agent
+from app.agents.runner import AgentUnavailableError
 from app.dependencies import get_current_user
 from app.models import User
 
@@ -12,8 +13,7 @@ router = APIRouter(prefix="/jobs", tags=["Jobs"])
 @router.post("/create",response_model=job_schema.Job)
 async def create_job(jd_input: job_schema.JDInput, db: Session=Depends(get_db),current_user: User = Depends(get_current_user)):
     try:
-        result = await jd_agent.run(jd_input.raw_text)
-        job_data = result.output.dict()
+        job_data = await extraction.extract_jd(jd_input.raw_text)
 
         job_payload={
             "user_id":current_user["id"],
@@ -21,16 +21,42 @@ async def create_job(jd_input: job_schema.JDInput, db: Session=Depends(get_db),c
         }
 
         return crud.create_job(db=db, job=job_schema.JobBase(**job_payload))
+    except AgentUnavailableError as e:
+        raise HTTPException(status_code=503,detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500,detail=str(e))
 
 @router.get("/read",response_model=list[job_schema.Job])
-def read_jobs(skip: int=0,limit: int=100, db: Session=Depends(get_db),current_user: User = Depends(get_current_user)):
-    return crud.get_jobs(db=db,user_id=current_user["id"],skip=skip,limit=limit)
+def read_jobs(request: Request, skip: int=0,limit: int=100, fields: Optional[str]=Query(None, description=fieldsets.DESCRIPTION),
+              db: Session=Depends(get_db),current_user: User = Depends(get_current_user)):
+    schema = fieldsets.resolve(fields, job_schema.Job, job_schema.JobSummary)
+    columns = fieldsets.columns(schema, job_schema.Job)
+    return http_cache.cached_json(request, current_user["id"], ("jobs", skip, limit, tuple(schema.model_fields)),
+                                  lambda: crud.get_jobs(db=db,user_id=current_user["id"],skip=skip,limit=limit,columns=columns), list[schema])
 
 @router.get("/{job_id}",response_model=job_schema.Job)
-def read_jobs_by_id(job_id: int, db: Session=Depends(get_db),current_user: User = Depends(get_current_user)):
-    db_job = crud.get_job_by_id(db=db,user_id=current_user["id"],job_id=job_id)
-    if not db_job:
+def read_jobs_by_id(job_id: int, request: Request, db: Session=Depends(get_db),current_user: User = Depends(get_current_user)):
+    def load():
+        db_job = crud.get_job_by_id(db=db,user_id=current_user["id"],job_id=job_id)
+        if not db_job:
+            raise HTTPException(status_code=404, detail="Not Found")
+        return db_job
+    return http_cache.cached_json(request, current_user["id"], ("job", job_id), load, job_schema.Job)
+
+@router.patch("/{job_id}",response_model=job_schema.JobUpdateResult)
+async def update_job(job_id: int, job_update: job_schema.JobUpdate, rescore: bool=False, db: Session=Depends(get_db),current_user: User = Depends(get_current_user)):
+    changes = job_update.model_dump(exclude_unset=True)
+    if "title" in changes and not changes["title"]:
+        raise HTTPException(status_code=400, detail="title cannot be empty")
+
+    updated = crud.update_job(db=db,user_id=current_user["id"],job_id=job_id,changes=changes)
+    if not updated:
         raise HTTPException(status_code=404, detail="Not Found")
-    return db_job
\ No newline at end of file
+    db_job, changed_fields, stale_matches = updated
+    job = job_schema.Job.model_validate(db_job)
+
+    result = job_schema.JobUpdateResult(job=job, changed_fields=changed_fields, stale_matches=stale_matches)
+    if rescore and stale_matches:
+        rescored = await matching.rescore_stale(db=db,user_id=current_user["id"],job_id=job_id)
+        result.rescored, result.rescore_failed = rescored.rescored, rescored.failed
+    return result
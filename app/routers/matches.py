@@ -1,9 +1,10 @@
-from fastapi import APIRouter,HTTPException,Depends
+from fastapi import APIRouter,HTTPException,Depends,Query,Request
 from sqlalchemy.orm import Session
-from app import crud
+from app import crud, matching, http_cache, fieldsets
+from typing import Optional
 from app.schemas import match_schema, job_schema, candidate_schema
 from app.db import get_db
-from app.agents.matcher import matcher_agent
+from app.agents.runner import AgentUnavailableError
 from app.models import User
 from app.dependencies import get_current_user
 
@@ -11,62 +12,80 @@ router = APIRouter(prefix="/matches",tags=["Matches"])
 
 @router.post("/create",response_model=match_schema.Match)
 async def create_match(match: match_schema.MatchPOSTEndpoint,db: Session=Depends(get_db),current_user: User = Depends(get_current_user)):
-    job = crud.get_job_by_id(db=db,job_id=match.job_id,user_id=current_user["id"])
+    job, candidate, existing_match = crud.get_match_context(db=db,job_id=match.job_id,candidate_id=match.candidate_id,user_id=current_user["id"])
     if not job:
         raise HTTPException(status_code=404,detail=f"Job {match.job_id} not found")
 
-    candidate =  crud.get_candidates_by_id(db=db,candidate_id=match.candidate_id,user_id=current_user["id"])
     if not candidate:
         raise HTTPException(status_code=404,detail=f"Candidate {match.candidate_id} not found")
 
-    existing_match = crud.get_matches_by_job_and_candidate_id(db=db,job_id=match.job_id, candidate_id=match.candidate_id,user_id=current_user["id"])
     if existing_match:
         return existing_match
 
-    job_dict = job_schema.Job.model_validate(job).model_dump()
-    candidate_dict = candidate_schema.Candidate.model_validate(candidate).model_dump()
-
-    job_no_id = {k: v for k, v in job_dict.items() if k != "id"}
-    candidate_no_id = {k: v for k, v in candidate_dict.items() if k != "id"}
-
-    job_no_title = {k: v for k, v in job_no_id.items() if k != "title"}
-    candidate_no_name = {k: v for k, v in candidate_no_id.items() if k != "name"}
+    try:
+        # concurrent requests for the same pair share one matcher call and one stored row
+        return await matching.create_match_once(
+            current_user["id"], job_schema.Job.model_validate(job), candidate_schema.Candidate.model_validate(candidate))
+    except matching.MatchInProgress as e:
+        raise HTTPException(status_code=409,detail=str(e))
+    except AgentUnavailableError as e:
+        raise HTTPException(status_code=503,detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500,detail=str(e))
 
-    job_text = " | ".join(f"{k}: {v}" for k, v in job_no_title.items())
-    cand_text = " | ".join(f"{k}: {v}" for k, v in candidate_no_name.items())
+@router.post("/batch",response_model=match_schema.MatchBatchResult)
+async def create_matches_batch(batch: match_schema.MatchBatchPOSTEndpoint,db: Session=Depends(get_db),current_user: User = Depends(get_current_user)):
+    db_job = crud.get_job_by_id(db=db,user_id=current_user["id"],job_id=batch.job_id)
+    if not db_job:
+        raise HTTPException(status_code=404,detail=f"Job {batch.job_id} not found")
 
-    payload = f"""
-    Job Details:
-    {job_text}
+    if batch.candidate_ids is not None and len(batch.candidate_ids) > matching.MATCH_BATCH_MAX:
+        raise HTTPException(status_code=422,detail=f"At most {matching.MATCH_BATCH_MAX} candidates per batch")
 
-    Candidate Details:
-    {cand_text}
-    """
-    
-    try:
-        result = await matcher_agent.run(payload)
-        match_data = result.output.model_dump()
+    job = job_schema.Job.model_validate(db_job)
+    # one extra row tells whether unmatched candidates are left for another request
+    candidates = [candidate_schema.Candidate.model_validate(c) for c in crud.get_unmatched_candidates(
+        db=db,user_id=current_user["id"],job_id=batch.job_id,candidate_ids=batch.candidate_ids,limit=matching.MATCH_BATCH_MAX + 1)]
+    has_more = len(candidates) > matching.MATCH_BATCH_MAX
+    candidates = candidates[:matching.MATCH_BATCH_MAX]
+    # packed: the job is sent once per group of candidates instead of once per candidate
+    scores = await matching.score_many(job, candidates)
 
-        match_payload = {
-            "user_id":current_user["id"],
-            "job_id": job_dict["id"],
-            "job_title": job_dict["title"],
-            "candidate_id": candidate_dict["id"],
-            "candidate_name": candidate_dict["name"],
-            **match_data
-        }
+    created = crud.bulk_create_matches(db=db,matches=[
+        match_schema.MatchBase(
+            user_id=current_user["id"],
+            job_id=job.id,
+            job_title=job.title,
+            candidate_id=candidate.id,
+            candidate_name=candidate.name,
+            **scores[candidate.id],
+        )
+        for candidate in candidates if scores.get(candidate.id) is not None
+    ])
+    return match_schema.MatchBatchResult(
+        matches=created,
+        failed=[candidate.id for candidate in candidates if scores.get(candidate.id) is None],
+        has_more=has_more,
+    )
 
-        return crud.create_match(db=db,match=match_schema.MatchBase(**match_payload))
-    except Exception as e:
-        raise HTTPException(status_code=500,detail=str(e))
+@router.post("/rescore",response_model=match_schema.RescoreResult)
+async def rescore_stale_matches(job_id: Optional[int]=None, candidate_id: Optional[int]=None, db: Session=Depends(get_db),current_user: User = Depends(get_current_user)):
+    # only matches marked stale by a job/candidate edit are sent back to the matcher
+    return await matching.rescore_stale(db=db,user_id=current_user["id"],job_id=job_id,candidate_id=candidate_id)
 
 @router.get("/read",response_model=list[match_schema.Match])
-def read_matches(skip: int=0,limit: int=100,db: Session=Depends(get_db),current_user: User = Depends(get_current_user)):
-    return crud.get_matches(db=db,skip=skip,limit=limit,user_id=current_user["id"])
+def read_matches(request: Request,skip: int=0,limit: int=100,fields: Optional[str]=Query(None, description=fieldsets.DESCRIPTION),
+                 db: Session=Depends(get_db),current_user: User = Depends(get_current_user)):
+    schema = fieldsets.resolve(fields, match_schema.Match, match_schema.MatchSummary)
+    columns = fieldsets.columns(schema, match_schema.Match)
+    return http_cache.cached_json(request, current_user["id"], ("matches", skip, limit, tuple(schema.model_fields)),
+                                  lambda: crud.get_matches(db=db,skip=skip,limit=limit,user_id=current_user["id"],columns=columns), list[schema])
 
 @router.get("/{job_id}/{candidate_id}", response_model=match_schema.Match)
-def read_match_by_job_and_candidate(job_id: int, candidate_id: int, db: Session = Depends(get_db),current_user: User = Depends(get_current_user)):
-    db_match = crud.get_matches_by_job_and_candidate_id(db=db, job_id=job_id, candidate_id=candidate_id,user_id=current_user["id"])
-    if not db_match:
-        raise HTTPException(status_code=404, detail=f"No match found for Job ID {job_id} and Candidate ID {candidate_id}")
-    return db_match
\ No newline at end of file
+def read_match_by_job_and_candidate(job_id: int, candidate_id: int, request: Request, db: Session = Depends(get_db),current_user: User = Depends(get_current_user)):
+    def load():
+        db_match = crud.get_matches_by_job_and_candidate_id(db=db, job_id=job_id, candidate_id=candidate_id,user_id=current_user["id"])
+        if not db_match:
+            raise HTTPException(status_code=404, detail=f"No match found for Job ID {job_id} and Candidate ID {candidate_id}")
+        return db_match
+    return http_cache.cached_json(request, current_user["id"], ("match", job_id, candidate_id), load, match_schema.Match)
\ No newline at end of file
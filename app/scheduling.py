@@ -0,0 +1,134 @@
+"""Per-recruiter interview calendars: double-booking checks and free-slot search.
+
+Each worker keeps an ``IntervalIndex`` per recruiter, loaded from the
+(user_id, interview_time) index and reloaded after SLOT_INDEX_TTL seconds, so the
+pre-check before the email agent runs costs no query on a warm calendar. Holds still in
+flight in this worker are carried over when the index is reloaded. Other workers' bookings
+only show up after a reload; ``book`` is the final check, made atomically with the insert.
+
+Reloads query the database outside ``_lock``, which only guards the in-memory indexes, so
+the event loop (``hold``) never waits behind a threadpool query (``free_slots``).
+"""
+import asyncio
+import os
+import threading
+import time
+import weakref
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta, timezone
+
+from dotenv import load_dotenv
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.orm import Session
+
+from app import cache, crud
+from app.schemas import interview_schema
+from app.utils.interval_index import IntervalIndex
+
+load_dotenv()
+
+SLOT_INDEX_TTL = float(os.getenv("SLOT_INDEX_TTL", 30))
+MAX_INTERVIEW_MINUTES = 480
+MAX_SLOT_SEARCH_DAYS = 31
+
+_calendars: dict[int, tuple[float, IntervalIndex]] = {}
+# per recruiter: held slots whose booking is not stored yet, so a reload must not drop them
+_holds: dict[int, list[tuple[datetime, datetime]]] = {}
+_lock = threading.Lock()
+# per recruiter, while in use: holds wait here, on the event loop, for each other's reloads
+_hold_locks: weakref.WeakValueDictionary[int, asyncio.Lock] = weakref.WeakValueDictionary()
+
+
+class SlotConflict(Exception):
+    def __init__(self, start: datetime, end: datetime):
+        self.start, self.end = start, end
+        super().__init__(f"Already booked from {start.isoformat()} to {end.isoformat()}")
+
+
+def as_utc(value: datetime) -> datetime:
+    # naive values come from SQLite and are stored in UTC
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value.astimezone(timezone.utc)
+
+
+def _refresh(db: Session, user_id: int):
+    """Reloads the recruiter's index when it is missing or older than SLOT_INDEX_TTL. Blocking;
+    callers then read ``_calendars[user_id]`` under ``_lock``."""
+    loaded = _calendars.get(user_id)
+    if loaded is not None and time.monotonic() - loaded[0] <= SLOT_INDEX_TTL:
+        return
+    rows = crud.get_interview_intervals(db=db, user_id=user_id)
+    index = IntervalIndex(
+        (as_utc(start), as_utc(start) + timedelta(minutes=minutes)) for start, minutes in rows
+    )
+    with _lock:
+        # holds taken while the query ran are in _holds by now
+        for start, end in _holds.get(user_id, ()):
+            index.add(start, end)
+        _calendars[user_id] = (time.monotonic(), index)
+
+
+@asynccontextmanager
+async def hold(db: Session, user_id: int, start: datetime, duration_minutes: int):
+    """Reserves ``[start, start + duration)`` in the recruiter's calendar, or raises SlotConflict.
+
+    The reservation stays if the block completes and is released if it raises, so a
+    concurrent request for the same slot is turned away before its agent call."""
+    start = as_utc(start)
+    end = start + timedelta(minutes=duration_minutes)
+    lock = _hold_locks.get(user_id) or _hold_locks.setdefault(user_id, asyncio.Lock())
+    async with lock:
+        await run_in_threadpool(_refresh, db, user_id)
+        with _lock:
+            index = _calendars[user_id][1]
+            busy = index.conflict(start, end)
+            if busy:
+                raise SlotConflict(*busy)
+            index.add(start, end)
+            _holds.setdefault(user_id, []).append((start, end))
+    try:
+        yield start, end
+    except BaseException:
+        with _lock:
+            # the index may have been reloaded (with this hold carried over) since it was taken
+            _calendars[user_id][1].remove(start, end)
+        raise
+    finally:
+        with _lock:
+            _holds[user_id].remove((start, end))
+            if not _holds[user_id]:
+                del _holds[user_id]
+
+
+def book(db: Session, interview: interview_schema.InterviewBase, start: datetime, end: datetime) -> interview_schema.Interview:
+    """Stores ``interview`` unless a stored interview overlaps ``[start, end)``; raises SlotConflict.
+
+    The insert, the overlap check and the commit run under the recruiter's calendar lock, so
+    two workers booking the same slot cannot both pass the check."""
+    crud.lock_calendar(db, interview.user_id)
+    db_interview = crud.add_interview(db, interview)
+    clash = find_overlap(db, interview.user_id, start, end, exclude_id=db_interview.id)
+    if clash:
+        clash_start = as_utc(clash.interview_time)
+        clash_end = clash_start + timedelta(minutes=clash.duration_minutes)
+        db.rollback()
+        raise SlotConflict(clash_start, clash_end)
+    booked = interview_schema.Interview.model_validate(db_interview)
+    db.commit()
+    cache.invalidate_user(interview.user_id)
+    return booked
+
+
+def find_overlap(db: Session, user_id: int, start: datetime, end: datetime, exclude_id: int = None):
+    """First stored interview overlapping ``[start, end)``, or None; a range scan on (user_id, interview_time)."""
+    nearby = crud.get_interviews_starting_between(
+        db=db, user_id=user_id, after=start - timedelta(minutes=MAX_INTERVIEW_MINUTES), before=end)
+    return next((interview for interview in nearby if interview.id != exclude_id
+                 and as_utc(interview.interview_time) + timedelta(minutes=interview.duration_minutes) > start), None)
+
+
+def free_slots(db: Session, user_id: int, start: datetime, end: datetime,
+               duration_minutes: int) -> list[tuple[datetime, datetime]]:
+    """Free windows of at least ``duration_minutes`` between ``start`` and ``end``."""
+    _refresh(db, user_id)
+    with _lock:
+        return _calendars[user_id][1].free(as_utc(start), as_utc(end), timedelta(minutes=duration_minutes))
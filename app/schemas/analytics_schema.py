@@ -0,0 +1,32 @@
+from pydantic import BaseModel
+from typing import Optional
+
+
+class JobStats(BaseModel):
+    job_id: int
+    title: str
+    candidates: int
+    avg_match_score: Optional[float] = None
+    max_match_score: Optional[float] = None
+    interviews: int
+
+    model_config = {"from_attributes": True}
+
+class ScoreBucket(BaseModel):
+    min_score: int
+    max_score: int
+    count: int
+
+class FormatCount(BaseModel):
+    format: str
+    count: int
+
+class AnalyticsSummary(BaseModel):
+    jobs: int
+    candidates: int
+    matches: int
+    interviews: int
+    avg_match_score: Optional[float] = None
+    per_job: list[JobStats]
+    score_distribution: list[ScoreBucket]
+    interview_formats: list[FormatCount]
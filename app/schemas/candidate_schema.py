@@ -1,5 +1,6 @@
 from pydantic import BaseModel, EmailStr
 from typing import Optional
+from datetime import datetime
 
 
 class CandidateBase(BaseModel):
@@ -17,6 +18,33 @@ class CandidateBase(BaseModel):
 class Candidate(CandidateBase):
     id: int
 
+class CandidateSummary(BaseModel):
+    # list views: no long text columns
+    id: int
+    user_id: int
+    name: Optional[str] = None
+    email: Optional[EmailStr] = None
+    phone: Optional[str] = None
+
+    model_config = {"from_attributes": True}
+
+
+class CandidateUpdate(BaseModel):
+    name: Optional[str] = None
+    email: Optional[EmailStr] = None
+    phone: Optional[str] = None
+    skills: Optional[str] = None
+    education: Optional[str] = None
+    experience: Optional[str] = None
+    certifications: Optional[str] = None
+
+class CandidateUpdateResult(BaseModel):
+    candidate: Candidate
+    changed_fields: list[str]
+    stale_matches: int
+    rescored: int = 0
+    rescore_failed: list[int] = []
+
 
 class CVInput(BaseModel):
     raw_text: str
@@ -30,4 +58,19 @@ class CVOutput(BaseModel):
     experience: Optional[str] = None
     certifications: Optional[str] = None
 
-    model_config = {"from_attributes": True}
\ No newline at end of file
+    model_config = {"from_attributes": True}
+
+class ResumeDocumentBase(BaseModel):
+    user_id: int
+    candidate_id: Optional[int] = None   # filled in when stored together with a new candidate
+    sha256: str
+    filename: str
+    content_type: Optional[str] = None
+    size_bytes: int
+    raw_text: str
+
+    model_config = {"from_attributes": True}
+
+class ResumeDocument(ResumeDocumentBase):
+    id: int
+    created_at: Optional[datetime] = None
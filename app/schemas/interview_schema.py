@@ -14,6 +14,7 @@ class InterviewBase(BaseModel):
     interview_time: Optional[datetime] = None
     format: Optional[str] = None
     invite_email: Optional[EmailStr] = None
+    duration_minutes: Optional[int] = 60
 
     model_config = {"from_attributes": True}
 
@@ -30,8 +31,13 @@ class InterviewPOSTEndpoint(BaseModel):
         example=datetime(2025, 9, 27, 9, 0, tzinfo=IST).isoformat()
     )
     interview_format: str = Field(..., description="Format of the interview")
+    duration_minutes: int = Field(60, gt=0, le=480, description="Length of the interview in minutes")
 
 class EmailContent(BaseModel):
     subject: str
     body: str
-    recipient_email: EmailStr
\ No newline at end of file
+    recipient_email: EmailStr
+
+class Slot(BaseModel):
+    start: datetime
+    end: datetime
@@ -16,6 +16,30 @@ class JobBase(BaseModel):
 class Job(JobBase):
     id: int
 
+class JobSummary(BaseModel):
+    # list views: no long text columns
+    id: int
+    user_id: int
+    title: Optional[str] = None
+
+    model_config = {"from_attributes": True}
+
+
+class JobUpdate(BaseModel):
+    title: Optional[str] = None
+    summary: Optional[str] = None
+    skills: Optional[str] = None
+    experience_required: Optional[str] = None
+    education_required: Optional[str] = None
+    responsibilities: Optional[str] = None
+
+class JobUpdateResult(BaseModel):
+    job: Job
+    changed_fields: list[str]
+    stale_matches: int
+    rescored: int = 0
+    rescore_failed: list[int] = []
+
 
 class JDInput(BaseModel):
     raw_text: str
@@ -18,6 +18,20 @@ class MatchBase(BaseModel):
 
 class Match(MatchBase):
     id: int
+    is_stale: bool = False
+
+class MatchSummary(BaseModel):
+    # list views: scores without the reasoning and gap texts
+    id: int
+    user_id: int
+    job_id: Optional[int] = None
+    job_title: Optional[str] = None
+    candidate_id: Optional[int] = None
+    candidate_name: Optional[str] = None
+    match_score: Optional[float] = None
+    is_stale: bool = False
+
+    model_config = {"from_attributes": True}
 
 
 class MatchLLMOutput(BaseModel):
@@ -27,6 +41,32 @@ class MatchLLMOutput(BaseModel):
     missing_experience: Optional[str] = None
     missing_education: Optional[str] = None
 
+class PackedMatchItem(BaseModel):
+    # loosely typed on purpose: one malformed item must not fail the whole packed response;
+    # each item is re-validated against MatchLLMOutput and retried alone if it fails
+    candidate_id: int
+    match_score: Optional[int] = None
+    reasoning: Optional[str] = None
+    missing_skills: Optional[str] = None
+    missing_experience: Optional[str] = None
+    missing_education: Optional[str] = None
+
+class PackedMatchLLMOutput(BaseModel):
+    matches: list[PackedMatchItem]
+
 class MatchPOSTEndpoint(BaseModel):
     job_id: Optional[int] = None
-    candidate_id: Optional[int] = None
\ No newline at end of file
+    candidate_id: Optional[int] = None
+
+class MatchBatchPOSTEndpoint(BaseModel):
+    job_id: int
+    candidate_ids: Optional[list[int]] = None   # None: the next MATCH_BATCH_MAX candidates not yet matched with the job
+
+class RescoreResult(BaseModel):
+    rescored: int
+    failed: list[int] = []
+
+class MatchBatchResult(BaseModel):
+    matches: list[Match]
+    failed: list[int] = []   # candidate ids that could not be scored
+    has_more: bool = False   # unmatched candidates are left over: send the request again
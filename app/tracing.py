@@ -0,0 +1,288 @@
+"""Lightweight request tracing: nested spans, a ``Server-Timing`` header and a slow-request log.
+
+Spans are opened around each request, every ``crud`` function and SQL statement, agent calls
+and their model attempts, rate limiter queueing, PDF extraction and email sends. Each span
+carries a stage (``db``, ``agent``, ``llm``, ``queue``, ``pdf``, ``email``). The response's
+``Server-Timing`` header sums the time per stage. Stages overlap (``llm`` runs inside
+``agent``), and concurrent spans add up, so a stage can exceed the total.
+
+Span ids follow W3C trace context: an incoming ``traceparent`` header is continued. With
+TRACE_EXPORTER=console or file, finished spans are written as JSON lines in the same shape as
+the OpenTelemetry SDK's console exporter.
+
+TRACING=off            nothing is installed and ``span`` is a no-op
+SLOW_REQUEST_MS=2000   requests slower than this are logged with their full span tree
+TRACE_EXPORTER         unset (default), "console" (stderr) or "file"
+TRACE_FILE=traces.jsonl
+"""
+import functools
+import inspect
+import json
+import logging
+import os
+import re
+import secrets
+import sys
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Optional
+
+from dotenv import load_dotenv
+from fastapi import FastAPI, Request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+TRACING_ENABLED = os.getenv("TRACING", "on").lower() != "off"
+SLOW_REQUEST_MS = float(os.getenv("SLOW_REQUEST_MS", 2000))
+TRACE_EXPORTER = os.getenv("TRACE_EXPORTER", "").lower()
+TRACE_FILE = os.getenv("TRACE_FILE", "traces.jsonl")
+SERVICE_NAME = "aptivhire"
+MAX_STATEMENT_CHARS = 500
+
+_TRACEPARENT = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-[0-9a-f]{2}$")
+
+
+@dataclass
+class Trace:
+    trace_id: str
+    spans: list["Span"] = field(default_factory=list)
+
+
+@dataclass
+class Span:
+    name: str
+    trace: Trace
+    parent_id: Optional[str]
+    stage: Optional[str] = None
+    kind: str = "INTERNAL"
+    attributes: dict = field(default_factory=dict)
+    span_id: str = field(default_factory=lambda: secrets.token_hex(8))
+    start_ns: int = field(default_factory=time.time_ns)
+    end_ns: Optional[int] = None
+    error: Optional[str] = None
+
+    @property
+    def duration_ms(self) -> float:
+        return ((self.end_ns or time.time_ns()) - self.start_ns) / 1e6
+
+    def to_otel(self) -> dict:
+        def iso(ns):
+            return datetime.fromtimestamp(ns / 1e9, timezone.utc).isoformat().replace("+00:00", "Z")
+
+        attributes = dict(self.attributes)
+        if self.stage:
+            attributes["app.stage"] = self.stage
+        return {
+            "name": self.name,
+            "context": {"trace_id": "0x" + self.trace.trace_id, "span_id": "0x" + self.span_id, "trace_state": "[]"},
+            "kind": f"SpanKind.{self.kind}",
+            "parent_id": "0x" + self.parent_id if self.parent_id else None,
+            "start_time": iso(self.start_ns),
+            "end_time": iso(self.end_ns),
+            "status": {"status_code": "ERROR", "description": self.error} if self.error else {"status_code": "UNSET"},
+            "attributes": attributes,
+            "events": [],
+            "links": [],
+            "resource": {"attributes": {"service.name": SERVICE_NAME}, "schema_url": ""},
+        }
+
+
+_current: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+
+class JsonLinesExporter:
+    def __init__(self, stream):
+        self.stream = stream
+        self._lock = threading.Lock()
+
+    def export(self, span: Span):
+        line = json.dumps(span.to_otel(), default=str)
+        with self._lock:
+            self.stream.write(line + "\n")
+            self.stream.flush()
+
+
+def _make_exporter():
+    if TRACE_EXPORTER == "console":
+        return JsonLinesExporter(sys.stderr)
+    if TRACE_EXPORTER == "file":
+        return JsonLinesExporter(open(TRACE_FILE, "a", encoding="utf-8"))
+    return None
+
+
+exporter = _make_exporter() if TRACING_ENABLED else None
+
+
+def start_span(name: str, stage: Optional[str] = None, kind: str = "INTERNAL", **attributes) -> Span:
+    """Opens a child of the current span (or a new trace) without making it current."""
+    parent = _current.get()
+    trace = parent.trace if parent else Trace(secrets.token_hex(16))
+    return Span(name, trace, parent.span_id if parent else None, stage, kind, attributes)
+
+
+def end_span(span: Span, error: Optional[BaseException] = None):
+    span.end_ns = time.time_ns()
+    if error is not None:
+        span.error = f"{type(error).__name__}: {error}"
+    span.trace.spans.append(span)
+    if exporter is not None:
+        exporter.export(span)
+
+
+@contextmanager
+def _span(name: str, stage: Optional[str], kind: str, attributes: dict):
+    current = start_span(name, stage, kind, **attributes)
+    token = _current.set(current)
+    try:
+        yield current
+    except BaseException as e:
+        end_span(current, e)
+        raise
+    else:
+        end_span(current)
+    finally:
+        _current.reset(token)
+
+
+def span(name: str, stage: Optional[str] = None, kind: str = "INTERNAL", **attributes):
+    """``with span("email.send", stage="email"):`` times the block as a child of the current span."""
+    if not TRACING_ENABLED:
+        return nullcontext()
+    return _span(name, stage, kind, attributes)
+
+
+def traced(name: str, stage: Optional[str] = None, kind: str = "INTERNAL"):
+    """Decorator form of ``span`` for plain and async functions."""
+    def decorate(fn):
+        if not TRACING_ENABLED:
+            return fn
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                with _span(name, stage, kind, {}):
+                    return await fn(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with _span(name, stage, kind, {}):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def instrument_module(module, prefix: str, stage: Optional[str] = None):
+    """Wraps the module's public functions in spans named ``prefix.function``.
+
+    Generator functions are left alone: a span around them would only time their creation."""
+    for attr, value in list(vars(module).items()):
+        if (attr.startswith("_") or not inspect.isfunction(value) or value.__module__ != module.__name__
+                or inspect.isgeneratorfunction(value) or getattr(value, "__wrapped__", None)):
+            continue
+        setattr(module, attr, traced(f"{prefix}.{attr}", stage)(value))
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    context._trace_span = start_span(
+        "db." + statement.lstrip().split(None, 1)[0].lower(), stage="db", kind="CLIENT",
+        **{"db.system": conn.dialect.name, "db.statement": statement[:MAX_STATEMENT_CHARS]},
+    )
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    current = getattr(context, "_trace_span", None)
+    if current is not None:
+        end_span(current)
+
+
+def _handle_error(exception_context):
+    current = getattr(exception_context.execution_context, "_trace_span", None)
+    if current is not None and current.end_ns is None:
+        end_span(current, exception_context.original_exception)
+
+
+def install_listener(engine: Engine):
+    for name, listener in (("before_cursor_execute", _before_cursor_execute),
+                           ("after_cursor_execute", _after_cursor_execute),
+                           ("handle_error", _handle_error)):
+        if not event.contains(engine, name, listener):
+            event.listen(engine, name, listener)
+
+
+def server_timing(root: Span) -> str:
+    """Per-stage totals, counting a span only when no ancestor has the same stage."""
+    by_id = {s.span_id: s for s in root.trace.spans}
+    totals: dict[str, float] = {}
+    for s in root.trace.spans:
+        if not s.stage:
+            continue
+        parent = by_id.get(s.parent_id)
+        while parent is not None and parent.stage != s.stage:
+            parent = by_id.get(parent.parent_id)
+        if parent is None:
+            totals[s.stage] = totals.get(s.stage, 0.0) + s.duration_ms
+    metrics = [f"{stage};dur={ms:.1f}" for stage, ms in sorted(totals.items())]
+    metrics.append(f"total;dur={root.duration_ms:.1f}")
+    return ", ".join(metrics)
+
+
+def render_tree(root: Span) -> str:
+    children: dict[Optional[str], list[Span]] = {}
+    for s in root.trace.spans:
+        children.setdefault(s.parent_id, []).append(s)
+    lines = []
+
+    def walk(s: Span, depth: int):
+        detail = " ".join((s.attributes.get("db.statement") or "").split())
+        lines.append(f"{'  ' * depth}{s.name}{f' [{s.stage}]' if s.stage else ''} {s.duration_ms:.1f} ms"
+                     f"{f' ERROR {s.error}' if s.error else ''}{f'  {detail[:120]}' if detail else ''}")
+        for child in sorted(children.get(s.span_id, []), key=lambda c: c.start_ns):
+            walk(child, depth + 1)
+
+    walk(root, 0)
+    return "\n".join(lines)
+
+
+def install(app: FastAPI, engine: Engine):
+    if not TRACING_ENABLED:
+        return
+    from app import crud
+
+    install_listener(engine)
+    instrument_module(crud, "crud", stage="db")
+
+    @app.middleware("http")
+    async def tracing_middleware(request: Request, call_next):
+        incoming = _TRACEPARENT.match(request.headers.get("traceparent", ""))
+        root = Span(f"{request.method} {request.url.path}", Trace(incoming.group(1) if incoming else secrets.token_hex(16)),
+                    incoming.group(2) if incoming else None, kind="SERVER",
+                    attributes={"http.method": request.method, "http.target": request.url.path})
+        token = _current.set(root)
+        try:
+            response = await call_next(request)
+        except BaseException as e:
+            end_span(root, e)
+            raise
+        finally:
+            _current.reset(token)
+
+        route = request.scope.get("route")
+        if route is not None:
+            root.name = f"{request.method} {route.path}"
+            root.attributes["http.route"] = route.path
+        root.attributes["http.status_code"] = response.status_code
+        end_span(root)
+        response.headers["Server-Timing"] = server_timing(root)
+        response.headers["traceresponse"] = f"00-{root.trace.trace_id}-{root.span_id}-01"
+        if root.duration_ms > SLOW_REQUEST_MS:
+            logger.warning("slow request %s: %.0f ms (trace %s)\n%s",
+                           root.name, root.duration_ms, root.trace.trace_id, render_tree(root))
+        return response
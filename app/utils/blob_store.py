@@ -0,0 +1,118 @@
+import hashlib
+import os
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Optional
+from dotenv import load_dotenv
+
+load_dotenv()
+
+CHUNK_SIZE = 1024 * 1024
+
+
+def blob_key(sha256: str) -> str:
+    # fan out by hash prefix so no single directory / S3 prefix gets huge
+    return f"resumes/{sha256[:2]}/{sha256[2:4]}/{sha256}"
+
+
+async def spool_upload(upload, directory: Optional[str] = None) -> tuple[str, str, int]:
+    """Stream an UploadFile to a temp file while hashing it.
+    Returns (temp_path, sha256, size); the caller owns the temp file."""
+    digest = hashlib.sha256()
+    size = 0
+    fd, temp_path = tempfile.mkstemp(suffix=".upload", dir=directory)
+    with os.fdopen(fd, "wb") as f:
+        while chunk := await upload.read(CHUNK_SIZE):
+            digest.update(chunk)
+            size += len(chunk)
+            f.write(chunk)
+    return temp_path, digest.hexdigest(), size
+
+
+class LocalBlobStore:
+    """Content-addressed files on local disk, behind the same calls as the S3 store."""
+
+    def __init__(self, root: str):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def local_path(self, key: str) -> Path:
+        return self.root / key
+
+    def head_object(self, key: str) -> Optional[int]:
+        path = self.local_path(key)
+        return path.stat().st_size if path.exists() else None
+
+    def put_file(self, source_path: str, key: str):
+        if self.head_object(key) is not None:
+            return
+        target = self.local_path(key)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        # copy to a file of our own next to the target, then rename, so readers never see a
+        # partial file and concurrent uploads of the same resume never share one
+        fd, partial = tempfile.mkstemp(suffix=".part", dir=target.parent)
+        try:
+            with os.fdopen(fd, "wb") as f, open(source_path, "rb") as source:
+                shutil.copyfileobj(source, f)
+            os.replace(partial, target)
+        except OSError:
+            # content-addressed: a concurrent upload that stored the same key did our job
+            if self.head_object(key) is None:
+                raise
+        finally:
+            Path(partial).unlink(missing_ok=True)
+
+    def delete_object(self, key: str):
+        self.local_path(key).unlink(missing_ok=True)
+
+    def presigned_url(self, key: str, filename: str) -> Optional[str]:
+        return None
+
+
+class S3BlobStore:
+    """Content-addressed objects in an S3-compatible bucket (AWS, MinIO, R2, ...)."""
+
+    def __init__(self, bucket: str, endpoint_url: Optional[str] = None):
+        import boto3
+
+        self.bucket = bucket
+        self.client = boto3.client("s3", endpoint_url=endpoint_url)
+
+    def local_path(self, key: str) -> Optional[Path]:
+        return None
+
+    def head_object(self, key: str) -> Optional[int]:
+        from botocore.exceptions import ClientError
+
+        try:
+            return self.client.head_object(Bucket=self.bucket, Key=key)["ContentLength"]
+        except ClientError:
+            return None
+
+    def put_file(self, source_path: str, key: str):
+        if self.head_object(key) is None:
+            self.client.upload_file(source_path, self.bucket, key)
+
+    def delete_object(self, key: str):
+        self.client.delete_object(Bucket=self.bucket, Key=key)
+
+    def presigned_url(self, key: str, filename: str) -> Optional[str]:
+        return self.client.generate_presigned_url(
+            "get_object",
+            Params={
+                "Bucket": self.bucket,
+                "Key": key,
+                "ResponseContentDisposition": f'attachment; filename="{filename}"',
+            },
+            ExpiresIn=300,
+        )
+
+
+def _make_store():
+    if os.getenv("BLOB_STORE") == "s3":
+        return S3BlobStore(os.getenv("BLOB_BUCKET"), endpoint_url=os.getenv("BLOB_ENDPOINT_URL"))
+    return LocalBlobStore(os.getenv("BLOB_STORE_DIR", "data/blobs"))
+
+
+blob_store = _make_store()
@@ -3,6 +3,7 @@ from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 import os
 from dotenv import load_dotenv
+from app.tracing import traced
 
 load_dotenv()
 
@@ -12,6 +13,7 @@ SMTP_USER = os.getenv("SMTP_USER")
 SMTP_PASSWORD = os.getenv("SMTP_PASSWORD")
 
 
+@traced("email.send", stage="email", kind="CLIENT")
 async def send_email(subject: str,body: str, recipient_email: str, reply_to: str = None) -> bool:
     try:
         msg = MIMEMultipart()
@@ -6,6 +6,7 @@ from googleapiclient.errors import HttpError
 from google.oauth2.credentials import Credentials
 import asyncio
 import os
+from app.tracing import traced
 
 def load_gmail_creds():
     # Try local first
@@ -32,6 +33,7 @@ creds = load_gmail_creds()
 service = build("gmail", "v1", credentials=creds)
 
 
+@traced("email.send", stage="email", kind="CLIENT")
 async def send_email(subject: str, body: str, recipient_email: str, reply_to: str = None) -> bool:
 
     try:
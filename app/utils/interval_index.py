@@ -0,0 +1,65 @@
+"""Sorted, non-overlapping half-open intervals with O(log n) conflict checks."""
+from bisect import bisect_left, bisect_right
+from datetime import datetime
+from typing import Iterable, Optional
+
+
+class IntervalIndex:
+    """Busy time as sorted, disjoint ``[start, end)`` intervals.
+
+    Overlapping intervals passed to the constructor (e.g. double bookings made before
+    conflict checks existed) are merged into one busy block. ``add`` refuses to create a
+    new overlap, so the list stays disjoint and a conflict check only has to look at
+    the neighbours of the insertion point."""
+
+    def __init__(self, intervals: Iterable[tuple[datetime, datetime]] = ()):
+        self._starts: list[datetime] = []
+        self._ends: list[datetime] = []
+        for start, end in sorted(intervals):
+            if self._ends and start < self._ends[-1]:
+                self._ends[-1] = max(self._ends[-1], end)
+            else:
+                self._starts.append(start)
+                self._ends.append(end)
+
+    def __len__(self) -> int:
+        return len(self._starts)
+
+    def conflict(self, start: datetime, end: datetime) -> Optional[tuple[datetime, datetime]]:
+        """Returns a busy interval overlapping ``[start, end)``, or None."""
+        i = bisect_right(self._starts, start)
+        if i and self._ends[i - 1] > start:
+            return self._starts[i - 1], self._ends[i - 1]
+        if i < len(self._starts) and self._starts[i] < end:
+            return self._starts[i], self._ends[i]
+        return None
+
+    def add(self, start: datetime, end: datetime) -> bool:
+        """Marks ``[start, end)`` busy; returns False (and changes nothing) if it overlaps."""
+        if self.conflict(start, end):
+            return False
+        i = bisect_left(self._starts, start)
+        self._starts.insert(i, start)
+        self._ends.insert(i, end)
+        return True
+
+    def remove(self, start: datetime, end: datetime) -> bool:
+        i = bisect_left(self._starts, start)
+        if i < len(self._starts) and self._starts[i] == start and self._ends[i] == end:
+            del self._starts[i], self._ends[i]
+            return True
+        return False
+
+    def free(self, start: datetime, end: datetime, min_length) -> list[tuple[datetime, datetime]]:
+        """Gaps of at least ``min_length`` (a timedelta) between busy intervals inside ``[start, end)``."""
+        gaps = []
+        cursor = start
+        i = max(0, bisect_right(self._starts, start) - 1)
+        while i < len(self._starts) and self._starts[i] < end:
+            if self._starts[i] - cursor >= min_length:
+                gaps.append((cursor, self._starts[i]))
+            cursor = max(cursor, self._ends[i])
+            i += 1
+        if end - cursor >= min_length:
+            gaps.append((cursor, end))
+        return gaps
@@ -1,6 +1,8 @@
 import fitz
 from pathlib import Path
+from app.tracing import traced
 
+@traced("pdf.extract", stage="pdf")
 def extract_text_from_pdf(file_path: str) -> dict:
     file_path=Path(file_path)
     if not file_path.exists():
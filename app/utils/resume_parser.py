@@ -0,0 +1,207 @@
+"""Local pre-extraction of resumes before they reach cv_agent.
+
+PyMuPDF's span information (font size and weight) finds the section headings, and compiled
+patterns pull the contact fields. The agent then gets only the text that still needs
+interpreting: the header (for the name) and the sections that map to ``CVOutput`` fields.
+Sections such as References or Hobbies are dropped. Email and phone found here are listed
+in the prompt and override whatever the agent returns for them.
+"""
+import re
+import statistics
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Optional
+
+import fitz
+from pydantic import TypeAdapter, EmailStr, ValidationError
+
+from app.tracing import traced
+
+# heading text (normalized) -> section kind; None means the section is dropped
+_HEADINGS = {
+    "summary": ("summary", "profile", "professional summary", "career summary", "objective", "career objective", "about me"),
+    "skills": ("skills", "technical skills", "key skills", "core skills", "skills and tools", "technologies",
+               "tech stack", "tools", "core competencies", "competencies", "skills and expertise"),
+    "experience": ("experience", "work experience", "professional experience", "relevant experience", "employment",
+                   "employment history", "work history", "career history", "internships", "internship",
+                   "projects", "personal projects", "academic projects", "key projects"),
+    "education": ("education", "academic background", "academics", "academic qualifications", "qualifications",
+                  "education and training"),
+    "certifications": ("certifications", "certification", "certificates", "licenses and certifications",
+                       "licences and certifications", "courses", "courses and certifications", "training"),
+    "header": ("personal details", "personal information", "contact", "contact information", "contact details"),
+    None: ("references", "referees", "hobbies", "interests", "hobbies and interests", "declaration"),
+}
+HEADING_KINDS = {name: kind for kind, names in _HEADINGS.items() for name in names}
+MAX_HEADING_WORDS = 5
+BOLD_FLAG = 16
+
+EMAIL_PATTERN = re.compile(r"[A-Za-z0-9._%+-]+@[A-Za-z0-9-]+(?:\.[A-Za-z0-9-]+)*\.[A-Za-z]{2,}")
+PHONE_PATTERN = re.compile(r"(?<![\w+])\+?(?:\(\d{1,4}\)|\d)[\d ().-]{5,18}\d(?!\w)")
+# a number without "+" needs one of these labels in front of it, or MIN_UNLABELLED_DIGITS digits
+_PHONE_LABEL = re.compile(r"\b(?:phone|tel|telephone|mobile|mob|cell|ph|whatsapp|contact)(?:\s*(?:no|number|#))?\.?\s*[:\-–]?\s*$", re.I)
+MIN_UNLABELLED_DIGITS = 10
+_OTHER_NUMBER_LABEL = re.compile(r"\b(?:isbn(?:-1[03])?|issn|doi|pin|zip|postcode|passport|id|roll|reg)(?:\s*(?:no|number|#))?\.?\s*[:\-–]?\s*$", re.I)
+# 12.05.1990, 01.2019 - 06.2023, 2019 - 2023: digit runs that look like a phone number
+_DATE = r"\d{1,2}[./-]\d{1,2}[./-]\d{2,4}|\d{1,2}[./-](?:19|20)\d{2}|(?:19|20)\d{2}"
+_DATES = re.compile(rf"(?:{_DATE})(?:\s*[-–]\s*(?:{_DATE}))?")
+# contact fields are only looked for at the top: further down, digit runs are dates, ISBNs, ids
+CONTACT_SCAN_CHARS = 600
+_ORPHAN_SEPARATORS = re.compile(r"(?:\s*[|•·,;]\s*){2,}")
+_EMPTY_CONTACT_LABELS = re.compile(r"\b(?:e-?mail|phone|mobile|tel|contact)\s*[:\-]\s*(?=[|•·,;]|$|\s+\w+\s*:|\s*$)", re.I)
+_LABEL = re.compile(r"^\s*([A-Za-z&/ ]{3,40}?)\s*[:\-–|]\s*(.*)$")
+_email_adapter = TypeAdapter(EmailStr)
+
+
+@dataclass
+class Section:
+    kind: Optional[str]          # a _HEADINGS kind, "other" for unknown headings, "header" for the top
+    heading: str
+    lines: list[str] = field(default_factory=list)
+    page: int = 0
+
+    @property
+    def text(self) -> str:
+        return "\n".join(line for line in (" ".join(line.split()) for line in self.lines) if line)
+
+
+@dataclass
+class PreparedResume:
+    raw_text: str                # the whole text, whitespace-collapsed (stored in resume_documents)
+    sections: list[Section]
+    known: dict                  # fields found locally; they override the agent's values
+
+    @property
+    def header(self) -> str:
+        if not self.known:
+            return ""
+        return "Already extracted: " + "; ".join(f"{k}: {v}" for k, v in self.known.items())
+
+    def blocks(self) -> list[str]:
+        """The sections worth interpreting, one ``[Heading]`` block each, in document order."""
+        blocks = []
+        for section in self.sections:
+            # the values were found in the header; elsewhere the same text is something else
+            text = _strip_known(section.text, self.known) if section.kind == "header" else section.text
+            if section.kind is not None and text:
+                blocks.append(f"[{section.heading}]\n{text}" if section.heading else text)
+        return blocks
+
+    @property
+    def prompt(self) -> str:
+        """What cv_agent gets: the locally found values, then the sections worth interpreting."""
+        return "\n\n".join(part for part in (self.header, *self.blocks()) if part)
+
+
+def normalize_heading(text: str) -> str:
+    text = text.lower().replace("&", " and ")
+    return " ".join(re.sub(r"[^a-z ]+", " ", text).split())
+
+
+def find_contact(text: str) -> dict:
+    """First valid email and phone number in ``text``, which should be the top of the resume.
+
+    A phone number has 7-15 digits (E.164) and a leading "+", a phone/tel/mobile label or at
+    least MIN_UNLABELLED_DIGITS digits. Dates and numbers labelled as something else (ISBN, ID)
+    are skipped."""
+    known = {}
+    for match in EMAIL_PATTERN.finditer(text):
+        try:
+            known["email"] = _email_adapter.validate_python(match.group(0))
+            break
+        except ValidationError:
+            continue
+    for match in PHONE_PATTERN.finditer(text):
+        if _is_phone(match.group(0).strip(), text[max(0, match.start() - 20):match.start()]):
+            known["phone"] = " ".join(match.group(0).split())
+            break
+    return known
+
+
+def _is_phone(candidate: str, before: str) -> bool:
+    digits = re.sub(r"\D", "", candidate)
+    if not 7 <= len(digits) <= 15 or _DATES.fullmatch(candidate) or _OTHER_NUMBER_LABEL.search(before):
+        return False
+    return candidate.startswith("+") or bool(_PHONE_LABEL.search(before)) or len(digits) >= MIN_UNLABELLED_DIGITS
+
+
+def _contact_text(sections: list[Section]) -> str:
+    """The top of the resume: the header and contact sections, within CONTACT_SCAN_CHARS."""
+    return "\n".join(section.text for section in sections if section.kind == "header")[:CONTACT_SCAN_CHARS]
+
+
+def _strip_known(text: str, known: dict) -> str:
+    lines = []
+    for line in text.splitlines():
+        for value in known.values():
+            line = line.replace(value, "")
+        # "a | email | phone | b" leaves "a | | | b", "Email: x Phone: y" leaves "Email: Phone:"
+        line = _EMPTY_CONTACT_LABELS.sub(" ", " ".join(line.split()))
+        line = " ".join(_ORPHAN_SEPARATORS.sub(" | ", line).split()).strip(" |")
+        if line:
+            lines.append(line)
+    return "\n".join(lines)
+
+
+def _lines(doc):
+    """(page number, text, font size, bold) for every text line, in reading order."""
+    for page_no, page in enumerate(doc):
+        for block in page.get_text("dict")["blocks"]:
+            for line in block.get("lines", []):
+                spans = [span for span in line["spans"] if span["text"].strip()]
+                if not spans:
+                    continue
+                text = "".join(span["text"] for span in line["spans"]).strip()
+                size = max(span["size"] for span in spans)
+                bold = all(span["flags"] & BOLD_FLAG or "bold" in span["font"].lower() for span in spans)
+                yield page_no, text, size, bold
+
+
+def split_sections(lines: list[tuple[int, str, float, bool]]) -> list[Section]:
+    """Groups lines under headings. A heading is a short line whose text is a known heading,
+    or a short bold / larger-than-body line ending the previous section (kind "other")."""
+    sizes = [size for _, text, size, _ in lines for _ in range(len(text))]
+    body_size = statistics.median(sizes) if sizes else 0
+    sections = [Section("header", "")]
+    for page_no, text, size, bold in lines:
+        words = text.split()
+        styled = bold or size >= body_size * 1.15 or (text.isupper() and len(text) > 3)
+        kind = HEADING_KINDS.get(normalize_heading(text), "unknown")
+        if len(words) <= MAX_HEADING_WORDS and kind != "unknown":
+            sections.append(Section(kind, text.rstrip(":").strip(), page=page_no))
+            continue
+        label = _LABEL.match(text)
+        label_kind = HEADING_KINDS.get(normalize_heading(label.group(1)), "unknown") if label else "unknown"
+        if label_kind != "unknown":
+            # "Skills: Python, Go" on one line
+            sections.append(Section(label_kind, label.group(1).strip(), [label.group(2)], page=page_no))
+            continue
+        if styled and len(words) <= MAX_HEADING_WORDS and len(sections) > 1 and not EMAIL_PATTERN.search(text):
+            sections.append(Section("other", text.rstrip(":").strip(), page=page_no))
+            continue
+        sections[-1].lines.append(text)
+    return [s for s in sections if s.lines or s.kind == "header"]
+
+
+@traced("pdf.prepare_resume", stage="pdf")
+def prepare_resume(file_path: str) -> PreparedResume:
+    file_path = Path(file_path)
+    if not file_path.exists():
+        raise FileNotFoundError(f"PDF not found: {file_path}")
+    with fitz.open(file_path) as doc:
+        lines = list(_lines(doc))
+    raw_text = " ".join(" ".join(text for _, text, _, _ in lines).split())
+    sections = split_sections(lines)
+    known = find_contact(_contact_text(sections))
+    if len(sections) == 1:
+        # no headings found: send everything, page by page, still without the contact values
+        pages = {}
+        for page_no, text, _, _ in lines:
+            pages.setdefault(page_no, Section("header", "", page=page_no)).lines.append(text)
+        sections = list(pages.values()) or sections
+    return PreparedResume(raw_text, sections, known)
+
+
+def prepare_resume_text(raw_text: str) -> PreparedResume:
+    """For text without layout (e.g. a stored ``resume_documents.raw_text``): contact fields only."""
+    return PreparedResume(raw_text, [Section("header", "", [raw_text])], find_contact(raw_text[:CONTACT_SCAN_CHARS]))
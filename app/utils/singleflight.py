@@ -0,0 +1,43 @@
+"""In-process single-flight: concurrent callers with the same key share one execution."""
+import asyncio
+from typing import Awaitable, Callable, Hashable, TypeVar
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """``await flights.do(key, fn)`` runs ``fn()`` once per key at a time.
+
+    Callers arriving while it runs await the same result (or exception) instead of
+    starting their own. Nothing is cached: once the call finishes, the next ``do``
+    for that key runs ``fn`` again. Only coalesces within one event loop / worker."""
+
+    def __init__(self):
+        self._flights: dict[Hashable, asyncio.Future] = {}
+
+    def in_flight(self, key: Hashable) -> bool:
+        return key in self._flights
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        future = self._flights.get(key)
+        if future is not None:
+            # shield: a cancelled follower must not cancel the shared call
+            return await asyncio.shield(future)
+
+        future = asyncio.get_running_loop().create_future()
+        self._flights[key] = future
+        try:
+            result = await fn()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            # consumed here so an unawaited shared future does not log "exception never retrieved"
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            del self._flights[key]
@@ -0,0 +1,201 @@
+"""One-call vs chunked extraction of long resumes and job descriptions.
+
+    python -m benchmarks.chunked_extraction --pages 2 10 20 --latency 0.4 --ms-per-output-token 4
+
+Generates resumes with ``--pages`` pages of experience (``benchmarks.resume_prepare``) and job
+descriptions of similar length, then runs ``app.extraction`` once with chunking disabled and
+once with the default threshold. The fake models "read" their prompt: they return the roles,
+skills, education and certifications they find in it, so the merged chunk outputs can be
+compared field by field with the one-call output. Each call costs ``--latency`` seconds plus
+``--ms-per-input-token`` of prefill and ``--ms-per-output-token`` of decode time.
+"""
+import argparse
+import asyncio
+import os
+import re
+import tempfile
+import time
+
+SKILL_WORDS = ("Python", "FastAPI", "PostgreSQL", "React", "Docker", "Kubernetes", "AWS", "Go", "Kafka", "Terraform")
+DUTIES = (
+    "Design, build and operate the APIs behind the hiring workflow",
+    "Own on-call for the services you ship and improve their reliability",
+    "Review code and mentor engineers across two product teams",
+    "Work with product and design to scope features and estimate delivery",
+    "Improve observability with tracing, metrics and actionable alerts",
+    "Drive migrations of legacy services to the new platform",
+)
+
+
+def make_jd(n: int, pages: int) -> str:
+    parts = [f"Title: Senior Backend Engineer {n}",
+             "About the role\n\nYou will join the platform group that runs the services behind our product."]
+    for section in range(pages):
+        parts.append(f"Responsibilities (area {section + 1})")
+        parts.append("\n".join(f"- {duty} (area {section + 1}, item {i + 1})" for i, duty in enumerate(DUTIES)))
+    parts.append("Skills\n\n" + ", ".join(SKILL_WORDS[:6]))
+    parts.append("Experience\n\n5+ years in backend development, 2+ years running services in production")
+    parts.append("Education\n\nBachelor's degree in Computer Science or a related field")
+    parts.append("Benefits\n\nHealth cover, learning budget, hybrid work.")
+    return "\n\n".join(parts)
+
+
+def _blocks(text: str):
+    """(heading, body, block) per paragraph; a paragraph without its own heading line
+    belongs to the last heading seen, as a reader would take it."""
+    current = ""
+    for block in text.split("\n\n"):
+        first, _, body = block.partition("\n")
+        if len(first.split()) > 5 or first.startswith("- "):
+            yield current, block, block
+            continue
+        current = first.strip("[]")
+        if body:
+            yield current, body, block
+
+
+def read_resume(text: str) -> dict:
+    from app.utils.resume_parser import HEADING_KINDS, normalize_heading
+
+    fields = dict.fromkeys(("name", "email", "phone", "skills", "education", "experience", "certifications"))
+    roles, skills = [], []
+    for heading, body, block in _blocks(text):
+        kind = HEADING_KINDS.get(normalize_heading(heading))
+        if not block.startswith(("[", "Already extracted:")) and fields["name"] is None:
+            fields["name"] = block.partition("\n")[0]
+        elif kind == "skills":
+            skills += [word for word in SKILL_WORDS if word in body]
+        elif kind == "experience":
+            roles += [line for line in body.splitlines() if not line.startswith("- ")]
+        elif kind == "education":
+            fields["education"] = body
+        elif kind == "certifications":
+            fields["certifications"] = body
+    fields["skills"] = ", ".join(skills) or None
+    fields["experience"] = "\n".join(roles) or None
+    return fields
+
+
+def read_jd(text: str) -> dict:
+    fields = dict.fromkeys(("title", "summary", "skills", "experience_required", "education_required", "responsibilities"))
+    duties = []
+    for heading, body, block in _blocks(text):
+        if heading.startswith("Title: "):
+            fields["title"] = heading[len("Title: "):]
+        elif heading.startswith("About the role"):
+            fields["summary"] = fields["summary"] or body
+        elif heading.startswith("Responsibilities"):
+            # a summarising extractor: one short line per duty
+            duties += [line[2:].split(" (")[0] + " " + line.split(" (")[1].rstrip(")") for line in body.splitlines()]
+        elif heading == "Skills":
+            fields["skills"] = body
+        elif heading == "Experience":
+            fields["experience_required"] = body
+        elif heading == "Education":
+            fields["education_required"] = body
+    fields["responsibilities"] = "\n".join(duties) or None
+    return fields
+
+
+def reading_model(reader, latency, meter, ms_per_input_token: float):
+    from pydantic_ai.models.function import AgentInfo, FunctionModel
+    from loadtest import fakes
+
+    async def run(messages, info: AgentInfo):
+        # the user prompt only: _prompt_text also includes the system prompt
+        text = next(part.content for message in reversed(messages) for part in getattr(message, "parts", [])
+                    if getattr(part, "part_kind", None) == "user-prompt")
+        await latency.wait()
+        await asyncio.sleep(len(text) / 4 * ms_per_input_token / 1000)
+        args = reader(text)
+        await meter.record(messages, args)
+        return fakes._output(info, args)
+    return FunctionModel(run, model_name="fake-reader")
+
+
+def items(value) -> set:
+    return {" ".join(part.lower().split()) for part in re.split(r"[,;\n]+", value or "") if part.strip()}
+
+
+async def run_mode(extract, agent, reader, documents, threshold, args):
+    from app.agents import runner
+    from app.agents.runner import AgentUnavailableError
+    from loadtest import fakes
+
+    meter = fakes.TokenMeter(args.ms_per_output_token / 1000)
+    latency = fakes.Latency(args.latency, args.jitter, args.seed)
+    outputs, elapsed = [], []
+    with agent.override(model=reading_model(reader, latency, meter, args.ms_per_input_token)):
+        for document in documents:
+            # no hedged duplicates: hedging starts once a model has a latency history
+            runner._latencies.clear()
+            started = time.perf_counter()
+            try:
+                outputs.append(await extract(document, threshold=threshold))
+            except AgentUnavailableError:
+                # out of time: the policy's timeout and budget apply as in production
+                outputs.append(None)
+            elapsed.append(time.perf_counter() - started)
+    return outputs, meter, sum(elapsed) / len(elapsed)
+
+
+async def compare(kind, extract, agent, reader, documents, args):
+    single, single_meter, single_s = await run_mode(extract, agent, reader, documents, 10 ** 9, args)
+    chunked, chunked_meter, chunked_s = await run_mode(extract, agent, reader, documents, args.threshold, args)
+    same = sum(a is not None and b is not None and all(items(a[name]) == items(b[name]) for name in a)
+               for a, b in zip(single, chunked))
+    n = len(documents)
+    for label, meter, outputs, seconds in (("one call", single_meter, single, single_s),
+                                          ("chunked", chunked_meter, chunked, chunked_s)):
+        print(f"{kind if label == 'one call' else '':<4}{args.current_pages if label == 'one call' else '':>6}"
+              f"{label:>10}{meter.calls / n:>7.1f}{meter.input_tokens // n:>11}{meter.output_tokens // n:>12}"
+              f"{seconds:>9.2f}{outputs.count(None):>8}")
+    print(f"{'':<10}same fields in both modes: {same}/{n}")
+
+
+async def main(args):
+    import random
+
+    from app import extraction
+    from app.agents.cv_agent import cv_agent
+    from app.agents.jd_agent import jd_agent
+    from app.utils.resume_parser import prepare_resume
+    from benchmarks.resume_prepare import make_resume
+
+    rng = random.Random(args.seed)
+    directory = tempfile.mkdtemp()
+    args.threshold = args.threshold or extraction.EXTRACTION_CHUNK_THRESHOLD
+    print(f"threshold {args.threshold} chars, chunks of {extraction.EXTRACTION_CHUNK_CHARS}, "
+          f"{args.documents} documents per row, mean per document")
+    print(f"{'':<4}{'pages':>6}{'mode':>10}{'calls':>7}{'in tokens':>11}{'out tokens':>12}{'wall s':>9}{'failed':>8}")
+    for pages in args.pages:
+        args.current_pages = pages
+        resumes = []
+        for n in range(args.documents):
+            path = os.path.join(directory, f"{pages}-{n}.pdf")
+            with open(path, "wb") as f:
+                f.write(make_resume(n, rng, pages)[0])
+            resumes.append(prepare_resume(path))
+        await compare("cv", extraction.extract_cv, cv_agent, read_resume, resumes, args)
+        await compare("jd", extraction.extract_jd, jd_agent, read_jd,
+                      [make_jd(n, pages) for n in range(args.documents)], args)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, nargs="+", default=[2, 10, 20])
+    parser.add_argument("--documents", type=int, default=5, help="documents per page count")
+    parser.add_argument("--threshold", type=int, default=None, help="defaults to EXTRACTION_CHUNK_THRESHOLD")
+    parser.add_argument("--latency", type=float, default=0.4, help="fixed seconds per call")
+    parser.add_argument("--jitter", type=float, default=0.05)
+    parser.add_argument("--ms-per-input-token", type=float, default=0.1, help="simulated prefill speed")
+    parser.add_argument("--ms-per-output-token", type=float, default=4.0, help="simulated decode speed")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    os.environ.setdefault("DATABASE_URL", "sqlite://")
+    os.environ.setdefault("GROQ_API_KEY", "bench")
+    os.environ.setdefault("RATE_LIMIT_BACKEND", "off")
+    os.environ.setdefault("DB_ECHO", "false")
+    os.environ.setdefault("TRACING", "off")
+    asyncio.run(main(args))
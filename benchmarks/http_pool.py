@@ -0,0 +1,147 @@
+"""Connection overhead of the shared LLM HTTP client under bursty fan-out.
+
+    python -m benchmarks.http_pool --bursts 20 --fanout 16 --connect-delay 0.02
+
+Starts a local mock of the Groq chat-completions API and sends bursts of concurrent agent
+calls through it in four modes:
+
+* ``per-call``  - a fresh provider/client for every call (no reuse at all)
+* ``per-agent`` - one client per agent, each with its own connection pool
+* ``default``   - pydantic-ai's implicit cached client, used when ``GroqModel(name)`` is built bare
+* ``shared``    - the pooled client from ``app.agents.providers``
+
+``--connect-delay`` adds server-side latency to each new connection, standing in for the
+TCP + TLS handshake to the real provider. The report shows wall time, mean latency per call,
+and how many connections the server accepted.
+"""
+import argparse
+import asyncio
+import json
+import os
+import socket
+import statistics
+import threading
+import time
+
+import httpx
+import uvicorn
+from groq import AsyncGroq
+from pydantic_ai import Agent
+from pydantic_ai.models.groq import GroqModel
+from pydantic_ai.providers.groq import GroqProvider
+
+COMPLETION = {
+    "id": "chatcmpl-bench",
+    "object": "chat.completion",
+    "created": 0,
+    "model": "mock",
+    "choices": [{"index": 0, "message": {"role": "assistant", "content": "ok"}, "finish_reason": "stop"}],
+    "usage": {"prompt_tokens": 10, "completion_tokens": 1, "total_tokens": 11},
+}
+
+
+class MockGroq:
+    """Bare ASGI app answering every POST with a canned completion; counts new connections."""
+
+    def __init__(self, connect_delay: float, response_delay: float):
+        self.connect_delay = connect_delay
+        self.response_delay = response_delay
+        self.connections = set()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return
+        peer = tuple(scope.get("client") or ())
+        if peer not in self.connections:
+            self.connections.add(peer)
+            await asyncio.sleep(self.connect_delay)
+        while (await receive()).get("more_body"):
+            pass
+        await asyncio.sleep(self.response_delay)
+        body = json.dumps(COMPLETION).encode()
+        await send({"type": "http.response.start", "status": 200,
+                    "headers": [(b"content-type", b"application/json")]})
+        await send({"type": "http.response.body", "body": body})
+
+
+def start_server(app) -> str:
+    sock = socket.socket()
+    sock.bind(("127.0.0.1", 0))
+    port = sock.getsockname()[1]
+    sock.close()
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.01)
+    return f"http://127.0.0.1:{port}/openai/v1"
+
+
+def make_model(base_url: str, http_client: httpx.AsyncClient) -> GroqModel:
+    client = AsyncGroq(api_key="bench", base_url=base_url, http_client=http_client, max_retries=0)
+    return GroqModel("mock", provider=GroqProvider(groq_client=client))
+
+
+async def run_mode(mode: str, base_url: str, bursts: int, fanout: int, pause: float):
+    from app.agents import providers
+
+    agents = [Agent(output_type=str, name=f"agent-{i}") for i in range(4)]
+    clients = []
+
+    if mode == "shared":
+        providers._http_client = None
+        shared = providers.get_http_client()
+        clients.append(shared)
+        models = [make_model(base_url, shared)] * len(agents)
+    elif mode == "default":
+        from pydantic_ai.models import cached_async_http_client
+
+        models = [make_model(base_url, cached_async_http_client(provider="groq"))] * len(agents)
+    elif mode == "per-agent":
+        clients = [httpx.AsyncClient() for _ in agents]
+        models = [make_model(base_url, c) for c in clients]
+    else:
+        models = None
+
+    latencies = []
+
+    async def call(i):
+        started = time.perf_counter()
+        if models is None:
+            async with httpx.AsyncClient() as client:
+                await agents[i % len(agents)].run("ping", model=make_model(base_url, client))
+        else:
+            await agents[i % len(agents)].run("ping", model=models[i % len(agents)])
+        latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    for _ in range(bursts):
+        await asyncio.gather(*(call(i) for i in range(fanout)))
+        await asyncio.sleep(pause)
+    elapsed = time.perf_counter() - started - bursts * pause
+
+    for client in clients:
+        await client.aclose()
+    return elapsed, latencies
+
+
+async def main(args):
+    os.environ.setdefault("GROQ_API_KEY", "bench")
+    print(f"{'mode':<10}{'busy s':>9}{'mean ms':>10}{'p95 ms':>9}{'connections':>13}")
+    for mode in ("per-call", "per-agent", "default", "shared"):
+        mock = MockGroq(args.connect_delay, args.response_delay)
+        base_url = start_server(mock)
+        elapsed, latencies = await run_mode(mode, base_url, args.bursts, args.fanout, args.pause)
+        ordered = sorted(latencies)
+        p95 = ordered[int(0.95 * (len(ordered) - 1))]
+        print(f"{mode:<10}{elapsed:>9.2f}{statistics.fmean(latencies) * 1000:>10.1f}"
+              f"{p95 * 1000:>9.1f}{len(mock.connections):>13}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--bursts", type=int, default=20)
+    parser.add_argument("--fanout", type=int, default=16, help="concurrent calls per burst")
+    parser.add_argument("--pause", type=float, default=0.2, help="idle seconds between bursts")
+    parser.add_argument("--connect-delay", type=float, default=0.02, help="simulated handshake cost")
+    parser.add_argument("--response-delay", type=float, default=0.01)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,191 @@
+"""Micro-benchmarks of the hot paths, with a regression check against a committed baseline.
+
+    python -m benchmarks.micro run [-k serialization]         run the suite, print the timings
+    python -m benchmarks.micro baseline                       re-record benchmarks/micro/baseline.json
+    python -m benchmarks.micro compare [--threshold 15]       run the suite, compare with the baseline
+    python -m benchmarks.micro compare OLD.json NEW.json      compare two saved runs
+
+The suite is plain pytest-benchmark (``bench_*.py``), so any ``pytest-benchmark`` option can
+follow ``--``. ``compare`` exits with status 1 when a benchmark got slower than the baseline by
+more than ``--threshold`` percent in its best of ``--reruns`` extra runs. It compares the fastest round by default: on a busy
+machine the minimum moves far less than the median or mean. Timings only compare on the same machine:
+re-record the baseline on the machine that runs the comparison, from a clean checkout (``baseline``
+refuses uncommitted changes unless ``--allow-dirty`` is given).
+
+    python -m benchmarks.micro compare -k auth -- -p no:logfire
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+HERE = Path(__file__).resolve().parent
+BASELINE = HERE / "baseline.json"
+
+
+def run_suite(json_path: Path, extra: list[str], targets: list[str] = None) -> int:
+    import pytest
+
+    return pytest.main([
+        *(targets or [str(HERE)]), "-q", "-p", "no:cacheprovider",
+        "-o", "python_files=bench_*.py",
+        "--benchmark-only", "--benchmark-sort=name", "--benchmark-warmup=on", f"--benchmark-json={json_path}",
+        *extra,
+    ])
+
+
+def save_baseline(run_path: Path):
+    """Keeps the summary statistics of a run; the per-round timings are not needed to compare."""
+    with open(run_path) as f:
+        data = json.load(f)
+    for benchmark in data["benchmarks"]:
+        benchmark["stats"].pop("data", None)
+    with open(BASELINE, "w") as f:
+        json.dump(data, f, indent=1, sort_keys=True)
+        f.write("\n")
+
+
+def load(path: Path, stat: str) -> tuple[dict[str, float], dict]:
+    with open(path) as f:
+        data = json.load(f)
+    return {_key(b): b["stats"][stat] for b in data["benchmarks"]}, data.get("machine_info", {})
+
+
+def confirm(baseline_path: Path, run_path: Path, threshold: float, stat: str, reruns: int, extra: list[str]):
+    """Re-runs the benchmarks of ``run_path`` that look regressed, keeping each one's best result.
+
+    A one-off slow run on a busy machine is then not reported; a real slowdown shows up every time."""
+    baseline, _ = load(baseline_path, stat)
+    with open(run_path) as f:
+        data = json.load(f)
+    for _ in range(reruns):
+        suspects = {b["fullname"]: b for b in data["benchmarks"]
+                    if _key(b) in baseline and b["stats"][stat] > baseline[_key(b)] * (1 + threshold / 100)}
+        if not suspects:
+            return
+        print(f"re-running {len(suspects)} benchmark(s) beyond {threshold:g}% to rule out noise")
+        rerun_path = run_path.with_name("rerun.json")
+        if run_suite(rerun_path, extra, [str(HERE.parent.parent / name) for name in suspects]) != 0:
+            return
+        with open(rerun_path) as f:
+            for benchmark in json.load(f)["benchmarks"]:
+                previous = suspects.get(benchmark["fullname"])
+                if previous and benchmark["stats"][stat] < previous["stats"][stat]:
+                    previous["stats"] = benchmark["stats"]
+        with open(run_path, "w") as f:
+            json.dump(data, f)
+
+
+def _key(benchmark: dict) -> str:
+    return benchmark["fullname"].split("::", 1)[-1]
+
+
+def _dirty() -> bool:
+    """Whether the checkout has uncommitted changes to tracked files (False outside git)."""
+    try:
+        status = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"],
+                                cwd=HERE, capture_output=True, text=True, check=True)
+    except (OSError, subprocess.CalledProcessError):
+        return False
+    return bool(status.stdout.strip())
+
+
+def _machine(info: dict) -> str:
+    cpu = info.get("cpu", {}).get("brand_raw", "?")
+    return f"{info.get('node', '?')}, {cpu}, Python {info.get('python_version', '?')}"
+
+
+def compare(baseline_path: Path, current_path: Path, threshold: float, stat: str, partial: bool = False) -> int:
+    """Prints old vs new per benchmark; ``partial`` (a ``-k`` run) skips baseline entries that did not run."""
+    baseline, baseline_machine = load(baseline_path, stat)
+    current, current_machine = load(current_path, stat)
+    with open(baseline_path) as f:
+        commit = json.load(f).get("commit_info", {})
+    if commit.get("dirty"):
+        print(f"warning: baseline recorded with uncommitted changes on top of {commit.get('id', '?')[:12]}\n")
+    if _machine(baseline_machine) != _machine(current_machine):
+        print(f"warning: baseline recorded on {_machine(baseline_machine)}\n"
+              f"         this run is from   {_machine(current_machine)}\n"
+              f"         differences may be the machine, not the code\n")
+
+    regressions = 0
+    width = max(map(len, baseline.keys() | current.keys()), default=10)
+    print(f"{'benchmark':<{width}}{'baseline':>12}{'current':>12}{'change':>9}")
+    for name in sorted(baseline.keys() | current.keys()):
+        if name not in current:
+            if partial:
+                continue
+            print(f"{name:<{width}}{_ms(baseline[name]):>12}{'-':>12}{'':>9}  missing")
+            continue
+        if name not in baseline:
+            print(f"{name:<{width}}{'-':>12}{_ms(current[name]):>12}{'':>9}  new")
+            continue
+        change = (current[name] - baseline[name]) / baseline[name] * 100
+        flag = ""
+        if change > threshold:
+            flag, regressions = "  REGRESSION", regressions + 1
+        elif change < -threshold:
+            flag = "  faster"
+        print(f"{name:<{width}}{_ms(baseline[name]):>12}{_ms(current[name]):>12}{change:>+8.1f}%{flag}")
+
+    print(f"\n{regressions} regression(s) beyond {threshold:g}% ({stat})")
+    return 1 if regressions else 0
+
+
+def _ms(seconds: float) -> str:
+    return f"{seconds * 1000:.3f} ms" if seconds >= 0.001 else f"{seconds * 1e6:.1f} us"
+
+
+def main(argv: list[str] = None):
+    argv = sys.argv[1:] if argv is None else argv
+    # everything after "--" goes to pytest untouched, so "-p no:logfire" is not read as old/new paths
+    extra = []
+    if "--" in argv:
+        split = argv.index("--")
+        argv, extra = argv[:split], argv[split + 1:]
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+    run = commands.add_parser("run", help="run the suite")
+    run.add_argument("--json", type=Path, help="also save the results here")
+    run.add_argument("-k", help="pytest -k expression")
+    record = commands.add_parser("baseline", help="run the suite and save it as the baseline")
+    record.add_argument("--allow-dirty", action="store_true", help="record even with uncommitted changes")
+    check = commands.add_parser("compare", help="compare a run with the baseline")
+    check.add_argument("old", nargs="?", type=Path, default=BASELINE)
+    check.add_argument("new", nargs="?", type=Path, help="a saved run; default: run the suite now")
+    check.add_argument("--threshold", type=float, default=15.0, help="percent slower that counts as a regression")
+    check.add_argument("--stat", default="min", choices=("median", "mean", "min"))
+    check.add_argument("--reruns", type=int, default=2, help="times a regressed benchmark is re-run before it counts")
+    check.add_argument("-k", help="pytest -k expression")
+    args = parser.parse_args(argv)
+    if getattr(args, "k", None):
+        extra += ["-k", args.k]
+
+    if args.command == "baseline":
+        if _dirty() and not args.allow_dirty:
+            parser.error("uncommitted changes: the baseline would not match any commit (--allow-dirty to record anyway)")
+        run_path = Path(tempfile.mkdtemp()) / "run.json"
+        status = run_suite(run_path, extra)
+        if status == 0:
+            save_baseline(run_path)
+        return status
+    if args.command == "run":
+        return run_suite(args.json or Path(tempfile.mkdtemp()) / "run.json", extra)
+
+    new = args.new
+    if new is None:
+        new = Path(tempfile.mkdtemp()) / "run.json"
+        status = run_suite(new, extra)
+        if status != 0:
+            return status
+        confirm(args.old, new, args.threshold, args.stat, args.reruns, extra)
+    return compare(args.old, new, args.threshold, args.stat, partial=bool(args.k))
+
+
+if __name__ == "__main__":
+    os.environ.setdefault("TRACING", "off")
+    sys.exit(main())
@@ -0,0 +1,29 @@
+def test_create_access_token(benchmark):
+    from app.auth import create_access_token
+
+    benchmark.group = "auth"
+    assert benchmark(create_access_token, {"sub": "recruiter@example.com", "id": 1})
+
+
+def test_decode_token(benchmark):
+    from app.auth import create_access_token, decode_token
+
+    benchmark.group = "auth"
+    token = create_access_token({"sub": "recruiter@example.com", "id": 1})
+    assert benchmark(decode_token, token)["id"] == 1
+
+
+def test_hash_password(benchmark):
+    from app.auth import hash_password
+
+    benchmark.group = "auth"
+    # bcrypt is slow on purpose: a few rounds are enough
+    assert benchmark.pedantic(hash_password, args=("correct horse battery staple",), rounds=5, iterations=1)
+
+
+def test_verify_password(benchmark):
+    from app.auth import hash_password, verify_password
+
+    benchmark.group = "auth"
+    hashed = hash_password("correct horse battery staple")
+    assert benchmark.pedantic(verify_password, args=("correct horse battery staple", hashed), rounds=5, iterations=1)
@@ -0,0 +1,21 @@
+import pytest
+
+from benchmarks.micro.conftest import PDF_PAGES
+
+
+@pytest.mark.parametrize("pages", PDF_PAGES)
+def test_extract_text_from_pdf(benchmark, pdf_corpus, pages):
+    from app.utils.pdf_parser import extract_text_from_pdf
+
+    benchmark.group = "pdf"
+    result = benchmark(extract_text_from_pdf, pdf_corpus[pages])
+    assert result["raw_text"]
+
+
+@pytest.mark.parametrize("pages", PDF_PAGES)
+def test_prepare_resume(benchmark, pdf_corpus, pages):
+    from app.utils.resume_parser import prepare_resume
+
+    benchmark.group = "pdf"
+    prepared = benchmark(prepare_resume, pdf_corpus[pages])
+    assert prepared.known["email"] == "asha.sharma@example.com"
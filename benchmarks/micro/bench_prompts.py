@@ -0,0 +1,33 @@
+import random
+from datetime import datetime, timedelta, timezone
+
+from benchmarks.micro.conftest import make_candidate
+
+
+def test_match_payload(benchmark, job_dict, candidate_dict):
+    from app.agents.matcher import build_match_payload
+
+    benchmark.group = "prompts"
+    assert "Candidate Details" in benchmark(build_match_payload, job_dict, candidate_dict)
+
+
+def test_packed_match_payload(benchmark, job_dict):
+    from app.agents.matcher import build_packed_match_payload
+    from app.matching import MATCH_PACK_SIZE
+
+    benchmark.group = "prompts"
+    rng = random.Random(2)
+    candidates = [make_candidate(i, rng) for i in range(MATCH_PACK_SIZE)]
+    assert "candidate_id" in benchmark(build_packed_match_payload, job_dict, candidates)
+
+
+def test_interview_payload(benchmark, job_dict, candidate_dict):
+    from app.agents.scheduler import build_interview_payload
+    from app.schemas import interview_schema
+
+    benchmark.group = "prompts"
+    interview = interview_schema.InterviewPOSTEndpoint(
+        job_id=1, candidate_id=1, interview_datetime=datetime.now(timezone(timedelta(hours=5, minutes=30))),
+        duration_minutes=60, interview_format="online",
+    )
+    assert "Interview Format" in benchmark(build_interview_payload, job_dict, candidate_dict, interview)
@@ -0,0 +1,27 @@
+import pytest
+
+
+def _orm(model, values: dict):
+    return model(**values)
+
+
+@pytest.mark.parametrize("source", ["dict", "orm"])
+def test_candidate_validation(benchmark, candidate_dict, source):
+    from app import models
+    from app.schemas import candidate_schema
+
+    benchmark.group = "schemas"
+    value = candidate_dict if source == "dict" else _orm(models.Candidate, candidate_dict)
+    assert benchmark(candidate_schema.Candidate.model_validate, value).id == 1
+
+
+@pytest.mark.parametrize("source", ["dict", "orm"])
+def test_match_validation(benchmark, rng, source):
+    from app import models
+    from app.schemas import match_schema
+    from benchmarks.micro.conftest import make_match
+
+    benchmark.group = "schemas"
+    values = make_match(1, rng)
+    value = values if source == "dict" else _orm(models.Match, values)
+    assert benchmark(match_schema.Match.model_validate, value).id == 1
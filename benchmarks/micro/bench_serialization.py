@@ -0,0 +1,44 @@
+"""The list endpoints' serialization: ORM rows validated and dumped to JSON as in ``http_cache``."""
+import random
+
+import pytest
+
+from benchmarks.micro.conftest import LIST_ROWS, make_candidate, make_job, make_match
+
+LISTS = {
+    "jobs": ("Job", make_job),
+    "candidates": ("Candidate", make_candidate),
+    "matches": ("Match", make_match),
+}
+
+
+def _rows(name: str, n: int):
+    from app import models
+
+    model, make = LISTS[name]
+    rng = random.Random(3)
+    return [getattr(models, model)(**make(i, rng)) for i in range(1, n + 1)]
+
+
+def _schema(name: str, summary: bool):
+    from app.schemas import candidate_schema, job_schema, match_schema
+
+    module = {"jobs": job_schema, "candidates": candidate_schema, "matches": match_schema}[name]
+    return getattr(module, LISTS[name][0] + ("Summary" if summary else ""))
+
+
+@pytest.mark.parametrize("rows", LIST_ROWS)
+@pytest.mark.parametrize("fields", ["full", "summary"])
+@pytest.mark.parametrize("name", list(LISTS))
+def test_list_serialization(benchmark, name, fields, rows):
+    from app.http_cache import _adapter
+
+    benchmark.group = f"serialize {name}"
+    adapter = _adapter(list[_schema(name, fields == "summary")])
+    data = _rows(name, rows)
+
+    def serialize():
+        return adapter.dump_json(adapter.validate_python(data, from_attributes=True))
+
+    rounds = 10 if rows >= 10000 else 30
+    assert benchmark.pedantic(serialize, rounds=rounds, iterations=1, warmup_rounds=1).startswith(b"[")
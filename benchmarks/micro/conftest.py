@@ -0,0 +1,99 @@
+"""Shared inputs for the micro-benchmarks. Run them through ``python -m benchmarks.micro``."""
+import os
+import random
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("SECRET_KEY", "bench")
+os.environ.setdefault("GROQ_API_KEY", "bench")
+os.environ.setdefault("RATE_LIMIT_BACKEND", "off")
+os.environ.setdefault("DB_ECHO", "false")
+os.environ.setdefault("TRACING", "off")
+
+import pytest
+
+PDF_PAGES = (1, 5, 20)
+LIST_ROWS = (1000, 10000)
+
+
+def words(rng: random.Random, n: int) -> str:
+    vocabulary = ("built", "services", "python", "team", "latency", "pipelines", "designed", "customers",
+                  "migrated", "postgres", "reliability", "mentored", "shipped", "platform", "reduced", "costs")
+    return " ".join(rng.choice(vocabulary) for _ in range(n))
+
+
+def make_job(i: int, rng: random.Random) -> dict:
+    return {
+        "id": i, "user_id": 1, "title": f"Backend Engineer {i}", "summary": words(rng, 60),
+        "skills": "Python, FastAPI, PostgreSQL, Docker, Kubernetes, AWS", "experience_required": words(rng, 25),
+        "education_required": "Bachelor's degree in Computer Science or related field", "responsibilities": words(rng, 120),
+    }
+
+
+def make_candidate(i: int, rng: random.Random) -> dict:
+    return {
+        "id": i, "user_id": 1, "name": f"Candidate {i}", "email": f"candidate{i}@example.com",
+        "phone": f"+1-555-{i:06d}", "skills": words(rng, 20), "education": words(rng, 25),
+        "experience": words(rng, 200), "certifications": words(rng, 8),
+    }
+
+
+def make_match(i: int, rng: random.Random) -> dict:
+    return {
+        "id": i, "user_id": 1, "job_id": 1, "job_title": "Backend Engineer", "candidate_id": i,
+        "candidate_name": f"Candidate {i}", "match_score": float(rng.randrange(0, 101)), "reasoning": words(rng, 60),
+        "missing_skills": words(rng, 6), "missing_experience": words(rng, 12), "missing_education": None,
+        "is_stale": False,
+    }
+
+
+@pytest.fixture(scope="session")
+def rng():
+    return random.Random(1)
+
+
+@pytest.fixture(scope="session")
+def job_dict(rng):
+    return make_job(1, rng)
+
+
+@pytest.fixture(scope="session")
+def candidate_dict(rng):
+    return make_candidate(1, rng)
+
+
+def make_pdf(pages: int, rng: random.Random) -> bytes:
+    """A resume-like PDF of exactly ``pages`` full pages: bold headings over body lines."""
+    import fitz
+
+    doc = fitz.open()
+    for page_no in range(pages):
+        page = doc.new_page()
+        y = 60
+        if page_no == 0:
+            page.insert_text((56, y), "Asha Sharma", fontsize=20, fontname="hebo")
+            page.insert_text((56, y + 24), "asha.sharma@example.com  |  +91 9876543210  |  Bengaluru", fontsize=10)
+            y += 50
+        while y < 780:
+            if rng.random() < 0.12:
+                page.insert_text((56, y + 6), rng.choice(("EXPERIENCE", "PROJECTS", "SKILLS", "EDUCATION")),
+                                 fontsize=12, fontname="hebo")
+                y += 24
+            else:
+                page.insert_text((66, y), "- " + words(rng, 14), fontsize=10)
+                y += 16
+    data = doc.tobytes()
+    doc.close()
+    return data
+
+
+@pytest.fixture(scope="session")
+def pdf_corpus(tmp_path_factory):
+    """Path of a generated PDF per page count in PDF_PAGES."""
+    directory = tmp_path_factory.mktemp("pdfs")
+    rng = random.Random(1)
+    corpus = {}
+    for pages in PDF_PAGES:
+        path = directory / f"{pages}.pdf"
+        path.write_bytes(make_pdf(pages, rng))
+        corpus[pages] = str(path)
+    return corpus
@@ -0,0 +1,96 @@
+"""Packed vs one-candidate-per-call matching of one job against many candidates.
+
+    python -m benchmarks.packed_matching --candidates 100 --pack-sizes 1 5 10 20 --latency 0.8
+
+Runs ``app.matching.score_many`` with fake matcher models, so no Groq access is needed.
+Each call costs ``--latency`` seconds plus ``--ms-per-output-token`` of decode time.
+Pack size 1 is the unpacked baseline. ``--bad-rate`` drops or corrupts that share of packed
+items, to show the cost of the per-item fallback. Tokens are approximated as 4 characters
+of prompt (system prompt included) or of answer JSON.
+"""
+import argparse
+import asyncio
+import os
+import random
+import time
+
+
+def make_candidates(n: int, seed: int):
+    from app.schemas import candidate_schema
+    from loadtest.fakes import SKILLS
+
+    rng = random.Random(seed)
+    return [
+        candidate_schema.Candidate(
+            id=i + 1,
+            user_id=1,
+            name=f"Candidate {i + 1}",
+            email=f"candidate{i + 1}@example.com",
+            phone=f"+1-555-{i:04d}",
+            skills=", ".join(rng.sample(SKILLS, 4)),
+            education="B.Sc. Computer Science",
+            experience=f"{rng.randrange(1, 12)} years building backend services and data pipelines.",
+            certifications=rng.choice([None, "AWS Certified Developer", "CKA"]),
+        )
+        for i in range(n)
+    ]
+
+
+async def run_mode(job, candidates, pack_size: int, args):
+    from app import matching
+    from app.agents.matcher import matcher_agent, packed_matcher_agent
+    from loadtest import fakes
+
+    meter = fakes.TokenMeter(args.ms_per_output_token / 1000)
+    latency = fakes.Latency(args.latency, args.jitter, args.seed)
+    with matcher_agent.override(model=fakes.matcher_model(latency, meter)), \
+            packed_matcher_agent.override(model=fakes.packed_matcher_model(latency, meter, args.bad_rate, args.seed)):
+        started = time.perf_counter()
+        results = await matching.score_many(job, candidates, pack_size=pack_size, concurrency=args.concurrency)
+        elapsed = time.perf_counter() - started
+    return {
+        "calls": meter.calls,
+        "input_tokens": meter.input_tokens,
+        "output_tokens": meter.output_tokens,
+        "scored": sum(values is not None for values in results.values()),
+        "elapsed_s": elapsed,
+    }
+
+
+async def main(args):
+    from app.schemas import job_schema
+
+    job = job_schema.Job(
+        id=1, user_id=1, title="Senior Backend Engineer",
+        summary="Own the services behind our hiring platform: APIs, data pipelines and integrations.",
+        skills="Python, FastAPI, PostgreSQL, Docker, Kubernetes, AWS",
+        experience_required="5+ years in backend development, 2+ years running services in production",
+        education_required="Bachelor's degree in Computer Science or related field",
+        responsibilities="Design and build APIs, review code, mentor engineers, improve reliability and observability.",
+    )
+    candidates = make_candidates(args.candidates, args.seed)
+
+    print(f"{'pack':>5}{'calls':>7}{'in tokens':>11}{'out tokens':>12}{'total':>9}{'scored':>8}{'wall s':>8}")
+    for pack_size in args.pack_sizes:
+        r = await run_mode(job, candidates, pack_size, args)
+        print(f"{pack_size:>5}{r['calls']:>7}{r['input_tokens']:>11}{r['output_tokens']:>12}"
+              f"{r['input_tokens'] + r['output_tokens']:>9}{r['scored']:>8}{r['elapsed_s']:>8.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--candidates", type=int, default=100)
+    parser.add_argument("--pack-sizes", type=int, nargs="+", default=[1, 5, 10, 20])
+    parser.add_argument("--concurrency", type=int, default=4, help="matcher calls in flight at once")
+    parser.add_argument("--latency", type=float, default=0.8, help="fixed seconds per call (queueing + prefill)")
+    parser.add_argument("--jitter", type=float, default=0.1)
+    parser.add_argument("--ms-per-output-token", type=float, default=5.0, help="simulated decode speed")
+    parser.add_argument("--bad-rate", type=float, default=0.0, help="share of packed items dropped or invalid")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    os.environ.setdefault("DATABASE_URL", "sqlite://")
+    os.environ.setdefault("GROQ_API_KEY", "bench")
+    os.environ.setdefault("RATE_LIMIT_BACKEND", "off")
+    os.environ.setdefault("DB_ECHO", "false")
+    asyncio.run(main(args))
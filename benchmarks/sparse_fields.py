@@ -0,0 +1,104 @@
+"""Payload size and query time of full vs summary records on the /read list endpoints.
+
+    python -m benchmarks.sparse_fields --rows 20000 --limits 100 1000
+    python -m benchmarks.sparse_fields --database-url postgresql+psycopg2://localhost/aptivhire_bench
+
+Seeds one large tenant (jobs, candidates and matches with realistically long text columns),
+then for each list times the column-projected query (``crud.get_*`` with ``columns``) against
+the full one, and measures the serialized JSON each returns. Times are the median of
+``--repeats`` runs; serialization runs the same ``TypeAdapter`` path as ``http_cache``.
+"""
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+
+
+def words(rng: random.Random, n: int) -> str:
+    vocabulary = ("built", "services", "python", "team", "latency", "pipelines", "designed", "customers",
+                  "migrated", "postgres", "reliability", "mentored", "shipped", "platform", "reduced", "costs")
+    return " ".join(rng.choice(vocabulary) for _ in range(n))
+
+
+def seed(db, user_id: int, rows: int, rng: random.Random):
+    from app import crud
+    from app.schemas import candidate_schema, job_schema, match_schema
+
+    jobs = max(1, rows // 10)
+    job_ids = crud.bulk_create_jobs(db, [job_schema.JobBase(
+        user_id=user_id, title=f"Backend Engineer {i}", summary=words(rng, 80), skills=words(rng, 20),
+        experience_required=words(rng, 30), education_required=words(rng, 15), responsibilities=words(rng, 160),
+    ) for i in range(jobs)])
+    candidate_ids = crud.bulk_create_candidates(db, [candidate_schema.CandidateBase(
+        user_id=user_id, name=f"Candidate {i}", email=f"candidate{i}@example.com", phone=f"+1-555-{i:06d}",
+        skills=words(rng, 25), education=words(rng, 30), experience=words(rng, 250), certifications=words(rng, 10),
+    ) for i in range(rows)])
+    crud.bulk_create_matches(db, [match_schema.MatchBase(
+        user_id=user_id, job_id=rng.choice(job_ids), job_title="Backend Engineer", candidate_id=candidate_id,
+        candidate_name=f"Candidate {i}", match_score=rng.randrange(0, 101), reasoning=words(rng, 120),
+        missing_skills=words(rng, 15), missing_experience=words(rng, 25), missing_education=words(rng, 10),
+    ) for i, candidate_id in enumerate(candidate_ids)])
+
+
+def measure(db, loader, schema, repeats: int):
+    from pydantic import TypeAdapter
+
+    adapter = TypeAdapter(list[schema])
+    query_s, serialize_s = [], []
+    for _ in range(repeats):
+        db.expunge_all()
+        started = time.perf_counter()
+        rows = loader()
+        loaded = time.perf_counter()
+        body = adapter.dump_json(adapter.validate_python(rows, from_attributes=True))
+        query_s.append(loaded - started)
+        serialize_s.append(time.perf_counter() - loaded)
+    return len(body), statistics.median(query_s) * 1000, statistics.median(serialize_s) * 1000
+
+
+def main(args):
+    from app import crud, fieldsets, models
+    from app.db import SessionLocal, init_db
+    from app.schemas import candidate_schema, job_schema, match_schema
+
+    init_db()
+    with SessionLocal() as db:
+        user = models.User(email=f"bench{time.time_ns()}@example.com", hashed_password="x")
+        db.add(user)
+        db.commit()
+        user_id = user.id
+        seed(db, user_id, args.rows, random.Random(args.seed))
+
+        lists = [
+            ("jobs", crud.get_jobs, job_schema.Job, job_schema.JobSummary),
+            ("candidates", crud.get_candidates, candidate_schema.Candidate, candidate_schema.CandidateSummary),
+            ("matches", crud.get_matches, match_schema.Match, match_schema.MatchSummary),
+        ]
+        print(f"{args.rows} candidates/matches, {max(1, args.rows // 10)} jobs, median of {args.repeats} runs")
+        print(f"{'list':<12}{'limit':>6}{'fields':>9}{'bytes':>10}{'query ms':>10}{'json ms':>9}")
+        for name, get, full, summary in lists:
+            for limit in args.limits:
+                for label, schema in (("full", full), ("summary", summary)):
+                    columns = fieldsets.columns(schema, full)
+                    size, query_ms, json_ms = measure(
+                        db, lambda: get(db=db, user_id=user_id, skip=0, limit=limit, columns=columns), schema, args.repeats)
+                    print(f"{name:<12}{limit:>6}{label:>9}{size:>10}{query_ms:>10.2f}{json_ms:>9.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=20000, help="candidates (and matches) in the tenant")
+    parser.add_argument("--limits", type=int, nargs="+", default=[100, 1000])
+    parser.add_argument("--repeats", type=int, default=20)
+    parser.add_argument("--database-url", help="defaults to a temporary SQLite file")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    os.environ["DATABASE_URL"] = args.database_url or f"sqlite:///{tempfile.mkdtemp()}/sparse_fields.db"
+    os.environ.setdefault("SECRET_KEY", "bench")
+    os.environ.setdefault("RATE_LIMIT_BACKEND", "off")
+    os.environ.setdefault("DB_ECHO", "false")
+    os.environ.setdefault("TRACING", "off")
+    main(args)
@@ -0,0 +1,207 @@
+"""Per-tenant match query latency on one large matches table vs one hash-partitioned by user_id.
+
+    python -m benchmarks.tenant_partitions --database-url postgresql+psycopg2://localhost/aptivhire_bench
+    python -m benchmarks.tenant_partitions --database-url ... --rows 1000000 --layouts before partitioned
+
+Needs a Postgres (11+) database it can create a ``bench_partitions`` schema in. Generates
+``--rows`` matches spread over ``--tenants`` recruiters with a skewed size distribution (a few
+recruiters own most rows, as in production), then loads the same rows into each layout:
+
+before        the table as it was before partitioning: primary key and index on id only
+indexed       the same plain table with the per-tenant (user_id, ...) indexes
+partitioned   hash-partitioned by user_id into ``--partitions``, with the same indexes (app.models)
+
+For the largest tenant and a sample of small ones, times the queries crud runs on matches:
+a page of the list, one (job, candidate) pair, a job's matches and the stale count. Reports p50
+and p95 over ``--repeats`` runs per tenant, then how long VACUUM takes after one small tenant's
+matches are marked stale (the whole table, or only that tenant's partition).
+Loading 10M rows takes several minutes per layout.
+"""
+import argparse
+import os
+import random
+import statistics
+import time
+
+SCHEMA = "bench_partitions"
+LAYOUTS = ("before", "indexed", "partitioned")
+TENANT_INDEXES = ("user_id, job_id, candidate_id", "user_id, candidate_id")
+QUERIES = {
+    "list": "SELECT * FROM {table} WHERE user_id = :user_id LIMIT 100 OFFSET 0",
+    "pair": "SELECT * FROM {table} WHERE user_id = :user_id AND job_id = :job_id AND candidate_id = :candidate_id",
+    "job": "SELECT id, match_score FROM {table} WHERE user_id = :user_id AND job_id = :job_id",
+    "stale": "SELECT count(*) FROM {table} WHERE user_id = :user_id AND is_stale",
+}
+COLUMNS = """
+    id integer NOT NULL,
+    user_id integer NOT NULL,
+    job_id integer NOT NULL,
+    job_title text NOT NULL,
+    candidate_id integer NOT NULL,
+    candidate_name text NOT NULL,
+    match_score double precision NOT NULL,
+    reasoning text NOT NULL,
+    missing_skills text,
+    missing_experience text,
+    missing_education text,
+    is_stale boolean DEFAULT false NOT NULL
+"""
+
+
+def generate(conn, rows: int, tenants: int, skew: float, seed: int):
+    """The source rows, generated server-side; tenant sizes follow ``random() ^ skew``."""
+    from sqlalchemy import text
+
+    conn.execute(text(f"CREATE UNLOGGED TABLE {SCHEMA}.source ({COLUMNS})"))
+    conn.execute(text("SELECT setseed(:seed)"), {"seed": seed / 2 ** 31})
+    conn.execute(text(f"""
+        INSERT INTO {SCHEMA}.source
+        SELECT g, user_id, 1 + (g % 500), 'Backend Engineer', g, 'Candidate ' || g, floor(random() * 101),
+               repeat(md5(g::text), 6), 'kubernetes, terraform', repeat(md5((g + 1)::text), 2), NULL,
+               random() < 0.02
+        FROM (SELECT g, 1 + floor(power(random(), :skew) * :tenants)::int AS user_id
+              FROM generate_series(1, :rows) AS g) AS generated
+    """), {"rows": rows, "tenants": tenants, "skew": skew})
+
+
+def create_layout(conn, layout: str, partitions: int) -> str:
+    from sqlalchemy import text
+
+    table = f"{SCHEMA}.matches_{layout}"
+    conn.execute(text(f"CREATE TABLE {table} ({COLUMNS})"
+                      + (" PARTITION BY HASH (user_id)" if layout == "partitioned" else "")))
+    conn.execute(text(f"ALTER TABLE {table} ADD PRIMARY KEY "
+                      + ("(id, user_id)" if layout == "partitioned" else "(id)")))
+    if layout == "partitioned":
+        for n in range(partitions):
+            conn.execute(text(f"CREATE TABLE {table}_p{n} PARTITION OF {table} "
+                              f"FOR VALUES WITH (MODULUS {partitions}, REMAINDER {n})"))
+    conn.execute(text(f"CREATE INDEX ON {table} (id)"))
+    if layout != "before":
+        for columns in TENANT_INDEXES:
+            conn.execute(text(f"CREATE INDEX ON {table} ({columns})"))
+    conn.execute(text(f"INSERT INTO {table} SELECT * FROM {SCHEMA}.source"))
+    return table
+
+
+def pick_tenants(conn, sample: int, rng: random.Random) -> tuple[dict, list[dict]]:
+    """The largest tenant and ``sample`` tenants from the smaller half, each with one of its pairs."""
+    from sqlalchemy import text
+
+    sizes = conn.execute(text(f"SELECT user_id, count(*) FROM {SCHEMA}.source GROUP BY user_id ORDER BY 2 DESC")).all()
+    small = rng.sample([user_id for user_id, _ in sizes[len(sizes) // 2:]], min(sample, len(sizes) - len(sizes) // 2))
+    pairs = {row.user_id: row for row in conn.execute(text(
+        f"SELECT DISTINCT ON (user_id) user_id, job_id, candidate_id FROM {SCHEMA}.source "
+        "WHERE user_id = ANY(:ids) ORDER BY user_id, id"), {"ids": [sizes[0][0], *small]})}
+    as_params = lambda user_id: dict(pairs[user_id]._mapping)
+    print(f"{len(sizes)} tenants; largest {sizes[0][1]} rows, median {sizes[len(sizes) // 2][1]}, "
+          f"sampled small tenants {min(count for user_id, count in sizes if user_id in small)}-"
+          f"{max(count for user_id, count in sizes if user_id in small)} rows")
+    return as_params(sizes[0][0]), [as_params(user_id) for user_id in small]
+
+
+def time_queries(conn, table: str, tenants: list[dict], repeats: int) -> dict[str, list[float]]:
+    from sqlalchemy import text
+
+    timings = {}
+    for name, sql in QUERIES.items():
+        statement = text(sql.format(table=table))
+        samples = []
+        for params in tenants:
+            conn.execute(statement, params).all()  # warm the plan and the tenant's pages
+            for _ in range(repeats):
+                started = time.perf_counter()
+                conn.execute(statement, params).all()
+                samples.append((time.perf_counter() - started) * 1000)
+        timings[name] = samples
+    return timings
+
+
+def time_vacuum(engine, table: str, layout: str, user_id: int) -> tuple[str, float]:
+    """Marks one tenant's matches stale (as crud does on a job edit) and vacuums what holds them."""
+    from sqlalchemy import text
+
+    with engine.begin() as conn:
+        conn.execute(text(f"UPDATE {table} SET is_stale = true WHERE user_id = :user_id"), {"user_id": user_id})
+        target = table
+        if layout == "partitioned":
+            target = conn.execute(text(f"SELECT tableoid::regclass::text FROM {table} WHERE user_id = :user_id LIMIT 1"),
+                                  {"user_id": user_id}).scalar()
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        started = time.perf_counter()
+        conn.execute(text(f"VACUUM {target}"))
+        return target, (time.perf_counter() - started) * 1000
+
+
+def percentile(samples: list[float], q: int) -> float:
+    return statistics.quantiles(samples, n=100)[q - 1] if len(samples) > 1 else samples[0]
+
+
+def main(args):
+    from sqlalchemy import create_engine, text
+
+    engine = create_engine(args.database_url)
+    if engine.dialect.name != "postgresql":
+        raise SystemExit("this benchmark needs Postgres: partitioning is a Postgres feature")
+    rng = random.Random(args.seed)
+
+    started = time.perf_counter()
+    with engine.begin() as conn:
+        conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+        conn.execute(text(f"CREATE SCHEMA {SCHEMA}"))
+        generate(conn, args.rows, args.tenants, args.skew, args.seed)
+        large, small = pick_tenants(conn, args.sample, rng)
+    print(f"generated {args.rows} rows in {time.perf_counter() - started:.0f} s")
+
+    tables = {}
+    for layout in args.layouts:
+        started = time.perf_counter()
+        with engine.begin() as conn:
+            tables[layout] = create_layout(conn, layout, args.partitions)
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            conn.execute(text(f"VACUUM ANALYZE {tables[layout]}"))
+        print(f"loaded {layout} in {time.perf_counter() - started:.0f} s")
+
+    print(f"\np50 / p95 ms over {args.repeats} runs per tenant")
+    print(f"{'layout':<13}{'tenant':<7}" + "".join(f"{name:>18}" for name in QUERIES))
+    for layout, table in tables.items():
+        with engine.connect() as conn:
+            for label, tenants in (("large", [large]), ("small", small)):
+                timings = time_queries(conn, table, tenants, args.repeats)
+                print(f"{layout:<13}{label:<7}" + "".join(
+                    f"{percentile(samples, 50):>10.2f} /{percentile(samples, 95):>6.2f}" for samples in timings.values()))
+            if args.explain:
+                plan = conn.execute(text("EXPLAIN " + QUERIES["list"].format(table=table)), small[0]).scalars().all()
+                print("\n".join(f"{'':<13}{line}" for line in plan))
+
+    print("\nVACUUM after one small tenant's matches are marked stale")
+    for layout, table in tables.items():
+        target, ms = time_vacuum(engine, table, layout, small[0]["user_id"])
+        print(f"{layout:<13}{target:<40}{ms:>10.1f} ms")
+
+    if not args.keep:
+        with engine.begin() as conn:
+            conn.execute(text(f"DROP SCHEMA {SCHEMA} CASCADE"))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", required=True, help="a Postgres database to create the bench schema in")
+    parser.add_argument("--rows", type=int, default=10_000_000)
+    parser.add_argument("--tenants", type=int, default=2000)
+    parser.add_argument("--skew", type=float, default=3.0, help="higher puts more rows in the largest tenants")
+    parser.add_argument("--partitions", type=int, default=None, help="defaults to app.models.TENANT_PARTITIONS")
+    parser.add_argument("--layouts", nargs="+", choices=LAYOUTS, default=list(LAYOUTS))
+    parser.add_argument("--sample", type=int, default=20, help="small tenants to time")
+    parser.add_argument("--repeats", type=int, default=20)
+    parser.add_argument("--explain", action="store_true", help="print the plan of the small-tenant list query")
+    parser.add_argument("--keep", action="store_true", help="keep the bench schema afterwards")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    if args.partitions is None:
+        os.environ.setdefault("DATABASE_URL", args.database_url)
+        from app.models import TENANT_PARTITIONS
+
+        args.partitions = TENANT_PARTITIONS
+    main(args)
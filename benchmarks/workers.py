@@ -0,0 +1,181 @@
+"""Throughput of the production server profile as the worker count grows.
+
+    python -m benchmarks.workers --workers 1 2 4 --duration 15 --concurrency 32
+
+For each worker count, starts ``gunicorn -c gunicorn.conf.py`` serving the real app with
+fake LLM agents (see ``loadtest.fakes``), then drives a closed loop of CPU-bound requests
+against it for ``--duration`` seconds: resume uploads (PDF parsing), logins (bcrypt) and
+list reads (JSON encoding). Reports requests/s, latency percentiles and the speedup over
+one worker.
+
+The load generator is a single process on the same host, so keep the largest worker count
+below the number of cores or it competes with the server for CPU.
+"""
+import argparse
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import ExitStack
+
+OPS = ("upload", "login", "read")
+
+
+def fake_app():
+    """Gunicorn app factory: the real app, with every agent answered by a local fake model."""
+    from loadtest import fakes
+
+    fakes.FakeMailer(fakes.Latency(0.0, 0.0)).install()
+
+    from app.agents.cv_agent import cv_agent
+    from app.agents.jd_agent import jd_agent
+    from app.agents.matcher import matcher_agent, packed_matcher_agent
+    from app.agents.scheduler import interview_email_agent
+    from app.main import app
+
+    latency = fakes.Latency(float(os.getenv("BENCH_LLM_LATENCY", 0)), 0.0)
+    overrides = [
+        (cv_agent, fakes.cv_model(latency)),
+        (jd_agent, fakes.jd_model(latency)),
+        (matcher_agent, fakes.matcher_model(latency)),
+        (packed_matcher_agent, fakes.packed_matcher_model(latency)),
+        (interview_email_agent, fakes.email_model(latency)),
+    ]
+
+    async def wrapped(scope, receive, send):
+        # overrides are context variables, so they are entered for every request
+        with ExitStack() as stack:
+            for agent, model in overrides:
+                stack.enter_context(agent.override(model=model))
+            await app(scope, receive, send)
+
+    return wrapped
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(workers: int, env: dict) -> tuple[subprocess.Popen, str]:
+    port = _free_port()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "-w", str(workers),
+         "-b", f"127.0.0.1:{port}", "benchmarks.workers:fake_app()"],
+        env=env,
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise SystemExit(f"gunicorn exited with {process.returncode}")
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=0.2):
+                break
+        except OSError:
+            time.sleep(0.1)
+    return process, base_url
+
+
+def stop_server(process: subprocess.Popen):
+    process.terminate()
+    try:
+        process.wait(timeout=30)
+    except subprocess.TimeoutExpired:
+        process.kill()
+
+
+async def run_load(base_url: str, duration: float, concurrency: int, pdfs: list[bytes], account: dict):
+    import httpx
+
+    from loadtest.run import percentile
+
+    latencies = []
+    errors = 0
+    limits = httpx.Limits(max_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, timeout=60, limits=limits) as client:
+        await client.post("/auth/register", json=account)
+        token = (await client.post("/auth/login", json=account)).json()["access_token"]
+        headers = {"Authorization": f"Bearer {token}"}
+
+        async def request(op: str, i: int):
+            if op == "upload":
+                files = {"file": (f"resume-{i}.pdf", pdfs[i % len(pdfs)], "application/pdf")}
+                return await client.post("/candidates/create", files=files, headers=headers)
+            if op == "login":
+                return await client.post("/auth/login", json=account)
+            return await client.get("/candidates/read", headers=headers)
+
+        async def worker(n: int):
+            nonlocal errors
+            i = n
+            while time.monotonic() < stop_at:
+                started = time.perf_counter()
+                response = await request(OPS[i % len(OPS)], i)
+                latencies.append(time.perf_counter() - started)
+                if response.status_code >= 400:
+                    errors += 1
+                i += concurrency
+
+        stop_at = time.monotonic() + duration
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(n) for n in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": len(latencies) / elapsed,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--duration", type=float, default=15.0, help="seconds of load per worker count")
+    parser.add_argument("--concurrency", type=int, default=32, help="requests in flight from the client")
+    parser.add_argument("--latency", type=float, default=0.0, help="injected fake LLM latency in seconds")
+    parser.add_argument("--pages", type=int, default=3, help="pages per generated resume PDF")
+    parser.add_argument("--database-url", help="defaults to a throwaway SQLite file")
+    args = parser.parse_args(argv)
+
+    from loadtest import fakes
+
+    workdir = tempfile.mkdtemp(prefix="aptivhire-workers-")
+    env = {
+        **os.environ,
+        "DATABASE_URL": args.database_url or f"sqlite:///{workdir}/bench.db",
+        "SECRET_KEY": os.getenv("SECRET_KEY", "bench-secret"),
+        "GROQ_API_KEY": os.getenv("GROQ_API_KEY", "bench-not-used"),
+        "RATE_LIMIT_BACKEND": "off",
+        "DB_ECHO": "false",
+        "BLOB_STORE_DIR": f"{workdir}/blobs",
+        "BENCH_LLM_LATENCY": str(args.latency),
+        "GUNICORN_ACCESSLOG": "",
+        "PYTHONPATH": os.getcwd(),
+    }
+    pdfs = [fakes.resume_pdf(n, args.pages) for n in range(50)]
+
+    print(f"{'workers':>7}{'requests':>10}{'errors':>8}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'speedup':>9}")
+    baseline = None
+    for workers in args.workers:
+        process, base_url = start_server(workers, env)
+        try:
+            account = {"email": f"bench-{workers}@example.com", "password": "bench-password"}
+            report = asyncio.run(run_load(base_url, args.duration, args.concurrency, pdfs, account))
+        finally:
+            stop_server(process)
+        baseline = baseline or report["rps"]
+        print(f"{workers:>7}{report['requests']:>10}{report['errors']:>8}{report['rps']:>9.1f}"
+              f"{report['p50_ms']:>9.1f}{report['p95_ms']:>9.1f}{report['rps'] / baseline:>8.2f}x")
+    print(f"(host has {os.cpu_count()} CPUs)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""Production server profile: ``gunicorn -c gunicorn.conf.py app.main:app``.
+
+Every setting can be overridden from the environment (GUNICORN_* / WEB_CONCURRENCY) or
+on the command line.
+"""
+import os
+
+from app.agents.config import AGENT_POLICIES
+
+
+def _cpu_count() -> int:
+    # honours CPU affinity / container cpusets where the platform exposes them
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+bind = os.getenv("GUNICORN_BIND", "0.0.0.0:8000")
+worker_class = "uvicorn.workers.UvicornWorker"
+# PDF parsing, bcrypt and JSON encoding are CPU-bound; LLM waits are async inside each worker
+workers = int(os.getenv("WEB_CONCURRENCY", _cpu_count()))
+
+# import the app once in the master so workers fork with it already loaded
+preload_app = True
+
+# recycle workers to bound slow memory growth (PDF buffers, caches); jitter avoids restarting all at once
+max_requests = int(os.getenv("GUNICORN_MAX_REQUESTS", 1000))
+max_requests_jitter = int(os.getenv("GUNICORN_MAX_REQUESTS_JITTER", 100))
+
+# on SIGTERM a worker stops accepting and finishes its requests; the longest agent latency
+# budget plus a margin keeps in-flight LLM calls from being cut off mid-request
+graceful_timeout = int(os.getenv(
+    "GUNICORN_GRACEFUL_TIMEOUT", max(policy.total_budget for policy in AGENT_POLICIES.values()) + 10
+))
+timeout = int(os.getenv("GUNICORN_TIMEOUT", 120))
+keepalive = int(os.getenv("GUNICORN_KEEPALIVE", 5))
+
+accesslog = os.getenv("GUNICORN_ACCESSLOG", "-") or None
+errorlog = "-"
+
+
+def on_starting(server):
+    # create tables once, before any worker exists
+    from app.db import init_db
+    init_db()
+
+    from app import cache
+    if server.cfg.workers > 1 and isinstance(cache.cache, cache.TTLCache) \
+            and cache.cache.ttl > cache.CACHE_MULTI_WORKER_TTL_SECONDS:
+        server.log.warning(
+            "CACHE_BACKEND is not redis: with %s workers the cache TTL is capped at %ss so writes "
+            "made by one worker reach the others; set CACHE_BACKEND=redis to keep %ss",
+            server.cfg.workers, cache.CACHE_MULTI_WORKER_TTL_SECONDS, cache.cache.ttl)
+
+
+def post_fork(server, worker):
+    # connections opened in the master (init_db) must not be shared with the children
+    from app.db import engine
+    engine.dispose(close=False)
+
+    # invalidations in the in-process cache stay in this worker; see app/cache.py
+    from app import cache
+    cache.limit_ttl_for_workers(server.cfg.workers)
@@ -0,0 +1,191 @@
+"""Deterministic stand-ins for the LLM agents, the email transport and uploaded resumes."""
+import asyncio
+import hashlib
+import json
+import random
+import re
+import sys
+import types
+
+import fitz
+from pydantic_ai.messages import ModelResponse, ToolCallPart
+from pydantic_ai.models.function import AgentInfo, FunctionModel
+
+from app.tracing import span
+
+SKILLS = ["Python", "FastAPI", "PostgreSQL", "React", "Docker", "Kubernetes", "AWS", "Go", "Kafka", "Terraform"]
+
+
+class Latency:
+    """Injected model latency: ``mean`` seconds with +/- ``jitter`` spread, seeded for repeatability."""
+
+    def __init__(self, mean: float = 0.5, jitter: float = 0.2, seed: int = 0):
+        self.mean = mean
+        self.jitter = jitter
+        self.rng = random.Random(seed)
+
+    async def wait(self):
+        if self.mean > 0:
+            await asyncio.sleep(max(0.0, self.rng.uniform(self.mean - self.jitter, self.mean + self.jitter)))
+
+
+def _prompt_text(messages) -> str:
+    return "".join(
+        part.content for message in messages for part in getattr(message, "parts", [])
+        if isinstance(getattr(part, "content", None), str)
+    )
+
+
+class TokenMeter:
+    """Counts calls and approximate tokens (4 characters each) across fake model calls.
+
+    ``seconds_per_output_token`` adds decode time proportional to the answer's length."""
+
+    def __init__(self, seconds_per_output_token: float = 0.0):
+        self.seconds_per_output_token = seconds_per_output_token
+        self.calls = 0
+        self.input_tokens = 0
+        self.output_tokens = 0
+
+    async def record(self, messages, args: dict):
+        output_tokens = len(json.dumps(args)) // 4
+        self.calls += 1
+        self.input_tokens += len(_prompt_text(messages)) // 4
+        self.output_tokens += output_tokens
+        if self.seconds_per_output_token:
+            await asyncio.sleep(output_tokens * self.seconds_per_output_token)
+
+
+def _seed(messages) -> int:
+    return int(hashlib.sha256(_prompt_text(messages).encode()).hexdigest()[:8], 16)
+
+
+def _output(info: AgentInfo, args: dict) -> ModelResponse:
+    return ModelResponse(parts=[ToolCallPart(tool_name=info.output_tools[0].name, args=args)])
+
+
+def cv_model(latency: Latency) -> FunctionModel:
+    async def run(messages, info: AgentInfo):
+        await latency.wait()
+        n = _seed(messages)
+        rng = random.Random(n)
+        return _output(info, {
+            "name": f"Candidate {n % 100000}",
+            "email": f"candidate{n % 100000}@example.com",
+            "phone": f"+1-555-{n % 10000:04d}",
+            "skills": ", ".join(rng.sample(SKILLS, 4)),
+            "education": "B.Sc. Computer Science",
+            "experience": f"{n % 10} years of backend development",
+            "certifications": None,
+        })
+    return FunctionModel(run, model_name="fake-cv")
+
+
+def jd_model(latency: Latency) -> FunctionModel:
+    async def run(messages, info: AgentInfo):
+        await latency.wait()
+        n = _seed(messages)
+        rng = random.Random(n)
+        return _output(info, {
+            "title": f"Engineer {n % 1000}",
+            "summary": "Build and operate backend services.",
+            "skills": ", ".join(rng.sample(SKILLS, 5)),
+            "experience_required": f"{n % 8}+ years in software development",
+            "education_required": "Bachelor's degree in Computer Science or related field",
+            "responsibilities": "Design APIs, review code, mentor engineers.",
+        })
+    return FunctionModel(run, model_name="fake-jd")
+
+
+def _match_fields(n: int) -> dict:
+    return {
+        "match_score": n % 101,
+        "reasoning": "Deterministic score derived from the prompt.",
+        "missing_skills": None if n % 3 else "Kubernetes",
+        "missing_experience": None,
+        "missing_education": None,
+    }
+
+
+def matcher_model(latency: Latency, meter: TokenMeter = None) -> FunctionModel:
+    async def run(messages, info: AgentInfo):
+        await latency.wait()
+        args = _match_fields(_seed(messages))
+        if meter:
+            await meter.record(messages, args)
+        return _output(info, args)
+    return FunctionModel(run, model_name="fake-matcher")
+
+
+def packed_matcher_model(latency: Latency, meter: TokenMeter = None, bad_rate: float = 0.0, seed: int = 0) -> FunctionModel:
+    """Answers packed prompts with one item per ``candidate_id``; ``bad_rate`` of the items
+    are dropped or given an out-of-range score, to exercise the per-item fallback."""
+    rng = random.Random(seed)
+
+    async def run(messages, info: AgentInfo):
+        await latency.wait()
+        text = _prompt_text(messages)
+        items = []
+        for candidate_id in re.findall(r"candidate_id: (\d+)", text):
+            fields = _match_fields(int(hashlib.sha256(f"{candidate_id}:{text}".encode()).hexdigest()[:8], 16))
+            if rng.random() < bad_rate:
+                if rng.random() < 0.5:
+                    continue
+                fields["match_score"] = 250
+            items.append({"candidate_id": int(candidate_id), **fields})
+        args = {"matches": items}
+        if meter:
+            await meter.record(messages, args)
+        return _output(info, args)
+    return FunctionModel(run, model_name="fake-packed-matcher")
+
+
+def email_model(latency: Latency) -> FunctionModel:
+    async def run(messages, info: AgentInfo):
+        await latency.wait()
+        text = _prompt_text(messages)
+        email = next((w.strip(" |,") for w in text.split() if "@" in w), "candidate@example.com")
+        return _output(info, {
+            "subject": "Interview invitation",
+            "body": "Dear candidate, we would like to invite you to an interview.",
+            "recipient_email": email,
+        })
+    return FunctionModel(run, model_name="fake-scheduler")
+
+
+class FakeMailer:
+    """Replacement for ``app.utils.gmail_helper``; records messages instead of sending them."""
+
+    def __init__(self, latency: Latency):
+        self.latency = latency
+        self.sent = []
+
+    async def send_email(self, subject: str, body: str, recipient_email: str, reply_to: str = None) -> bool:
+        with span("email.send", stage="email", kind="CLIENT"):
+            await self.latency.wait()
+        self.sent.append((recipient_email, subject))
+        return True
+
+    def install(self):
+        # must run before app.routers.interviews is imported: the real module loads Gmail credentials at import
+        module = types.ModuleType("app.utils.gmail_helper")
+        module.send_email = self.send_email
+        sys.modules["app.utils.gmail_helper"] = module
+
+
+def resume_pdf(n: int, pages: int = 1) -> bytes:
+    doc = fitz.open()
+    for page_no in range(pages):
+        page = doc.new_page()
+        page.insert_text((72, 72), f"Resume {n} - page {page_no + 1}", fontsize=16)
+        body = [
+            f"Email: applicant{n}@example.com   Phone: +1-555-{n % 10000:04d}",
+            "Skills: " + ", ".join(SKILLS[n % 5:n % 5 + 5]),
+            "Experience: Backend engineer building APIs and data pipelines.",
+            "Education: B.Sc. Computer Science",
+        ]
+        for i, line in enumerate(body):
+            page.insert_text((72, 110 + i * 18), line, fontsize=11)
+    data = doc.tobytes()
+    doc.close()
+    return data
@@ -0,0 +1,251 @@
+"""End-to-end load test against the app with fake LLM agents and a fake mail transport.
+
+    python -m loadtest.run --scenario mixed --users 20 --requests 500 --latency 0.5
+
+Runs in-process over an ASGI transport, so nothing needs Groq or Gmail access.
+Uses a throwaway SQLite file unless ``--database-url`` points at a local Postgres.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+
+SCENARIOS = {
+    # weights per operation
+    "ingest": {"create_candidate": 6, "create_match": 2, "read": 2},
+    "matching": {"create_match": 7, "read": 3},
+    "read-heavy": {"read": 9, "create_match": 1},
+    "mixed": {"create_candidate": 2, "create_match": 4, "create_interview": 1, "read": 5},
+}
+
+READ_PATHS = ["/jobs/read", "/candidates/read", "/matches/read", "/interviews/read"]
+
+
+def percentile(samples, pct):
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+class LoopLagMonitor:
+    """Measures how late a periodic timer fires; large values mean something is blocking the event loop."""
+
+    def __init__(self, interval: float = 0.01):
+        self.interval = interval
+        self.samples = []
+        self._task = None
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            self.samples.append(max(0.0, loop.time() - expected))
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+
+
+class Session:
+    def __init__(self, client, token, rng):
+        self.client = client
+        self.headers = {"Authorization": f"Bearer {token}"}
+        self.rng = rng
+        self.job_ids = []
+        self.candidate_ids = []
+        self.resume_no = 0
+
+    async def create_job(self):
+        raw = f"Senior backend engineer #{self.rng.randrange(10**6)} - Python, FastAPI, PostgreSQL."
+        response = await self.client.post("/jobs/create", json={"raw_text": raw}, headers=self.headers)
+        if response.status_code == 200:
+            self.job_ids.append(response.json()["id"])
+        return response
+
+    async def create_candidate(self):
+        from loadtest.fakes import resume_pdf
+
+        self.resume_no += 1
+        pdf = resume_pdf(self.rng.randrange(10**6), pages=self.rng.choice([1, 1, 2, 3]))
+        files = {"file": (f"resume_{self.resume_no}.pdf", pdf, "application/pdf")}
+        response = await self.client.post("/candidates/create", files=files, headers=self.headers)
+        if response.status_code == 200:
+            self.candidate_ids.append(response.json()["id"])
+        return response
+
+    async def create_match(self):
+        body = {"job_id": self.rng.choice(self.job_ids), "candidate_id": self.rng.choice(self.candidate_ids)}
+        return await self.client.post("/matches/create", json=body, headers=self.headers)
+
+    async def create_interview(self):
+        when = datetime.now(timezone.utc) + timedelta(days=self.rng.randrange(1, 60), hours=self.rng.randrange(24))
+        body = {
+            "job_id": self.rng.choice(self.job_ids),
+            "candidate_id": self.rng.choice(self.candidate_ids),
+            "interview_datetime": when.isoformat(),
+            "interview_format": self.rng.choice(["online", "onsite"]),
+        }
+        return await self.client.post("/interviews/create", json=body, headers=self.headers)
+
+    async def read(self):
+        return await self.client.get(self.rng.choice(READ_PATHS), headers=self.headers)
+
+
+async def login(client, email):
+    creds = {"email": email, "password": "loadtest-password"}
+    await client.post("/auth/register", json=creds)
+    response = await client.post("/auth/login", json=creds)
+    response.raise_for_status()
+    return response.json()["access_token"]
+
+
+async def run_scenario(client, name, users, total_requests, seed):
+    weights = SCENARIOS[name]
+    ops, op_weights = list(weights), list(weights.values())
+    latencies = defaultdict(list)
+    statuses = defaultdict(lambda: defaultdict(int))
+    remaining = [total_requests]
+
+    sessions = []
+    for i in range(users):
+        token = await login(client, f"loadtest-{name}-{i}@example.com")
+        session = Session(client, token, random.Random(seed + i))
+        # each recruiter starts with a few jobs and candidates so matches have something to pair
+        for _ in range(2):
+            await session.create_job()
+            await session.create_candidate()
+        sessions.append(session)
+
+    async def user_loop(session):
+        while remaining[0] > 0:
+            remaining[0] -= 1
+            op = session.rng.choices(ops, op_weights)[0]
+            started = time.perf_counter()
+            response = await getattr(session, op)()
+            latencies[op].append(time.perf_counter() - started)
+            statuses[op][response.status_code] += 1
+
+    monitor = LoopLagMonitor()
+    monitor.start()
+    started = time.perf_counter()
+    await asyncio.gather(*(user_loop(s) for s in sessions))
+    elapsed = time.perf_counter() - started
+    await monitor.stop()
+
+    all_latencies = [x for samples in latencies.values() for x in samples]
+    return {
+        "scenario": name,
+        "users": users,
+        "requests": len(all_latencies),
+        "elapsed_s": round(elapsed, 3),
+        "throughput_rps": round(len(all_latencies) / elapsed, 2) if elapsed else 0.0,
+        "latency_ms": {
+            op: {
+                "count": len(samples),
+                "p50": round(percentile(samples, 50) * 1000, 1),
+                "p95": round(percentile(samples, 95) * 1000, 1),
+                "p99": round(percentile(samples, 99) * 1000, 1),
+                "statuses": dict(statuses[op]),
+            }
+            for op, samples in sorted(latencies.items())
+        },
+        "overall_ms": {
+            "p50": round(percentile(all_latencies, 50) * 1000, 1),
+            "p95": round(percentile(all_latencies, 95) * 1000, 1),
+            "p99": round(percentile(all_latencies, 99) * 1000, 1),
+        },
+        "loop_lag_ms": {
+            "mean": round(statistics.fmean(monitor.samples) * 1000, 2) if monitor.samples else 0.0,
+            "p99": round(percentile(monitor.samples, 99) * 1000, 2),
+            "max": round(max(monitor.samples, default=0.0) * 1000, 2),
+        },
+    }
+
+
+def print_report(report):
+    print(f"\n== {report['scenario']}: {report['requests']} requests, {report['users']} users, "
+          f"{report['elapsed_s']}s, {report['throughput_rps']} req/s")
+    print(f"   {'operation':<18}{'count':>7}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}  statuses")
+    for op, row in report["latency_ms"].items():
+        print(f"   {op:<18}{row['count']:>7}{row['p50']:>10}{row['p95']:>10}{row['p99']:>10}  {row['statuses']}")
+    overall = report["overall_ms"]
+    print(f"   {'overall':<18}{report['requests']:>7}{overall['p50']:>10}{overall['p95']:>10}{overall['p99']:>10}")
+    lag = report["loop_lag_ms"]
+    print(f"   event loop lag: mean {lag['mean']} ms, p99 {lag['p99']} ms, max {lag['max']} ms")
+
+
+async def main(args):
+    # configure the app before anything under app/ is imported
+    db_path = os.path.join(tempfile.mkdtemp(prefix="aptivhire-loadtest-"), "loadtest.db")
+    os.environ["DATABASE_URL"] = args.database_url or f"sqlite:///{db_path}"
+    os.environ.setdefault("SECRET_KEY", "loadtest-secret")
+    os.environ.setdefault("GROQ_API_KEY", "loadtest-not-used")
+    os.environ["RATE_LIMIT_BACKEND"] = "off"
+    os.environ["DB_ECHO"] = "false"
+
+    from loadtest import fakes
+
+    latency = fakes.Latency(args.latency, args.jitter, args.seed)
+    mailer = fakes.FakeMailer(fakes.Latency(args.email_latency, 0.0, args.seed))
+    mailer.install()
+
+    import httpx
+    from app.agents.cv_agent import cv_agent
+    from app.agents.jd_agent import jd_agent
+    from app.agents.matcher import matcher_agent, packed_matcher_agent
+    from app.agents.scheduler import interview_email_agent
+    from app.db import init_db
+    from app.main import app
+
+    init_db()
+
+    reports = []
+    transport = httpx.ASGITransport(app=app)
+    with cv_agent.override(model=fakes.cv_model(latency)), \
+            jd_agent.override(model=fakes.jd_model(latency)), \
+            matcher_agent.override(model=fakes.matcher_model(latency)), \
+            packed_matcher_agent.override(model=fakes.packed_matcher_model(latency)), \
+            interview_email_agent.override(model=fakes.email_model(latency)):
+        async with httpx.AsyncClient(transport=transport, base_url="http://loadtest", timeout=None) as client:
+            for name in args.scenario:
+                report = await run_scenario(client, name, args.users, args.requests, args.seed)
+                print_report(report)
+                reports.append(report)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(reports, f, indent=2)
+        print(f"\nwrote {args.json}")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenario", nargs="+", choices=sorted(SCENARIOS), default=sorted(SCENARIOS))
+    parser.add_argument("--users", type=int, default=10, help="concurrent simulated recruiters")
+    parser.add_argument("--requests", type=int, default=200, help="requests per scenario")
+    parser.add_argument("--latency", type=float, default=0.5, help="mean injected LLM latency in seconds")
+    parser.add_argument("--jitter", type=float, default=0.2, help="spread of the injected LLM latency")
+    parser.add_argument("--email-latency", type=float, default=0.1, help="fake email send latency in seconds")
+    parser.add_argument("--database-url", help="e.g. postgresql+psycopg2://localhost/aptivhire_loadtest")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--json", help="also write the reports to this file")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    asyncio.run(main(parse_args(sys.argv[1:])))
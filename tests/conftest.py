@@ -0,0 +1,80 @@
+"""Test settings: a throwaway SQLite file and blob store, no rate limiter or tracing, and no real LLM or mail calls."""
+import asyncio
+import os
+import tempfile
+from contextlib import ExitStack
+
+import pytest
+
+_tmp = tempfile.mkdtemp(prefix="aptivhire-tests-")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{_tmp}/test.db")
+os.environ.setdefault("BLOB_STORE_DIR", f"{_tmp}/blobs")
+os.environ.setdefault("SECRET_KEY", "test")
+os.environ.setdefault("GROQ_API_KEY", "test")
+os.environ.setdefault("RATE_LIMIT_BACKEND", "off")
+os.environ.setdefault("DB_ECHO", "false")
+os.environ.setdefault("TRACING", "off")
+
+from loadtest import fakes  # noqa: E402
+
+# the real gmail_helper loads credentials at import, so this must run before app.main is imported
+mailer = fakes.FakeMailer(fakes.Latency(0, 0))
+mailer.install()
+
+
+@pytest.fixture
+def db():
+    """A fresh schema per test; yields a session on it."""
+    from app import cache, scheduling
+    from app.db import Base, SessionLocal, engine, init_db
+
+    Base.metadata.drop_all(bind=engine)
+    init_db()
+    cache.cache.clear()
+    scheduling._calendars.clear()
+    scheduling._holds.clear()
+    mailer.sent.clear()
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture
+def api(db):
+    """``api(scenario)`` runs ``await scenario(client)`` against the app with the fake models."""
+    import httpx
+
+    from app.agents.cv_agent import cv_agent
+    from app.agents.jd_agent import jd_agent
+    from app.agents.matcher import matcher_agent, packed_matcher_agent
+    from app.agents.scheduler import interview_email_agent
+    from app.main import app
+
+    latency = fakes.Latency(0, 0)
+
+    def run(scenario):
+        async def main():
+            with ExitStack() as stack:
+                stack.enter_context(cv_agent.override(model=fakes.cv_model(latency)))
+                stack.enter_context(jd_agent.override(model=fakes.jd_model(latency)))
+                stack.enter_context(matcher_agent.override(model=fakes.matcher_model(latency)))
+                stack.enter_context(packed_matcher_agent.override(model=fakes.packed_matcher_model(latency)))
+                stack.enter_context(interview_email_agent.override(model=fakes.email_model(latency)))
+                transport = httpx.ASGITransport(app=app)
+                async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                    return await scenario(client)
+
+        return asyncio.run(main())
+
+    return run
+
+
+async def login(client, email: str = "recruiter@example.com") -> dict:
+    """Registers ``email`` and returns the auth headers for it."""
+    creds = {"email": email, "password": "test-password"}
+    await client.post("/auth/register", json=creds)
+    response = await client.post("/auth/login", json=creds)
+    response.raise_for_status()
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
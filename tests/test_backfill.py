@@ -0,0 +1,123 @@
+import asyncio
+
+from app import backfill, cache, extraction, models
+
+
+def _seed(db, count=3):
+    user = models.User(email="recruiter@example.com", hashed_password="x")
+    db.add(user)
+    db.flush()
+    candidates = [models.Candidate(user_id=user.id, name=f"Candidate {n}", email=f"c{n}@example.com", skills="sql")
+                  for n in range(count)]
+    db.add_all(candidates)
+    db.flush()
+    db.add_all([models.ResumeDocument(user_id=user.id, candidate_id=candidate.id, sha256=f"{n:064d}",
+                                      filename="cv.pdf", size_bytes=1, raw_text=f"Resume {n}")
+                for n, candidate in enumerate(candidates)])
+    db.commit()
+    return [candidate.id for candidate in candidates]
+
+
+def _run(**kwargs):
+    return asyncio.run(backfill.run_backfill("candidates", "test", batch_size=10, **kwargs))
+
+
+def test_empty_fields_keep_stored_values_and_failures_are_kept(db, monkeypatch):
+    ids = _seed(db)
+
+    async def extract_cv(prepared):
+        if "Resume 1" in prepared.raw_text:
+            raise RuntimeError("agent down")
+        return {"name": None, "email": None, "skills": "python"}
+
+    monkeypatch.setattr(extraction, "extract_cv", extract_cv)
+    checkpoint = _run()
+
+    assert (checkpoint.processed, checkpoint.errors) == (3, 1)
+    rows = {row.id: row for row in db.query(models.Candidate)}
+    assert (rows[ids[0]].name, rows[ids[0]].email, rows[ids[0]].skills) == ("Candidate 0", "c0@example.com", "python")
+    assert rows[ids[1]].skills == "sql"
+    assert backfill.failed_row_ids(checkpoint.id) == [ids[1]]
+
+
+def test_rejected_row_does_not_abort_the_batch(db, monkeypatch):
+    ids = _seed(db)
+
+    async def rescore_row(target, row):
+        # NOT NULL violation for one row: the bulk UPDATE fails and the batch is written row by row
+        return {"id": row.id, "email": None if row.id == ids[2] else "new@example.com"}
+
+    monkeypatch.setattr(backfill, "rescore_row", rescore_row)
+    checkpoint = _run()
+
+    assert checkpoint.errors == 1 and checkpoint.finished_at is not None
+    assert [email for email, in db.query(models.Candidate.email).order_by(models.Candidate.id)] == [
+        "new@example.com", "new@example.com", "c2@example.com"]
+    assert backfill.failed_row_ids(checkpoint.id) == [ids[2]]
+
+
+def test_retry_failed_reruns_only_the_failed_rows(db, monkeypatch):
+    ids = _seed(db)
+    seen = []
+
+    async def extract_cv(prepared):
+        seen.append(prepared.raw_text)
+        if "Resume 0" in prepared.raw_text and len(seen) <= 3:
+            raise RuntimeError("agent down")
+        return {"skills": "go"}
+
+    monkeypatch.setattr(extraction, "extract_cv", extract_cv)
+    checkpoint = _run()
+    assert backfill.failed_row_ids(checkpoint.id) == [ids[0]]
+
+    _run(retry_failed=True)
+    assert len(seen) == 4 and "Resume 0" in seen[-1]
+    assert backfill.failed_row_ids(checkpoint.id) == []
+    assert db.query(models.Candidate).filter_by(id=ids[0]).one().skills == "go"
+
+
+def _add_matches(db, ids, is_stale=False):
+    job = models.Job(user_id=1, title="Backend Engineer")
+    db.add(job)
+    db.flush()
+    db.add_all([models.Match(user_id=1, job_id=job.id, job_title=job.title, candidate_id=candidate_id,
+                             candidate_name=f"Candidate {n}", match_score=-1, reasoning="old", is_stale=is_stale)
+                for n, candidate_id in enumerate(ids)])
+    db.commit()
+
+
+def test_reextracted_candidates_follow_the_edit_rules(db, monkeypatch):
+    ids = _seed(db, count=3)
+    _add_matches(db, ids)
+    generation = cache.user_generation(1)
+
+    async def extract_cv(prepared):
+        # candidate 0 gets new skills, candidate 1 a new name, candidate 2 comes back unchanged
+        if "Resume 0" in prepared.raw_text:
+            return {"skills": "python"}
+        if "Resume 1" in prepared.raw_text:
+            return {"name": "Renamed"}
+        return {"skills": "sql"}
+
+    monkeypatch.setattr(extraction, "extract_cv", extract_cv)
+    _run()
+
+    matches = {match.candidate_id: match for match in db.query(models.Match)}
+    assert [matches[candidate_id].is_stale for candidate_id in ids] == [True, False, False]
+    assert matches[ids[1]].candidate_name == "Renamed"
+    assert cache.user_generation(1) > generation
+
+
+def test_matches_are_rescored(db):
+    from app.agents.matcher import matcher_agent
+    from loadtest import fakes
+
+    _add_matches(db, _seed(db, count=2), is_stale=True)
+    generation = cache.user_generation(1)
+
+    with matcher_agent.override(model=fakes.matcher_model(fakes.Latency(0, 0))):
+        checkpoint = asyncio.run(backfill.run_backfill("matches", "test-matches", batch_size=10))
+
+    assert checkpoint.errors == 0
+    assert all(score >= 0 and not is_stale for score, is_stale in db.query(models.Match.match_score, models.Match.is_stale))
+    assert cache.user_generation(1) > generation
@@ -0,0 +1,21 @@
+from app import cache
+
+
+def test_ttl_is_capped_only_with_several_workers(monkeypatch):
+    monkeypatch.setattr(cache, "cache", cache.TTLCache(ttl=60))
+
+    assert not cache.limit_ttl_for_workers(1)
+    assert cache.cache.ttl == 60
+
+    assert cache.limit_ttl_for_workers(4)
+    assert cache.cache.ttl == cache.CACHE_MULTI_WORKER_TTL_SECONDS
+
+
+def test_shared_cache_keeps_its_ttl(monkeypatch):
+    class Shared:
+        ttl = 60
+
+    monkeypatch.setattr(cache, "cache", Shared())
+
+    assert not cache.limit_ttl_for_workers(4)
+    assert cache.cache.ttl == 60
@@ -0,0 +1,52 @@
+from app import models
+from app.utils.blob_store import blob_key, blob_store
+from loadtest import fakes
+from tests.conftest import login
+
+
+def _upload(api):
+    async def scenario(client):
+        headers = await login(client)
+        files = {"file": ("resume.pdf", fakes.resume_pdf(7), "application/pdf")}
+        return await client.post("/candidates/create", files=files, headers=headers)
+
+    return api(scenario)
+
+
+def test_candidate_is_stored_with_its_resume(api, db):
+    response = _upload(api)
+
+    assert response.status_code == 200
+    document = db.query(models.ResumeDocument).one()
+    assert document.candidate_id == response.json()["id"]
+    assert blob_store.local_path(blob_key(document.sha256)).exists()
+
+
+def test_failed_upload_stores_nothing(api, db, monkeypatch):
+    def put_file(path, key):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(blob_store, "put_file", put_file)
+    response = _upload(api)
+
+    assert response.status_code == 503
+    assert db.query(models.Candidate).count() == 0
+    assert db.query(models.ResumeDocument).count() == 0
+
+
+def test_concurrent_puts_of_one_resume_both_succeed(tmp_path):
+    from concurrent.futures import ThreadPoolExecutor
+
+    from app.utils.blob_store import LocalBlobStore
+
+    store = LocalBlobStore(str(tmp_path / "blobs"))
+    source = tmp_path / "resume.pdf"
+    source.write_bytes(b"%PDF" + b"x" * 4_000_000)
+    key = blob_key("ab" * 32)
+
+    with ThreadPoolExecutor(8) as pool:
+        for future in [pool.submit(store.put_file, str(source), key) for _ in range(8)]:
+            future.result()
+
+    assert store.local_path(key).read_bytes() == source.read_bytes()
+    assert list(store.local_path(key).parent.iterdir()) == [store.local_path(key)]
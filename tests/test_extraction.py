@@ -0,0 +1,75 @@
+import pytest
+
+from app.extraction import FIRST, LIST, TEXT, chunk_blocks, merge_outputs, split_block, text_blocks
+from app.schemas import candidate_schema
+
+
+def _words(text: str) -> list[str]:
+    return text.split()
+
+
+def test_text_blocks_keep_a_heading_with_its_paragraph():
+    text = "Experience\n\nBackend developer at Acme.\nBuilt APIs.\n\nSummary\n\nSkills\n\nPython daily.\nDocker."
+
+    # a heading followed by another heading stays on its own
+    assert text_blocks(text) == ["Experience\nBackend developer at Acme.\nBuilt APIs.", "Summary",
+                                 "Skills\nPython daily.\nDocker."]
+
+
+def test_short_block_is_not_split():
+    assert split_block("Skills\nPython, SQL", 100) == ["Skills\nPython, SQL"]
+
+
+def test_split_block_repeats_the_heading_within_the_limit():
+    lines = [f"Worked on project {n} for client {n}. Shipped it on time." for n in range(40)]
+    block = "Experience\n" + "\n".join(lines)
+
+    pieces = split_block(block, 200)
+
+    assert len(pieces) > 1
+    assert all(len(piece) <= 200 and piece.startswith("Experience\n") for piece in pieces)
+    assert [word for piece in pieces for word in _words(piece.partition("\n")[2])] == _words("\n".join(lines))
+
+
+@pytest.mark.parametrize("block", [
+    "one sentence " * 100,                 # no line breaks: cut between sentences, then words
+    "x" * 950,                             # no spaces at all: cut at the limit
+])
+def test_split_block_cuts_long_lines(block):
+    pieces = split_block(block, 100)
+
+    assert all(len(piece) <= 100 for piece in pieces)
+    assert "".join(_words("".join(pieces))) == "".join(_words(block))
+
+
+def test_chunk_blocks_pack_in_order_within_the_limit():
+    blocks = [f"Section {n}\n" + "detail " * (n * 10) for n in range(1, 12)]
+
+    chunks = chunk_blocks(blocks, 300)
+
+    # small blocks share a chunk, large ones are split
+    assert len(chunks) < sum(len(split_block(block, 300)) for block in blocks)
+    assert all(len(chunk) <= 300 for chunk in chunks)
+    assert chunks[0].startswith("Section 1\n") and "Section 2\n" in chunks[0]
+    assert _words(" ".join(chunks)).count("detail") == sum(n * 10 for n in range(1, 12))
+
+
+def _cv(**fields):
+    return candidate_schema.CVOutput(**{"name": None, "email": None, **fields})
+
+
+def test_merge_rules():
+    outputs = [
+        _cv(name="Ada Lovelace", skills="Python, SQL", experience="Acme 2020-2023"),
+        _cv(name="Ada L.", email="ada@example.com", skills="sql; Docker\nPython", experience="Acme 2020-2023"),
+        _cv(skills="Kubernetes.", experience="Initech 2018-2020"),
+    ]
+    rules = {"name": FIRST, "email": FIRST, "phone": FIRST, "skills": LIST, "experience": TEXT}
+
+    assert merge_outputs(outputs, rules) == {
+        "name": "Ada Lovelace",
+        "email": "ada@example.com",
+        "phone": None,
+        "skills": "Python, SQL, Docker, Kubernetes",
+        "experience": "Acme 2020-2023\nInitech 2018-2020",
+    }
@@ -0,0 +1,60 @@
+import pytest
+from sqlalchemy import event
+from sqlalchemy.exc import InvalidRequestError
+
+from app import crud, models
+from app.db import engine
+from tests.conftest import login
+
+
+def _seed_jobs(db, user_id, count=2):
+    db.add_all([models.Job(user_id=user_id, title=f"Job {n}", summary=f"Summary {n}", skills="python",
+                           responsibilities="Build things. " * 50) for n in range(count)])
+    db.commit()
+
+
+def _read_jobs(api, db, *params):
+    async def scenario(client):
+        headers = await login(client)
+        _seed_jobs(db, db.query(models.User).one().id)
+        return [await client.get("/jobs/read", params={"fields": fields}, headers=headers) for fields in params]
+
+    return api(scenario)
+
+
+def test_summary_view_and_summary_column_are_distinct(api, db):
+    view, column = _read_jobs(api, db, ":summary", "summary")
+
+    assert set(view.json()[0]) == {"id", "user_id", "title"}
+    assert column.json()[0] == {"id": column.json()[0]["id"], "summary": "Summary 0"}
+
+
+@pytest.mark.parametrize("fields", ["", " , ", "title,salary"])
+def test_empty_or_unknown_fields_are_rejected(api, db, fields):
+    response, = _read_jobs(api, db, fields)
+
+    assert response.status_code == 400
+
+
+def test_only_requested_columns_are_selected(db):
+    user = models.User(email="recruiter@example.com", hashed_password="x")
+    db.add(user)
+    db.commit()
+    _seed_jobs(db, user.id)
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        jobs = crud.get_jobs(db, user_id=user.id, columns=["id", "title"])
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+    select, = [statement for statement in statements if "FROM jobs" in statement]
+    assert "responsibilities" not in select and "skills" not in select
+    assert sorted(job.title for job in jobs) == ["Job 0", "Job 1"]
+    # an unloaded column raises instead of lazy-loading row by row
+    with pytest.raises(InvalidRequestError):
+        jobs[0].responsibilities
@@ -0,0 +1,96 @@
+import asyncio
+from datetime import datetime, timezone
+
+from app import extraction, idempotency, models
+from tests.conftest import login, mailer
+
+JD = {"raw_text": "Backend Engineer. Skills: Python, SQL. 3 years of experience."}
+
+
+def _count_jd_calls(monkeypatch, delay: float = 0.0) -> list:
+    calls = []
+    extract_jd = extraction.extract_jd
+
+    async def counted(raw_text):
+        calls.append(raw_text)
+        await asyncio.sleep(delay)
+        return await extract_jd(raw_text)
+
+    monkeypatch.setattr(extraction, "extract_jd", counted)
+    return calls
+
+
+def test_repeated_key_replays_the_first_response(api, db, monkeypatch):
+    calls = _count_jd_calls(monkeypatch)
+
+    async def scenario(client):
+        headers = {**await login(client), "Idempotency-Key": "job-1"}
+        return [await client.post("/jobs/create", json=JD, headers=headers) for _ in range(2)]
+
+    first, again = api(scenario)
+    assert first.status_code == again.status_code == 200
+    assert again.json() == first.json()
+    assert again.headers["Idempotent-Replayed"] == "true" and "Idempotent-Replayed" not in first.headers
+    assert len(calls) == 1 and db.query(models.Job).count() == 1
+
+
+def test_repeated_interview_sends_one_email(api, db):
+    async def scenario(client):
+        headers = {**await login(client), "Idempotency-Key": "interview-1"}
+        user = db.query(models.User).one()
+        job = models.Job(user_id=user.id, title="Backend Engineer")
+        candidate = models.Candidate(user_id=user.id, name="Candidate", email="c@example.com")
+        db.add_all([job, candidate])
+        db.commit()
+        body = {"job_id": job.id, "candidate_id": candidate.id, "interview_format": "online",
+                "interview_datetime": datetime(2030, 1, 7, 9, tzinfo=timezone.utc).isoformat()}
+        return [await client.post("/interviews/create", json=body, headers=headers) for _ in range(2)]
+
+    first, again = api(scenario)
+    assert first.status_code == again.status_code == 200
+    assert len(mailer.sent) == 1 and db.query(models.Interview).count() == 1
+
+
+def test_key_reused_for_a_different_request_is_rejected(api, db, monkeypatch):
+    calls = _count_jd_calls(monkeypatch)
+
+    async def scenario(client):
+        headers = {**await login(client), "Idempotency-Key": "job-1"}
+        first = await client.post("/jobs/create", json=JD, headers=headers)
+        other = await client.post("/jobs/create", json={"raw_text": "Data Engineer. Skills: Spark."}, headers=headers)
+        return first, other
+
+    first, other = api(scenario)
+    assert first.status_code == 200 and other.status_code == 422
+    assert len(calls) == 1
+
+
+def test_concurrent_requests_with_one_key_run_once(api, db, monkeypatch):
+    calls = _count_jd_calls(monkeypatch, delay=0.1)
+
+    async def scenario(client):
+        headers = {**await login(client), "Idempotency-Key": "job-1"}
+        return await asyncio.gather(*(client.post("/jobs/create", json=JD, headers=headers) for _ in range(3)))
+
+    responses = api(scenario)
+    assert [response.status_code for response in responses] == [200] * 3
+    assert len({response.json()["id"] for response in responses}) == 1
+    assert sum(response.headers.get("Idempotent-Replayed") == "true" for response in responses) == 2
+    assert len(calls) == 1 and db.query(models.Job).count() == 1
+
+
+def test_request_still_running_elsewhere_times_out(api, db, monkeypatch):
+    monkeypatch.setattr(idempotency, "IDEMPOTENCY_WAIT_TIMEOUT", 0.2)
+    monkeypatch.setattr(idempotency, "POLL_INTERVAL", 0.05)
+    calls = _count_jd_calls(monkeypatch)
+
+    async def scenario(client):
+        headers = {**await login(client), "Idempotency-Key": "job-1"}
+        await client.post("/jobs/create", json=JD, headers=headers)
+        # as if another worker had claimed the key and were still running the request
+        db.query(models.IdempotencyKey).update({"status_code": None, "content_type": None, "response_body": None})
+        db.commit()
+        return await client.post("/jobs/create", json=JD, headers=headers)
+
+    assert api(scenario).status_code == 409
+    assert len(calls) == 1
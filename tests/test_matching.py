@@ -0,0 +1,138 @@
+import asyncio
+
+import pytest
+from sqlalchemy.exc import IntegrityError
+
+from app import crud, matching, models
+from app.schemas import match_schema
+
+
+def _seed(db, jobs=1, candidates=2):
+    user = models.User(email="recruiter@example.com", hashed_password="x")
+    db.add(user)
+    db.flush()
+    job_rows = [models.Job(user_id=user.id, title=f"Job {n}", skills="python") for n in range(jobs)]
+    candidate_rows = [models.Candidate(user_id=user.id, name=f"Candidate {n}", email=f"c{n}@example.com",
+                                       skills="python") for n in range(candidates)]
+    db.add_all([*job_rows, *candidate_rows])
+    db.commit()
+    return user, job_rows, candidate_rows
+
+
+def _match(user, job, candidate, score=50.0):
+    return match_schema.MatchBase(user_id=user.id, job_id=job.id, job_title=job.title, candidate_id=candidate.id,
+                                  candidate_name=candidate.name, match_score=score, reasoning="fits")
+
+
+def test_bulk_create_skips_pairs_already_matched(db):
+    user, (job,), (first, second) = _seed(db)
+    crud.create_match(db, _match(user, job, first, score=90))
+
+    created = crud.bulk_create_matches(db, [_match(user, job, first), _match(user, job, second)])
+
+    assert [match.candidate_id for match in created] == [second.id]
+    assert db.query(models.Match).filter_by(candidate_id=first.id).one().match_score == 90
+
+
+def test_create_match_returns_the_stored_pair(db):
+    user, (job,), (candidate, _) = _seed(db)
+    stored, = crud.bulk_create_matches(db, [_match(user, job, candidate, score=70)])
+
+    again = crud.create_match(db, _match(user, job, candidate, score=10))
+
+    assert again.id == stored.id and again.match_score == 70
+    assert db.query(models.Match).count() == 1
+
+
+def test_create_match_raises_integrity_errors_other_than_the_pair(db):
+    user, (job,), (candidate, _) = _seed(db)
+    # reasoning is NOT NULL; SQLite does not enforce the foreign keys a deleted job would break
+    broken = _match(user, job, candidate).model_copy(update={"reasoning": None})
+
+    with pytest.raises(IntegrityError):
+        crud.create_match(db, broken)
+    assert db.query(models.Match).count() == 0
+
+
+def test_auto_match_skips_pairs_matched_meanwhile(db, monkeypatch):
+    user, jobs, (candidate, _) = _seed(db, jobs=2)
+
+    async def score(job, candidate):
+        # a /matches/create request stores the first job's match while the matcher runs
+        if job.id == jobs[0].id:
+            crud.create_match(db, _match(user, jobs[0], candidate, score=90))
+        return {"match_score": 40.0, "reasoning": "fits"}
+
+    monkeypatch.setattr(matching, "score", score)
+    result = asyncio.run(matching.auto_match(user.id, candidate.id))
+
+    assert result["matched"] == 1
+    assert db.query(models.Match).filter_by(candidate_id=candidate.id).count() == 2
+
+
+def test_rescored_scores_are_only_written_to_the_recruiters_matches(db):
+    user, (job,), (candidate, _) = _seed(db)
+    stored, = crud.bulk_create_matches(db, [_match(user, job, candidate, score=70)])
+    score = {"id": stored.id, "match_score": 10.0, "reasoning": "rescored"}
+
+    crud.update_match_scores(db, user_id=user.id + 1, scores=[score])
+    assert db.query(models.Match).one().match_score == 70
+
+    crud.update_match_scores(db, user_id=user.id, scores=[score])
+    db.expire_all()
+    assert db.query(models.Match).one().match_score == 10
+
+
+def test_auto_match_holds_no_connection_while_scoring(db, monkeypatch):
+    from app.db import engine
+
+    user, jobs, (candidate, _) = _seed(db, jobs=3)
+    checked_out = []
+
+    async def score(job, candidate):
+        checked_out.append(engine.pool.checkedout())
+        await asyncio.sleep(0)
+        return {"match_score": 40.0, "reasoning": "fits"}
+
+    monkeypatch.setattr(matching, "score", score)
+    user_id, candidate_id = user.id, candidate.id
+    db.close()
+    result = asyncio.run(matching.auto_match(user_id, candidate_id))
+
+    assert result["matched"] == 3
+    assert checked_out == [0, 0, 0]
+
+
+def test_packed_items_missing_or_invalid_are_scored_alone(db, monkeypatch):
+    from pydantic_ai.messages import ModelResponse, ToolCallPart
+    from pydantic_ai.models.function import FunctionModel
+
+    from app.agents.matcher import packed_matcher_agent
+    from app.schemas import candidate_schema, job_schema
+
+    _, (job,), rows = _seed(db, candidates=4)
+    candidates = [candidate_schema.Candidate.model_validate(row) for row in rows]
+    ids = [candidate.id for candidate in candidates]
+    packed_calls, single_calls = [], []
+
+    async def packed(messages, info):
+        packed_calls.append(messages)
+        # ids[1] is left out, ids[2] gets an out-of-range score; an unknown id is ignored
+        items = [{"candidate_id": ids[0], "match_score": 80, "reasoning": "fits"},
+                 {"candidate_id": ids[2], "match_score": 250, "reasoning": "fits"},
+                 {"candidate_id": ids[3], "match_score": 60, "reasoning": "fits"},
+                 {"candidate_id": 999, "match_score": 10, "reasoning": "fits"}]
+        return ModelResponse(parts=[ToolCallPart(tool_name=info.output_tools[0].name, args={"matches": items})])
+
+    async def score(job, candidate):
+        single_calls.append(candidate.id)
+        return {"match_score": 40, "reasoning": "alone"}
+
+    monkeypatch.setattr(matching, "score", score)
+    with packed_matcher_agent.override(model=FunctionModel(packed)):
+        results = asyncio.run(matching.score_many(job_schema.Job.model_validate(job), candidates, pack_size=4))
+
+    assert len(packed_calls) == 1
+    assert sorted(single_calls) == [ids[1], ids[2]]
+    assert {candidate_id: values["match_score"] for candidate_id, values in results.items()} == {
+        ids[0]: 80, ids[1]: 40, ids[2]: 40, ids[3]: 60}
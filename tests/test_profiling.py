@@ -0,0 +1,70 @@
+import asyncio
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from app import profiling
+
+TOKEN = "profile-token"
+
+
+@pytest.fixture
+def profiled_app(tmp_path, monkeypatch):
+    """A small app with PROFILING=on, a sync and an async endpoint; profiles go to ``tmp_path``."""
+    monkeypatch.setattr(profiling, "PROFILING_ENABLED", True)
+    monkeypatch.setattr(profiling, "PROFILER", "cprofile")
+    monkeypatch.setattr(profiling, "PROFILE_TOKEN", TOKEN)
+    monkeypatch.setattr(profiling, "PROFILE_DIR", tmp_path)
+    monkeypatch.setattr(profiling, "PROFILE_KEEP", 3)
+    app = FastAPI()
+
+    @app.get("/sync")
+    def read_sync():
+        return {"total": sum(range(10_000))}
+
+    @app.get("/async")
+    async def read_async():
+        return {"ok": True}
+
+    profiling.install(app)
+    return app
+
+
+def call(app, *requests):
+    async def main():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            responses = [await client.get(path, headers=headers) for path, headers in requests]
+            await asyncio.gather(*profiling._pending)
+            return responses
+
+    return asyncio.run(main())
+
+
+def test_profiled_sync_endpoint_includes_its_thread(profiled_app):
+    # on Python >= 3.12 the thread profiler cannot start next to the loop's one
+    response, = call(profiled_app, ("/sync", {"X-Profile": TOKEN}))
+
+    assert response.status_code == 200
+    profile_id = response.headers["X-Profile-Id"]
+    listed, = call(profiled_app, ("/admin/profiles", {"X-Profile-Token": TOKEN}))
+    assert [profile["id"] for profile in listed.json()] == [profile_id]
+    assert b"read_sync" in (profiling.PROFILE_DIR / f"{profile_id}.html").read_bytes()
+
+
+def test_only_the_newest_profiles_are_kept(profiled_app):
+    responses = call(profiled_app, *[("/async", {"X-Profile": TOKEN})] * 5)
+    listed, = call(profiled_app, ("/admin/profiles", {"X-Profile-Token": TOKEN}))
+
+    kept = [response.headers["X-Profile-Id"] for response in responses][-3:]
+    assert [profile["id"] for profile in listed.json()] == kept[::-1]
+    assert len(list(profiling.PROFILE_DIR.glob("*.json"))) == 3
+
+
+def test_unprofiled_requests_and_admin_without_token(profiled_app):
+    plain, wrong, admin = call(profiled_app, ("/async", {}), ("/async", {"X-Profile": "nope"}),
+                               ("/admin/profiles", {}))
+
+    assert "X-Profile-Id" not in plain.headers and "X-Profile-Id" not in wrong.headers
+    assert admin.status_code == 403
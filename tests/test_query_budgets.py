@@ -0,0 +1,81 @@
+"""Every route in ROUTE_BUDGETS, run against fake models under ``count_queries`` with its budget."""
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app import cache, query_counter, scheduling
+from app.db import engine
+from loadtest import fakes
+from tests.conftest import login
+
+MONDAY = datetime(2030, 1, 7, 9, 0, tzinfo=timezone.utc)
+CREDS = {"email": "recruiter@example.com", "password": "test-password"}
+
+
+def _resume(n: int):
+    return {"file": (f"resume_{n}.pdf", fakes.resume_pdf(n), "application/pdf")}
+
+
+def _interview(job_id: int, candidate_id: int, when: datetime) -> dict:
+    return {"job_id": job_id, "candidate_id": candidate_id, "interview_datetime": when.isoformat(),
+            "interview_format": "online"}
+
+
+# route -> (method, path, request kwargs), filled in from the ids created by _setup
+REQUESTS = {
+    "POST /auth/register": lambda s: ("POST", "/auth/register", {"json": {**CREDS, "email": "new@example.com"}}),
+    "POST /auth/login": lambda s: ("POST", "/auth/login", {"json": CREDS}),
+    "POST /jobs/create": lambda s: ("POST", "/jobs/create", {"json": {"raw_text": "Data engineer - Python, Spark."}}),
+    "GET /jobs/read": lambda s: ("GET", "/jobs/read", {}),
+    "GET /jobs/{job_id}": lambda s: ("GET", f"/jobs/{s['job']}", {}),
+    "POST /candidates/create": lambda s: ("POST", "/candidates/create", {"files": _resume(99)}),
+    "GET /candidates/read": lambda s: ("GET", "/candidates/read", {}),
+    "GET /candidates/{candidate_id}": lambda s: ("GET", f"/candidates/{s['matched']}", {}),
+    "GET /candidates/{candidate_id}/resume": lambda s: ("GET", f"/candidates/{s['matched']}/resume", {}),
+    "POST /matches/create": lambda s: ("POST", "/matches/create", {"json": {"job_id": s["job"], "candidate_id": s["free"][0]}}),
+    "POST /matches/batch": lambda s: ("POST", "/matches/batch", {"json": {"job_id": s["job"], "candidate_ids": s["free"]}}),
+    "GET /matches/read": lambda s: ("GET", "/matches/read", {}),
+    "GET /matches/{job_id}/{candidate_id}": lambda s: ("GET", f"/matches/{s['job']}/{s['matched']}", {}),
+    "POST /interviews/create": lambda s: ("POST", "/interviews/create", {"json": _interview(s["job"], s["free"][0], MONDAY + timedelta(hours=3))}),
+    "GET /interviews/slots": lambda s: ("GET", "/interviews/slots", {"params": {"start": MONDAY.isoformat()}}),
+    "GET /interviews/read": lambda s: ("GET", "/interviews/read", {}),
+    "GET /interviews/{job_id}/{candidate_id}": lambda s: ("GET", f"/interviews/{s['job']}/{s['matched']}", {}),
+    "GET /analytics/summary": lambda s: ("GET", "/analytics/summary", {}),
+}
+
+
+async def _setup(client) -> tuple[dict, dict]:
+    """A job, three candidates, a match and an interview for the first one."""
+    headers = await login(client, CREDS["email"])
+    job = await client.post("/jobs/create", json={"raw_text": "Backend engineer - Python, FastAPI."}, headers=headers)
+    candidates = [(await client.post("/candidates/create", files=_resume(n), headers=headers)).json()["id"]
+                  for n in range(3)]
+    ids = {"job": job.json()["id"], "matched": candidates[0], "free": candidates[1:]}
+    (await client.post("/matches/create", json={"job_id": ids["job"], "candidate_id": ids["matched"]},
+                       headers=headers)).raise_for_status()
+    (await client.post("/interviews/create", json=_interview(ids["job"], ids["matched"], MONDAY),
+                       headers=headers)).raise_for_status()
+    return headers, ids
+
+
+def test_every_budgeted_route_is_covered():
+    assert set(REQUESTS) == set(query_counter.ROUTE_BUDGETS)
+
+
+@pytest.mark.parametrize("route", sorted(query_counter.ROUTE_BUDGETS))
+def test_route_stays_within_budget(api, route):
+    query_counter.install_listener(engine)
+
+    async def scenario(client):
+        headers, ids = await _setup(client)
+        method, path, kwargs = REQUESTS[route](ids)
+        # budgets hold for a cold worker: no cached reads, calendars loaded from the database
+        cache.cache.clear()
+        scheduling._calendars.clear()
+        with query_counter.count_queries(budget=query_counter.ROUTE_BUDGETS[route]) as counter:
+            response = await client.request(method, path, headers=headers, **kwargs)
+        return response, counter
+
+    response, counter = api(scenario)
+    assert response.status_code < 400, response.text
+    assert counter.count > 0
@@ -0,0 +1,98 @@
+import asyncio
+
+import pytest
+
+from app.agents import rate_limiter
+from app.agents.config import ModelLimits
+from app.agents.rate_limiter import MemoryBucketBackend, RateLimiter, RateLimitQueueFull, SQLiteBucketBackend
+
+
+@pytest.fixture
+def now(monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr(rate_limiter.time, "time", lambda: clock[0])
+    return clock
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def backend(request, tmp_path):
+    if request.param == "memory":
+        return MemoryBucketBackend()
+    return SQLiteBucketBackend(str(tmp_path / "buckets.db"))
+
+
+def test_failed_take_takes_nothing(backend, now):
+    # the second bucket is short, so neither is charged
+    assert backend.take([("a", 10, 1, 5), ("b", 1, 1, 2)]) > 0
+    assert backend.take([("a", 10, 1, 10)]) == 0
+    assert backend.take([("b", 1, 1, 1)]) == 0
+
+
+def test_wait_is_the_time_to_refill_the_shortfall(backend, now):
+    assert backend.take([("a", 10, 2, 10)]) == 0
+    assert backend.take([("a", 10, 2, 4), ("b", 10, 1, 1)]) == pytest.approx(2)
+
+    now[0] += 2
+    assert backend.take([("a", 10, 2, 4)]) == 0
+
+
+def test_debit_can_go_negative_and_credits_stop_at_capacity(backend, now):
+    backend.take([("a", 10, 1, 10)])
+    backend.debit("a", 10, 1, 5)
+    assert backend.take([("a", 10, 1, 1)]) == pytest.approx(6)
+
+    backend.debit("a", 10, 1, -100)
+    assert backend.take([("a", 10, 1, 11)]) > 0
+    assert backend.take([("a", 10, 1, 10)]) == 0
+
+
+def test_unused_reservation_is_credited_back(now):
+    limiter = RateLimiter(MemoryBucketBackend(), {"m": ModelLimits(rpm=60, tpm=1000)})
+
+    async def call(estimated, actual):
+        async with limiter.limit("m", estimated):
+            pass
+        await limiter.record_usage("m", estimated, actual)
+
+    asyncio.run(call(1000, 100))
+    # 900 of the 1000 reserved tokens came back
+    assert limiter.backend.take([("m:tpm", 1000, 1000 / 60, 900)]) == 0
+
+
+def test_full_queue_is_refused():
+    limiter = RateLimiter(MemoryBucketBackend(), {"m": ModelLimits(rpm=600, tpm=10**6, concurrency=1, max_queue=1)})
+
+    async def main():
+        entered, release = asyncio.Event(), asyncio.Event()
+
+        async def hold():
+            async with limiter.limit("m", 10):
+                entered.set()
+                await release.wait()
+
+        holder = asyncio.create_task(hold())
+        await entered.wait()
+        queued = asyncio.create_task(hold())
+        while not limiter._waiting.get("m"):
+            await asyncio.sleep(0)
+        with pytest.raises(RateLimitQueueFull):
+            async with limiter.limit("m", 10):
+                pass
+        release.set()
+        await asyncio.gather(holder, queued)
+
+    asyncio.run(main())
+
+
+def test_wait_beyond_max_wait_is_refused():
+    limiter = RateLimiter(MemoryBucketBackend(), {"m": ModelLimits(rpm=1, tpm=10**6, max_wait=1)})
+
+    async def call():
+        async with limiter.limit("m", 10):
+            pass
+
+    asyncio.run(call())
+    # the next request is a minute away
+    with pytest.raises(RateLimitQueueFull):
+        asyncio.run(call())
+    assert limiter._waiting["m"] == 0
@@ -0,0 +1,76 @@
+import fitz
+import pytest
+
+from app.utils.resume_parser import find_contact, prepare_resume
+
+
+@pytest.mark.parametrize("text, phone", [
+    ("+1 415 555 0100", "+1 415 555 0100"),
+    ("Phone: 555-0100", "555-0100"),
+    ("mobile: 98765 43210", "98765 43210"),
+    ("(415) 555-0100", "(415) 555-0100"),
+    ("Tel 01.23.45.67.89", "01.23.45.67.89"),
+    ("Worked 01.2019 - 06.2023 at Acme, +1 415 555 0100", "+1 415 555 0100"),
+    ("ISBN: 978-3-16-148410-0 | Phone: +91 98765 43210", "+91 98765 43210"),
+])
+def test_find_contact_phone(text, phone):
+    assert find_contact(text)["phone"] == phone
+
+
+@pytest.mark.parametrize("text", [
+    "Worked 01.2019 - 06.2023 at Acme",
+    "Date of birth: 12.05.1990",
+    "12/05/1990",
+    "2019 - 2023",
+    "ISBN 978-3-16-148410-0",
+    "ID: 1234567890",
+    "555-0100",   # 7 digits without a label or "+"
+])
+def test_find_contact_rejects_other_numbers(text):
+    assert "phone" not in find_contact(text)
+
+
+def test_find_contact_email():
+    assert find_contact("Asha Sharma | asha.sharma@example.com")["email"] == "asha.sharma@example.com"
+
+
+def _resume(tmp_path, header: list[str], sections: dict[str, list[str]]) -> str:
+    doc = fitz.open()
+    page = doc.new_page()
+    y = 60
+    for line in header:
+        page.insert_text((56, y), line, fontsize=10)
+        y += 16
+    for heading, lines in sections.items():
+        y += 8
+        page.insert_text((56, y), heading, fontsize=12, fontname="hebo")
+        y += 18
+        for line in lines:
+            page.insert_text((56, y), line, fontsize=10)
+            y += 16
+    path = tmp_path / "resume.pdf"
+    doc.save(path)
+    doc.close()
+    return str(path)
+
+
+def test_prepare_resume_only_reads_contact_fields_from_the_header(tmp_path):
+    path = _resume(tmp_path, ["Asha Sharma", "asha@example.com"], {
+        "EXPERIENCE": ["Backend Engineer, Acme 01.2019 - 06.2023", "Reference 9876543210 on request"],
+        "PUBLICATIONS": ["Designing APIs, ISBN 978-3-16-148410-0"],
+    })
+    prepared = prepare_resume(path)
+    assert prepared.known == {"email": "asha@example.com"}
+    # text outside the header reaches the agent untouched
+    assert "01.2019 - 06.2023" in prepared.prompt
+    assert "9876543210" in prepared.prompt
+
+
+def test_prepare_resume_strips_header_values(tmp_path):
+    path = _resume(tmp_path, ["Asha Sharma", "asha@example.com | +91 98765 43210"], {
+        "EXPERIENCE": ["Backend Engineer, Acme 01.2019 - 06.2023"],
+    })
+    prepared = prepare_resume(path)
+    assert prepared.known == {"email": "asha@example.com", "phone": "+91 98765 43210"}
+    header_block = prepared.blocks()[0]
+    assert "asha@example.com" not in header_block and "98765" not in header_block
@@ -0,0 +1,160 @@
+import asyncio
+import time
+
+import pytest
+from pydantic_ai import Agent
+from pydantic_ai.exceptions import ModelHTTPError
+from pydantic_ai.messages import ModelResponse, TextPart
+from pydantic_ai.models.function import FunctionModel
+
+from app.agents import runner
+from app.agents.config import AgentPolicy
+
+
+@pytest.fixture(autouse=True)
+def fresh_runner():
+    runner._breakers.clear()
+    runner._latencies.clear()
+
+
+def scripted(name: str, *steps):
+    """A model answering with ``steps`` in turn (the last one repeats): an exception is raised,
+    a float is slept before answering ``name``, anything else is the answer."""
+    calls = []
+
+    async def run(messages, info):
+        step = steps[min(len(calls), len(steps) - 1)]
+        calls.append(step)
+        if isinstance(step, BaseException):
+            raise step
+        if isinstance(step, float):
+            await asyncio.sleep(step)
+            step = name
+        return ModelResponse(parts=[TextPart(step)])
+
+    model = FunctionModel(run, model_name=name)
+    model.calls = calls
+    return model
+
+
+def unavailable(name: str) -> ModelHTTPError:
+    return ModelHTTPError(503, name)
+
+
+def policy(*models, **overrides) -> dict[str, AgentPolicy]:
+    settings = dict(timeout=1.0, total_budget=5.0, max_retries=2, backoff_base=0.01, backoff_max=0.02)
+    return {"test": AgentPolicy(models=models, **{**settings, **overrides})}
+
+
+def run(model_policy):
+    return asyncio.run(runner.run_agent(Agent(output_type=str), "prompt", "test", model_policy)).output
+
+
+def test_retryable_errors_are_retried_with_backoff(monkeypatch):
+    delays = []
+    sleep = asyncio.sleep
+
+    async def recording_sleep(seconds):
+        delays.append(seconds)
+        await sleep(0)
+
+    monkeypatch.setattr(runner.asyncio, "sleep", recording_sleep)
+    primary = scripted("primary", unavailable("primary"), unavailable("primary"), "ok")
+
+    assert run(policy(primary)) == "ok"
+    assert len(primary.calls) == 3
+    assert len(delays) == 2 and delays[0] <= 0.01 and delays[1] <= 0.02
+
+
+def test_non_retryable_errors_are_raised():
+    primary = scripted("primary", ModelHTTPError(400, "primary"), "ok")
+
+    with pytest.raises(ModelHTTPError):
+        run(policy(primary))
+    assert len(primary.calls) == 1
+
+
+def test_falls_back_when_the_primary_keeps_failing():
+    primary = scripted("primary", unavailable("primary"))
+    fallback = scripted("fallback", "from fallback")
+
+    assert run(policy(primary, fallback)) == "from fallback"
+    assert len(primary.calls) == 3 and len(fallback.calls) == 1
+
+
+def test_every_model_failing_is_unavailable():
+    with pytest.raises(runner.AgentUnavailableError):
+        run(policy(scripted("primary", unavailable("primary")), scripted("fallback", unavailable("fallback"))))
+
+
+def test_slow_attempt_is_hedged():
+    # the first request hangs; the hedge sent after 50 ms answers at once
+    primary = scripted("primary", 2.0, "hedged")
+    started = time.monotonic()
+
+    assert run(policy(primary, hedge=True, hedge_after=0.05, timeout=3.0)) == "hedged"
+    assert time.monotonic() - started < 1.0
+    assert len(primary.calls) == 2
+
+
+def test_open_breaker_skips_the_model():
+    primary = scripted("primary", unavailable("primary"))
+    fallback = scripted("fallback", "from fallback")
+    models = policy(primary, fallback, max_retries=0, breaker_threshold=2, breaker_cooldown=60)
+
+    for _ in range(3):
+        assert run(models) == "from fallback"
+    assert len(primary.calls) == 2 and len(fallback.calls) == 3
+
+
+def test_half_open_breaker_lets_one_probe_through(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(runner.time, "monotonic", lambda: now[0])
+    breaker = runner.CircuitBreaker(threshold=2, cooldown=10)
+    breaker.record_failure()
+    assert breaker.allow()
+    breaker.record_failure()
+    assert not breaker.allow()
+
+    now[0] += 10
+    assert breaker.allow()
+    assert not breaker.allow()       # the probe is still running
+
+    breaker.record_failure()         # the probe failed: open for another cooldown
+    assert not breaker.allow()
+    now[0] += 10
+    assert breaker.allow()
+
+    breaker.record_success()         # the probe succeeded: closed for everyone
+    assert breaker.allow() and breaker.allow()
+
+
+def test_probe_that_never_reports_back_frees_the_slot(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(runner.time, "monotonic", lambda: now[0])
+    breaker = runner.CircuitBreaker(threshold=1, cooldown=10)
+    breaker.record_failure()
+
+    now[0] += 10
+    assert breaker.allow()
+    now[0] += 5
+    assert not breaker.allow()
+    now[0] += 5
+    assert breaker.allow()
+
+
+def test_closed_http_client_is_replaced():
+    from app.agents import providers
+
+    async def restart():
+        model = runner.get_model("llama-3.1-8b-instant")
+        client = providers.get_http_client()
+        await providers.close_http_client()
+        return model, client
+
+    model, client = asyncio.run(restart())
+
+    assert client.is_closed
+    assert not providers.get_http_client().is_closed
+    assert runner.get_model("llama-3.1-8b-instant") is not model
+    asyncio.run(providers.close_http_client())
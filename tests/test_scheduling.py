@@ -0,0 +1,130 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app import models, scheduling
+from app.schemas import interview_schema
+from tests.conftest import login, mailer
+
+START = datetime(2030, 1, 7, 9, 0, tzinfo=timezone.utc)
+
+
+def _seed(db, email="recruiter@example.com"):
+    """A job and two candidates for ``email``'s recruiter, created if not registered yet."""
+    user = db.query(models.User).filter_by(email=email).one_or_none()
+    if user is None:
+        user = models.User(email=email, hashed_password="x")
+        db.add(user)
+        db.flush()
+    job = models.Job(user_id=user.id, title="Backend Engineer")
+    candidates = [models.Candidate(user_id=user.id, name=f"Candidate {n}", email=f"c{n}@example.com") for n in range(2)]
+    db.add_all([job, *candidates])
+    db.commit()
+    return user, job, candidates
+
+
+def _interview(user, job, candidate, start, minutes=60):
+    return interview_schema.InterviewBase(
+        user_id=user.id, candidate_id=candidate.id, candidate_name=candidate.name, job_id=job.id,
+        job_title=job.title, interview_time=start, format="online", invite_email=candidate.email,
+        duration_minutes=minutes)
+
+
+def test_book_rejects_an_overlapping_interview(db):
+    user, job, (first, second) = _seed(db)
+    booked = scheduling.book(db, _interview(user, job, first, START), START, START + timedelta(hours=1))
+
+    half_past = START + timedelta(minutes=30)
+    with pytest.raises(scheduling.SlotConflict):
+        scheduling.book(db, _interview(user, job, second, half_past), half_past, half_past + timedelta(hours=1))
+
+    later = START + timedelta(hours=1)
+    scheduling.book(db, _interview(user, job, second, later), later, later + timedelta(hours=1))
+    # SQLite hands back naive datetimes, Postgres aware ones
+    assert sorted(scheduling.as_utc(start) for start, in db.query(models.Interview.interview_time)) == [
+        scheduling.as_utc(booked.interview_time), later]
+
+
+def test_hold_survives_a_calendar_reload(db, monkeypatch):
+    user, _, _ = _seed(db)
+
+    async def scenario():
+        async with scheduling.hold(db, user.id, START, 60):
+            # every lookup reloads the index from the database, where the held slot is not stored yet
+            monkeypatch.setattr(scheduling, "SLOT_INDEX_TTL", -1)
+            with pytest.raises(scheduling.SlotConflict):
+                async with scheduling.hold(db, user.id, START + timedelta(minutes=15), 30):
+                    pass
+        assert scheduling._holds == {}
+
+        async with scheduling.hold(db, user.id, START, 60):
+            pass
+
+    asyncio.run(scenario())
+
+
+def test_hold_loads_the_calendar_off_the_event_loop(db, monkeypatch):
+    import threading
+
+    user, _, _ = _seed(db)
+    loop_thread = threading.get_ident()
+    query_threads = []
+    get_interview_intervals = scheduling.crud.get_interview_intervals
+
+    def recording(**kwargs):
+        query_threads.append(threading.get_ident())
+        return get_interview_intervals(**kwargs)
+
+    monkeypatch.setattr(scheduling.crud, "get_interview_intervals", recording)
+
+    async def scenario():
+        async with scheduling.hold(db, user.id, START, 60):
+            pass
+
+    asyncio.run(scenario())
+    assert query_threads and loop_thread not in query_threads
+
+
+def test_free_slots_accept_naive_bounds(api):
+    async def scenario(client):
+        headers = await login(client)
+        return await client.get("/interviews/slots", headers=headers,
+                                params={"start": "2030-01-07T09:00:00", "end": "2030-01-08T09:00:00"})
+
+    response = api(scenario)
+    assert response.status_code == 200
+    assert response.json()[0]["start"].startswith("2030-01-07T09:00:00")
+
+
+def test_create_interview_books_the_slot_once(api, db):
+    async def scenario(client):
+        headers = await login(client)
+        _, job, (first, second) = _seed(db)
+        body = {"job_id": job.id, "interview_datetime": START.isoformat(), "interview_format": "online"}
+        booked = await client.post("/interviews/create", json={**body, "candidate_id": first.id}, headers=headers)
+        clash = await client.post("/interviews/create", json={**body, "candidate_id": second.id}, headers=headers)
+        return booked, clash
+
+    booked, clash = api(scenario)
+    assert booked.status_code == 200
+    assert clash.status_code == 409
+    assert len(mailer.sent) == 1
+
+
+def test_failed_email_removes_the_interview(api, db, monkeypatch):
+    from app.routers import interviews
+
+    async def not_sent(**kwargs):
+        return False
+
+    async def scenario(client):
+        headers = await login(client)
+        _, job, (candidate, _) = _seed(db)
+        body = {"job_id": job.id, "candidate_id": candidate.id,
+                "interview_datetime": START.isoformat(), "interview_format": "online"}
+        return await client.post("/interviews/create", json=body, headers=headers)
+
+    monkeypatch.setattr(interviews, "send_email", not_sent)
+    assert api(scenario).status_code == 500
+    assert db.query(models.Interview).count() == 0
@@ -0,0 +1,104 @@
+import asyncio
+import inspect
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from sqlalchemy import event
+
+from app import crud, models, tracing
+from app.db import engine
+
+
+class Collector:
+    def __init__(self):
+        self.spans = []
+
+    def export(self, span):
+        self.spans.append(span)
+
+
+@pytest.fixture
+def traced_app(db, monkeypatch):
+    """The jobs router on an app with TRACING on; crud and the engine are restored afterwards."""
+    from app.agents.jd_agent import jd_agent
+    from app.dependencies import get_current_user
+    from app.routers import jobs
+    from loadtest import fakes
+
+    monkeypatch.setattr(tracing, "TRACING_ENABLED", True)
+    collector = Collector()
+    monkeypatch.setattr(tracing, "exporter", collector)
+    # install() wraps crud's functions in place; registering them here puts the originals back
+    for name, value in list(vars(crud).items()):
+        if inspect.isfunction(value):
+            monkeypatch.setattr(crud, name, value)
+
+    user = models.User(email="recruiter@example.com", hashed_password="x")
+    db.add(user)
+    db.commit()
+    app = FastAPI()
+    app.include_router(jobs.router)
+    app.dependency_overrides[get_current_user] = lambda: {"id": user.id, "email": user.email}
+    tracing.install(app, engine)
+    try:
+        with jd_agent.override(model=fakes.jd_model(fakes.Latency(0, 0))):
+            yield app, collector
+    finally:
+        for name, listener in (("before_cursor_execute", tracing._before_cursor_execute),
+                               ("after_cursor_execute", tracing._after_cursor_execute),
+                               ("handle_error", tracing._handle_error)):
+            event.remove(engine, name, listener)
+
+
+def _post_job(app):
+    async def main():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await client.post("/jobs/create", json={"raw_text": "Backend Engineer. Skills: Python."})
+
+    return asyncio.run(main())
+
+
+def _timings(header: str) -> dict[str, float]:
+    return {name: float(duration.removeprefix("dur="))
+            for name, _, duration in (metric.strip().partition(";") for metric in header.split(","))}
+
+
+def test_server_timing_sums_each_stage_once(traced_app):
+    app, collector = traced_app
+
+    response = _post_job(app)
+
+    assert response.status_code == 200
+    timings = _timings(response.headers["Server-Timing"])
+    assert {"agent", "llm", "db", "total"} <= set(timings)
+    root, = [span for span in collector.spans if span.parent_id is None]
+    crud_ms = sum(span.duration_ms for span in collector.spans if span.name.startswith("crud."))
+    every_db_ms = sum(span.duration_ms for span in collector.spans if span.stage == "db")
+    # statements inside a crud span are not counted again
+    assert crud_ms - 0.1 <= timings["db"] < every_db_ms
+    assert timings["total"] == pytest.approx(root.duration_ms, abs=0.1)
+
+
+def test_spans_nest_under_the_request(traced_app):
+    app, collector = traced_app
+
+    _post_job(app)
+
+    by_id = {span.span_id: span for span in collector.spans}
+
+    def ancestors(span):
+        chain = []
+        while span.parent_id in by_id:
+            span = by_id[span.parent_id]
+            chain.append(span.name)
+        return chain
+
+    root, = [span for span in collector.spans if span.parent_id is None]
+    assert root.name == "POST /jobs/create" and root.attributes["http.status_code"] == 200
+    llm, = [span for span in collector.spans if span.stage == "llm"]
+    assert ancestors(llm) == ["agent jd_agent", root.name]
+    insert, = [span for span in collector.spans if span.name == "db.insert"]
+    assert ancestors(insert) == ["crud.create_job", root.name]
+    assert len({span.trace.trace_id for span in collector.spans}) == 1